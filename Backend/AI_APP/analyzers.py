@@ -0,0 +1,587 @@
+import asyncio
+import logging
+import math
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from .local_analyzer import analyze_locally
+from .metrics import record_analyzer_call, record_analyzer_hedge
+from .prompts import get_template
+from .utils import (
+    extract_json_from_response,
+    get_anthropic_client,
+    get_async_anthropic_client,
+    get_async_groq_client,
+    get_groq_client,
+    is_unparsed_feedback,
+)
+
+
+# ----------------------------------------------------------------------
+# Analyzer backends: which LLM answers an analysis.
+#
+# Remote backends (ANALYZER_BACKENDS, default "groq,anthropic") are tried
+# fastest first, by the p95 latency of their recent successful calls in
+# this worker. Backends without enough samples yet go first, in configured
+# order, so every backend gets measured before routing settles.
+#
+# Hedging: if the chosen backend hasn't answered after its p95 (or
+# ANALYZER_HEDGE_AFTER_SECONDS while unmeasured), the next one is fired
+# too and the first good answer wins. The loser keeps running: it is
+# billed all the same, so its tokens are reported too (on_hedge_usage).
+# An error fails over to the next backend straight away.
+#
+# Circuit breakers (per backend, shared by all workers through the cache):
+# ANALYZER_CIRCUIT_FAILURES consecutive errors open the circuit, and the
+# backend is skipped for ANALYZER_CIRCUIT_COOLDOWN seconds. After that a
+# single call is let through as a probe; success closes the circuit, an
+# error re-opens it.
+#
+# When every remote backend is unconfigured, open or failing, the local
+# CPU analyzer (AI_APP/local_analyzer.py) answers instead. So it does
+# when ANALYZER_DEADLINE runs out: every remote call is given at most the
+# time left (and no SDK retries), so an inline analysis always finishes
+# inside the upload request instead of getting the worker killed.
+# ----------------------------------------------------------------------
+
+# Latencies below this many samples are too noisy to route or hedge on
+MIN_LATENCY_SAMPLES = 5
+LATENCY_WINDOW = 100
+# Don't start a remote call with less time than this left
+MIN_CALL_SECONDS = 1.0
+
+logger = logging.getLogger(__name__)
+
+
+class AnalyzerError(Exception):
+    pass
+
+
+class Analysis:
+    """
+    Feedback from one backend call, with what it cost. Token counts are
+    None when the backend doesn't report them (local). `losers` are the
+    hedged calls still running when this one won.
+    """
+    __slots__ = (
+        'feedback', 'backend', 'input_tokens', 'output_tokens', 'prompt_version', 'latency_ms', 'losers',
+    )
+
+    def __init__(self, feedback, backend, input_tokens=None, output_tokens=None):
+        self.feedback = feedback
+        self.backend = backend
+        self.input_tokens = input_tokens
+        self.output_tokens = output_tokens
+        self.prompt_version = ''
+        self.latency_ms = None
+        self.losers = []
+
+
+class CircuitBreaker:
+    def __init__(self, name):
+        self.failures_key = f'analyzer:{name}:failures'
+        self.open_key = f'analyzer:{name}:open_until'
+        self.probe_key = f'analyzer:{name}:probe'
+
+    def state(self):
+        open_until = cache.get(self.open_key)
+        if open_until is None:
+            return 'closed'
+        return 'open' if time.time() < open_until else 'half_open'
+
+    def allow(self):
+        """
+        Whether a call may go through now. In the half-open state only the
+        first caller (across workers) gets to probe.
+        """
+        state = self.state()
+        if state == 'closed':
+            return True
+        if state == 'open':
+            return False
+        return cache.add(self.probe_key, 1, timeout=settings.ANALYZER_TIMEOUT)
+
+    def record_success(self):
+        cache.delete_many([self.failures_key, self.open_key, self.probe_key])
+
+    def record_failure(self):
+        cache.add(self.failures_key, 0, timeout=None)
+        try:
+            failures = cache.incr(self.failures_key)
+        except ValueError:
+            cache.set(self.failures_key, 1, timeout=None)
+            failures = 1
+        # A failed probe re-opens the circuit right away
+        if failures >= settings.ANALYZER_CIRCUIT_FAILURES or cache.get(self.open_key) is not None:
+            cache.set(self.open_key, time.time() + settings.ANALYZER_CIRCUIT_COOLDOWN, timeout=None)
+            cache.delete(self.probe_key)
+
+
+class AnalyzerBackend:
+    name = ''
+
+    def __init__(self):
+        self.breaker = CircuitBreaker(self.name)
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+
+    def is_configured(self):
+        return True
+
+    def p95(self):
+        """
+        p95 latency in seconds of recent successful calls, None until there
+        are MIN_LATENCY_SAMPLES of them.
+        """
+        samples = sorted(self.latencies)
+        if len(samples) < MIN_LATENCY_SAMPLES:
+            return None
+        return samples[min(len(samples) - 1, math.ceil(0.95 * len(samples)) - 1)]
+
+    def analyze(self, request):
+        """
+        Analysis for a request from AI_APP/prompts.py. Raises on failure.
+        """
+        raise NotImplementedError
+
+    async def aanalyze(self, request):
+        return await sync_to_async(self.analyze, thread_sensitive=False)(request)
+
+
+def _parse_feedback(name, text):
+    if not text:
+        raise AnalyzerError(f"{name} returned no text")
+    logger.debug("Raw %s response: %.300s", name, text)
+    feedback = extract_json_from_response(text)
+    # A reply that isn't JSON counts as a failure: it trips the breaker and
+    # fails over instead of saving the placeholder as a real analysis
+    if is_unparsed_feedback(feedback):
+        raise AnalyzerError(f"{name} reply was not valid JSON")
+    return feedback
+
+
+class GroqBackend(AnalyzerBackend):
+    name = 'groq'
+
+    def is_configured(self):
+        return bool(settings.GROQ_API_KEY)
+
+    def _request(self, request):
+        model = settings.GROQ_MODEL
+        logger.info("Calling Groq API with model %s (prompt %s)", model, request['version'])
+        kwargs = {
+            "model": model,
+            "messages": [
+                {"role": "system", "content": request["system"]},
+                {"role": "user", "content": request["prompt"]},
+            ],
+            "max_tokens": request["max_tokens"],
+            "temperature": request["temperature"],
+            "timeout": request.get("timeout", settings.ANALYZER_TIMEOUT),
+        }
+        if request["top_p"] is not None:
+            kwargs["top_p"] = request["top_p"]
+        if request["json_schema"] is not None:
+            # JSON mode: the reply is guaranteed to be one JSON object
+            kwargs["response_format"] = {"type": "json_object"}
+        return kwargs
+
+    def _analysis(self, response):
+        feedback = _parse_feedback(self.name, response.choices[0].message.content)
+        usage = response.usage
+        if usage is None:
+            return Analysis(feedback, self.name)
+        return Analysis(feedback, self.name, usage.prompt_tokens, usage.completion_tokens)
+
+    def analyze(self, request):
+        client = get_groq_client(settings.GROQ_API_KEY)
+        return self._analysis(client.chat.completions.create(**self._request(request)))
+
+    async def aanalyze(self, request):
+        client = get_async_groq_client(settings.GROQ_API_KEY)
+        return self._analysis(await client.chat.completions.create(**self._request(request)))
+
+
+class AnthropicBackend(AnalyzerBackend):
+    name = 'anthropic'
+
+    def is_configured(self):
+        return bool(settings.ANTHROPIC_API_KEY)
+
+    tool_name = 'record_resume_analysis'
+
+    def _request(self, request):
+        model = settings.ANTHROPIC_MODEL
+        logger.info("Calling Anthropic API with model %s (prompt %s)", model, request['version'])
+        # Anthropic takes the system prompt separately and recommends
+        # tuning temperature or top_p, not both
+        kwargs = {
+            "model": model,
+            "system": request["system"],
+            "messages": [{"role": "user", "content": request["prompt"]}],
+            "max_tokens": request["max_tokens"],
+            "temperature": request["temperature"],
+            "timeout": request.get("timeout", settings.ANALYZER_TIMEOUT),
+        }
+        if request["json_schema"] is not None:
+            # Structured output: force a single tool call whose input is
+            # the analysis, validated against the schema
+            kwargs["tools"] = [{
+                "name": self.tool_name,
+                "description": "Record the resume analysis.",
+                "input_schema": request["json_schema"],
+            }]
+            kwargs["tool_choice"] = {"type": "tool", "name": self.tool_name}
+        return kwargs
+
+    def _analysis(self, response):
+        tool_inputs = [block.input for block in response.content if block.type == 'tool_use']
+        if tool_inputs:
+            feedback = dict(tool_inputs[0])
+        else:
+            text = ''.join(block.text for block in response.content if block.type == 'text')
+            feedback = _parse_feedback(self.name, text)
+        usage = response.usage
+        return Analysis(feedback, self.name, usage.input_tokens, usage.output_tokens)
+
+    def analyze(self, request):
+        client = get_anthropic_client(settings.ANTHROPIC_API_KEY)
+        return self._analysis(client.messages.create(**self._request(request)))
+
+    async def aanalyze(self, request):
+        client = get_async_anthropic_client(settings.ANTHROPIC_API_KEY)
+        return self._analysis(await client.messages.create(**self._request(request)))
+
+
+class LocalBackend(AnalyzerBackend):
+    name = 'local'
+
+    def analyze(self, request):
+        return Analysis(analyze_locally(request), self.name)
+
+
+BACKEND_CLASSES = {cls.name: cls for cls in (GroqBackend, AnthropicBackend)}
+
+_backends = {}
+_local = LocalBackend()
+_executor = None
+_executor_lock = threading.Lock()
+# asyncio only keeps weak references to tasks
+_running_losers = set()
+
+
+def get_backend(name):
+    backend = _backends.get(name)
+    if backend is None:
+        backend = _backends[name] = BACKEND_CLASSES[name]()
+    return backend
+
+
+def remote_backends():
+    """
+    Configured remote backends: unmeasured ones first, then fastest (by p95)
+    first.
+    """
+    backends = [
+        get_backend(name) for name in settings.ANALYZER_BACKENDS
+        if name in BACKEND_CLASSES and get_backend(name).is_configured()
+    ]
+    # sorted() is stable, so ties keep the configured order
+    return sorted(backends, key=lambda b: (b.p95() is not None, b.p95() or 0))
+
+
+def backend_status():
+    """
+    Name, circuit state and p95 of every configured backend (GET /api/metrics/).
+    """
+    return [
+        {'name': backend.name, 'state': backend.breaker.state(), 'p95': backend.p95()}
+        for backend in remote_backends()
+    ] + [{'name': _local.name, 'state': 'closed', 'p95': _local.p95()}]
+
+
+def _hedge_delay(backend):
+    return backend.p95() or settings.ANALYZER_HEDGE_AFTER_SECONDS
+
+
+def _get_executor():
+    # Created on first use, so it never exists in the gunicorn master
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.ANALYZER_MAX_THREADS, thread_name_prefix='analyzer'
+            )
+    return _executor
+
+
+def _record(backend, started, error=None):
+    if error is None:
+        backend.latencies.append(time.monotonic() - started)
+        backend.breaker.record_success()
+        record_analyzer_call(backend.name, 'ok')
+    else:
+        logger.warning("%s analysis failed: %s", backend.name, error)
+        backend.breaker.record_failure()
+        record_analyzer_call(backend.name, 'error')
+
+
+def _call(backend, request):
+    started = time.monotonic()
+    try:
+        analysis = backend.analyze(request)
+    except Exception as e:
+        _record(backend, started, e)
+        raise
+    _record(backend, started)
+    return analysis
+
+
+async def _acall(backend, request):
+    started = time.monotonic()
+    try:
+        analysis = await backend.aanalyze(request)
+    except Exception as e:
+        _record(backend, started, e)
+        raise
+    _record(backend, started)
+    return analysis
+
+
+def _next_allowed(candidates):
+    for backend in candidates:
+        if backend.breaker.allow():
+            return backend
+    return None
+
+
+def _with_timeout(request, deadline):
+    """
+    `request` with the timeout for a call starting now, or None when too
+    little of the deadline is left to start one.
+    """
+    remaining = deadline - time.monotonic()
+    if remaining < MIN_CALL_SECONDS:
+        return None
+    return dict(request, timeout=min(settings.ANALYZER_TIMEOUT, remaining))
+
+
+def _wait_timeout(pending, hedged, deadline):
+    remaining = max(0.0, deadline - time.monotonic())
+    # Only the first in-flight call is hedged, and only once
+    if hedged or len(pending) != 1 or not settings.ANALYZER_HEDGE:
+        return remaining
+    backend, started = next(iter(pending.values()))
+    return min(remaining, max(0.0, started + _hedge_delay(backend) - time.monotonic()))
+
+
+def _deadline_passed(deadline):
+    if time.monotonic() < deadline:
+        return False
+    logger.warning("No analyzer answered within ANALYZER_DEADLINE (%ss)", settings.ANALYZER_DEADLINE)
+    return True
+
+
+def _finish(request, analysis, started, losers=()):
+    analysis.feedback = get_template(request['version']).clean(analysis.feedback)
+    analysis.prompt_version = request['version']
+    analysis.latency_ms = int((time.monotonic() - started) * 1000)
+    analysis.losers = list(losers)
+    return analysis
+
+
+def on_hedge_usage(analysis, callback):
+    """
+    Call `callback(input_tokens, output_tokens)` in an analyzer thread for
+    every hedged call that lost to `analysis`, once it has answered. Calls
+    that failed or were cancelled report nothing.
+    """
+    for loser in analysis.losers:
+        loser.add_done_callback(partial(_loser_done, callback))
+
+
+def _loser_done(callback, loser):
+    if loser.cancelled() or loser.exception() is not None:
+        return
+    usage = loser.result()
+    if usage.input_tokens is None and usage.output_tokens is None:
+        return
+    # Off the event loop and off the request thread, whichever this is
+    _get_executor().submit(_report_usage, callback, usage.input_tokens or 0, usage.output_tokens or 0)
+
+
+def _report_usage(callback, input_tokens, output_tokens):
+    try:
+        callback(input_tokens, output_tokens)
+    except Exception:
+        logger.exception("Could not record the usage of a hedged call")
+
+
+def run_analysis(request):
+    """
+    Analyze `request` (from AI_APP/prompts.py) on the best available
+    backend. Returns an Analysis.
+    """
+    started = time.monotonic()
+    deadline = started + settings.ANALYZER_DEADLINE
+    candidates = iter(remote_backends())
+    pending = {}
+    hedged = False
+
+    def launch():
+        timed = _with_timeout(request, deadline)
+        backend = _next_allowed(candidates) if timed is not None else None
+        if backend is not None:
+            future = _get_executor().submit(_call, backend, timed)
+            pending[future] = (backend, time.monotonic())
+        return backend is not None
+
+    launch()
+    while pending:
+        done, _ = wait(list(pending), timeout=_wait_timeout(pending, hedged, deadline), return_when=FIRST_COMPLETED)
+        if not done:
+            if _deadline_passed(deadline):
+                # The calls still running time out on their own by now
+                break
+            hedged = True
+            if launch():
+                record_analyzer_hedge()
+            continue
+        for future in done:
+            backend, _ = pending.pop(future)
+            if future.exception() is None:
+                # A slower hedge keeps running in its thread; its latency
+                # still feeds the routing
+                return _finish(request, future.result(), started, losers=pending)
+        if not pending:
+            launch()
+
+    return _finish(request, _call_local(request), started)
+
+
+async def arun_analysis(request):
+    """
+    Async version of `run_analysis`.
+    """
+    started = time.monotonic()
+    deadline = started + settings.ANALYZER_DEADLINE
+    candidates = iter(remote_backends())
+    pending = {}
+    hedged = False
+
+    def launch():
+        timed = _with_timeout(request, deadline)
+        backend = _next_allowed(candidates) if timed is not None else None
+        if backend is not None:
+            task = asyncio.ensure_future(_acall(backend, timed))
+            pending[task] = (backend, time.monotonic())
+        return backend is not None
+
+    launch()
+    try:
+        while pending:
+            done, _ = await asyncio.wait(
+                list(pending), timeout=_wait_timeout(pending, hedged, deadline),
+                return_when=asyncio.FIRST_COMPLETED,
+            )
+            if not done:
+                if _deadline_passed(deadline):
+                    break
+                hedged = True
+                if launch():
+                    record_analyzer_hedge()
+                continue
+            for task in done:
+                backend, _ = pending.pop(task)
+                if task.exception() is None:
+                    # Like in run_analysis the slower hedge runs on
+                    losers = list(pending)
+                    pending.clear()
+                    for loser in losers:
+                        _running_losers.add(loser)
+                        loser.add_done_callback(_running_losers.discard)
+                    return _finish(request, task.result(), started, losers=losers)
+            if not pending:
+                launch()
+    finally:
+        # Past the deadline, or the request went away
+        for task in pending:
+            task.cancel()
+
+    analysis = await sync_to_async(_call_local, thread_sensitive=False)(request)
+    return _finish(request, analysis, started)
+
+
+def run_on_backend(name, request):
+    """
+    Analyze `request` on one backend, without routing, hedging or fallback
+    (`manage.py prompt_ab --backend`).
+    """
+    started = time.monotonic()
+    return _finish(request, _call(get_backend(name), request), started)
+
+
+def _call_local(request):
+    if not settings.ANALYZER_LOCAL_FALLBACK:
+        raise AnalyzerError("No analyzer backend available")
+    return _call(_local, request)
+
+
+# ----------------------------------------------------------------------
+# Entry points used by AI_APP/services.py
+# ----------------------------------------------------------------------
+
+def analyze_resume(resume_text, version=None):
+    """
+    Full analysis with prompt `version` (default PROMPT_VERSION).
+    """
+    return run_analysis(get_template(version).analysis_request(resume_text))
+
+
+async def aanalyze_resume(resume_text, version=None):
+    return await arun_analysis(get_template(version).analysis_request(resume_text))
+
+
+def _reused(previous_feedback, version):
+    # Same text as before: nothing to ask
+    analysis = Analysis(dict(previous_feedback), 'reused', 0, 0)
+    analysis.prompt_version = version or settings.PROMPT_VERSION
+    analysis.latency_ms = 0
+    return analysis
+
+
+def analyze_resume_changes(changes, previous_feedback, resume_text, version=None):
+    """
+    Update `previous_feedback` for a near-duplicate from only the changed
+    sections (AI_APP/similarity.py).
+    """
+    if not changes:
+        return _reused(previous_feedback, version)
+    return run_analysis(get_template(version).changes_request(changes, previous_feedback, resume_text))
+
+
+async def aanalyze_resume_changes(changes, previous_feedback, resume_text, version=None):
+    if not changes:
+        return _reused(previous_feedback, version)
+    return await arun_analysis(
+        get_template(version).changes_request(changes, previous_feedback, resume_text)
+    )
+
+
+def reset_analyzers():
+    """
+    Forget latencies and drop the thread pool (after fork, in benchmarks).
+    """
+    global _executor
+    _backends.clear()
+    _local.latencies.clear()
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False)
+            _executor = None
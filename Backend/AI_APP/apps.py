@@ -1,5 +1,16 @@
+import logging
+
 from django.apps import AppConfig
+from django.conf import settings
 
 
 class AiAppConfig(AppConfig):
     name = 'AI_APP'
+
+    def ready(self):
+        from . import checks  # noqa: F401 (registers the system checks)
+
+        if not (settings.GROQ_API_KEY or settings.ANTHROPIC_API_KEY):
+            logging.getLogger(self.name).warning(
+                "Neither GROQ_API_KEY nor ANTHROPIC_API_KEY is set, resumes will be scored locally"
+            )
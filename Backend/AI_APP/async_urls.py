@@ -0,0 +1,9 @@
+from django.urls import path
+from .async_views import AsyncResumeListView, AsyncResumeDetailView
+
+# Mounted in front of AI_APP.urls when ASYNC_VIEWS=True, so the async
+# views answer the same URLs the React app already calls.
+urlpatterns = [
+    path('resumes/', AsyncResumeListView.as_view(), name='resume-list-async'),
+    path('resumes/<uuid:pk>/', AsyncResumeDetailView.as_view(), name='resume-detail-async'),
+]
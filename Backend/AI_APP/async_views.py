@@ -0,0 +1,166 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.views import View
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from .models import Resume
+from .routers import replica_reads
+from .serializers import ResumeUploadSerializer, ResumeAnalysisSerializer
+from .services import asubmit_resume, delete_resume
+from .throttling import ReadRateThrottle, UploadRateThrottle, check_throttles
+from .views import ResumeViewSet
+
+
+# ----------------------------------------------------------------------
+# Async versions of the hot ResumeViewSet paths (list / upload /
+# retrieve / delete), served when ASYNC_VIEWS=True under an ASGI server.
+# PUT / PATCH on a resume are passed on to the (sync) viewset.
+#
+# DRF 3.14 views are sync-only, so these are plain Django async views
+# that reuse the same serializers and the same JSON shapes as the
+# viewset. While one request awaits the database or an LLM API, the
+# event loop keeps serving others, so a few processes can hold thousands
+# of concurrent polls and long analyses.
+# ----------------------------------------------------------------------
+
+
+@sync_to_async
+def serialize(serializer):
+    # Reading the compressed fields decompresses them (CPU work) and may
+    # load a compression dictionary from the database, neither of which
+    # can run on the event loop
+    return serializer.data
+
+
+class AsyncJWTView(View):
+    """
+    Base class: JWT authentication, the ResumeViewSet throttles and JSON
+    errors shaped like DRF's.
+    """
+    # HTTP method -> ResumeViewSet action name, for the throttles
+    actions = {}
+    # Methods ResumeViewSet answers at the same URL that have no async
+    # version; they are handed to the viewset as they are
+    delegated_actions = {}
+    delegate = None
+    throttle_classes = (UploadRateThrottle, ReadRateThrottle)
+    # Same as ResumeViewSet.replica_actions
+    replica_actions = ('list', 'retrieve')
+
+    @classmethod
+    def as_view(cls, **initkwargs):
+        if cls.delegated_actions:
+            initkwargs.setdefault('delegate', ResumeViewSet.as_view(cls.delegated_actions))
+        view = super().as_view(**initkwargs)
+        # Token auth, same as DRF's APIView (CSRF doesn't apply)
+        view.csrf_exempt = True
+        return view
+
+    async def dispatch(self, request, *args, **kwargs):
+        if request.method.lower() in self.delegated_actions:
+            # The viewset does its own auth, throttling and replica routing
+            return await sync_to_async(self.delegate)(request, *args, **kwargs)
+
+        try:
+            auth = await sync_to_async(JWTAuthentication().authenticate)(request)
+        except AuthenticationFailed as e:
+            return JsonResponse({"detail": e.detail}, status=401)
+        if auth is None:
+            return JsonResponse(
+                {"detail": "Authentication credentials were not provided."},
+                status=401,
+            )
+        request.user = auth[0]
+
+        self.action = self.actions.get(request.method.lower())
+        wait = await sync_to_async(check_throttles)(request, self, self.throttle_classes)
+        if wait is not None:
+            response = JsonResponse(
+                {"detail": f"Request was throttled. Expected available in {wait} seconds."},
+                status=429,
+            )
+            response["Retry-After"] = str(wait)
+            return response
+
+        if self.action in self.replica_actions:
+            # The ORM's sync_to_async threads copy the context, so the
+            # router sees this too
+            with replica_reads(request.user.pk):
+                return await super().dispatch(request, *args, **kwargs)
+        return await super().dispatch(request, *args, **kwargs)
+
+    def get_queryset(self, request):
+        return Resume.objects.filter(user=request.user).order_by('-created_at')
+
+
+class AsyncResumeListView(AsyncJWTView):
+    actions = {'get': 'list', 'post': 'create'}
+
+    async def get(self, request):
+        # Same contract as rest_framework.pagination.PageNumberPagination
+        page_size = settings.REST_FRAMEWORK['PAGE_SIZE']
+        try:
+            page = int(request.GET.get('page', 1))
+            if page < 1:
+                raise ValueError
+        except ValueError:
+            return JsonResponse({"detail": "Invalid page."}, status=404)
+
+        queryset = self.get_queryset(request)
+        count = await queryset.acount()
+        offset = (page - 1) * page_size
+        if page > 1 and offset >= count:
+            return JsonResponse({"detail": "Invalid page."}, status=404)
+
+        resumes = [resume async for resume in queryset[offset:offset + page_size]]
+        serializer = ResumeAnalysisSerializer(resumes, many=True, context={'request': request})
+        return JsonResponse({
+            "count": count,
+            "next": self._page_url(request, page + 1) if offset + page_size < count else None,
+            "previous": self._page_url(request, page - 1) if page > 1 else None,
+            "results": await serialize(serializer),
+        })
+
+    async def post(self, request):
+        data = request.POST.copy()
+        data.update(request.FILES)
+        serializer = ResumeUploadSerializer(data=data, context={'request': request})
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=400)
+
+        # Storage writes are blocking file I/O
+        resume = await sync_to_async(serializer.save)(user=request.user, status='processing')
+        await asubmit_resume(resume)
+
+        return JsonResponse(ResumeUploadSerializer(resume, context={'request': request}).data, status=201)
+
+    def _page_url(self, request, page):
+        params = request.GET.copy()
+        if page == 1:
+            params.pop('page', None)
+        else:
+            params['page'] = page
+        url = request.build_absolute_uri(request.path)
+        return f"{url}?{params.urlencode()}" if params else url
+
+
+class AsyncResumeDetailView(AsyncJWTView):
+    actions = {'get': 'retrieve', 'delete': 'destroy'}
+    delegated_actions = {'put': 'update', 'patch': 'partial_update'}
+
+    async def get(self, request, pk):
+        try:
+            resume = await self.get_queryset(request).aget(pk=pk)
+        except Resume.DoesNotExist:
+            return JsonResponse({"detail": "Not found."}, status=404)
+        return JsonResponse(await serialize(ResumeAnalysisSerializer(resume, context={'request': request})))
+
+    async def delete(self, request, pk):
+        try:
+            resume = await self.get_queryset(request).aget(pk=pk)
+        except Resume.DoesNotExist:
+            return JsonResponse({"detail": "Not found."}, status=404)
+        await sync_to_async(delete_resume)(resume)
+        return HttpResponse(status=204)
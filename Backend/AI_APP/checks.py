@@ -0,0 +1,27 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+# Time an inline upload needs besides the analysis (PDF extraction, saves)
+REQUEST_HEADROOM_SECONDS = 10
+
+
+@register()
+def check_analyzer_deadline(app_configs, **kwargs):
+    """
+    An inline analysis runs inside the upload request; if it can outlast
+    the request, gunicorn kills the worker and the resume stays
+    'processing'.
+    """
+    if settings.ANALYSIS_MODE != 'inline':
+        return []
+    budget = settings.REQUEST_TIMEOUT - REQUEST_HEADROOM_SECONDS
+    errors = []
+    if settings.ANALYZER_DEADLINE > budget:
+        errors.append(Error(
+            f"ANALYZER_DEADLINE ({settings.ANALYZER_DEADLINE:g}s) leaves less than "
+            f"{REQUEST_HEADROOM_SECONDS}s of the {settings.REQUEST_TIMEOUT}s request timeout.",
+            hint="Lower ANALYZER_DEADLINE, raise GUNICORN_TIMEOUT (and nginx's "
+                 "proxy_read_timeout) or use ANALYSIS_MODE=queued.",
+            id='AI_APP.E001',
+        ))
+    return errors
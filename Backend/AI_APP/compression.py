@@ -0,0 +1,308 @@
+import json
+import struct
+import threading
+import zlib
+from collections import Counter
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import models
+from django.db.models import Value
+
+
+# ----------------------------------------------------------------------
+# Codecs behind the compressed model fields (AI_APP/fields.py).
+#
+# Every stored value starts with a header saying how it was written:
+#
+#   <1 byte codec> [<4 byte dictionary id>] <payload>
+#
+# codec: 0 = raw, 1 = zlib, 2 = zstd; | 0x80 when a trained dictionary
+# (CompressionDictionary row) was used. New writes follow FIELD_COMPRESSION
+# and FIELD_COMPRESSION_DICT_ID, old rows stay readable whatever those are
+# changed to. Dictionaries are immutable once created and must never be
+# deleted while rows reference them.
+# ----------------------------------------------------------------------
+
+RAW, ZLIB, ZSTD = 0, 1, 2
+DICT_FLAG = 0x80
+CODECS = {'none': RAW, 'zlib': ZLIB, 'zstd': ZSTD}
+DEFAULT_LEVELS = {ZLIB: 6, ZSTD: 3}
+
+# Below this many bytes the header + codec framing isn't worth it
+MIN_COMPRESS_SIZE = 64
+
+# zlib can only use the last 32 KB of a preset dictionary
+ZLIB_MAX_DICT_SIZE = 32 * 1024
+
+_dictionaries = {}
+_zstd_dicts = {}
+# zstd (de)compressor objects are expensive to build with a dictionary but
+# not safe to share between threads
+_local = threading.local()
+
+
+def _zstd():
+    # Optional dependency, only needed when FIELD_COMPRESSION=zstd or a
+    # stored value was written with zstd
+    try:
+        import zstandard
+    except ImportError:
+        raise ImproperlyConfigured("FIELD_COMPRESSION=zstd requires the 'zstandard' package.")
+    return zstandard
+
+
+def get_dictionary(dict_id):
+    """
+    Return (codec, bytes) of a CompressionDictionary, cached per process.
+    """
+    entry = _dictionaries.get(dict_id)
+    if entry is None:
+        CompressionDictionary = apps.get_model('AI_APP', 'CompressionDictionary')
+        row = CompressionDictionary.objects.get(pk=dict_id)
+        entry = (CODECS[row.codec], bytes(row.data))
+        _dictionaries[dict_id] = entry
+    return entry
+
+
+def _zstd_dict(dict_id, data):
+    zstd_dict = _zstd_dicts.get(dict_id)
+    if zstd_dict is None:
+        zstd_dict = _zstd().ZstdCompressionDict(data)
+        _zstd_dicts[dict_id] = zstd_dict
+    return zstd_dict
+
+
+def _zstd_codec(kind, dict_id, level=None):
+    cache = _local.__dict__.setdefault('zstd', {})
+    key = (kind, dict_id, level)
+    codec = cache.get(key)
+    if codec is None:
+        zstandard = _zstd()
+        options = {}
+        if dict_id is not None:
+            options['dict_data'] = _zstd_dict(dict_id, get_dictionary(dict_id)[1])
+        if kind == 'compress':
+            codec = zstandard.ZstdCompressor(level=level, **options)
+        else:
+            codec = zstandard.ZstdDecompressor(**options)
+        cache[key] = codec
+    return codec
+
+
+def _write_config():
+    codec = CODECS.get(settings.FIELD_COMPRESSION)
+    if codec is None:
+        raise ImproperlyConfigured(
+            f"FIELD_COMPRESSION must be one of {', '.join(CODECS)}, not {settings.FIELD_COMPRESSION!r}."
+        )
+    level = settings.FIELD_COMPRESSION_LEVEL or DEFAULT_LEVELS.get(codec)
+    dict_id = settings.FIELD_COMPRESSION_DICT_ID if codec != RAW else None
+    if dict_id is not None and get_dictionary(dict_id)[0] != codec:
+        raise ImproperlyConfigured(
+            f"FIELD_COMPRESSION_DICT_ID={dict_id} was not trained for {settings.FIELD_COMPRESSION}."
+        )
+    return codec, level, dict_id
+
+
+def _config(codec=None):
+    if codec is None:
+        return _write_config()
+    codec = CODECS[codec]
+    return codec, DEFAULT_LEVELS.get(codec), None
+
+
+def compress(data, codec=None):
+    """
+    Encode `data` (bytes), header included, with the configured codec or
+    with `codec` ('none', 'zlib' or 'zstd', default level, no dictionary)
+    when given, as migrations do.
+    """
+    return _encode(data, *_config(codec))
+
+
+def _encode(data, codec, level, dict_id):
+    if codec == RAW or len(data) < MIN_COMPRESS_SIZE:
+        return bytes([RAW]) + data
+
+    zdict = get_dictionary(dict_id)[1] if dict_id is not None else None
+    if codec == ZLIB:
+        if zdict is None:
+            payload = zlib.compress(data, level)
+        else:
+            compressor = zlib.compressobj(level, zdict=zdict)
+            payload = compressor.compress(data) + compressor.flush()
+    else:
+        payload = _zstd_codec('compress', dict_id, level).compress(data)
+
+    if dict_id is None:
+        return bytes([codec]) + payload
+    return bytes([codec | DICT_FLAG]) + struct.pack('>I', dict_id) + payload
+
+
+def decompress(blob):
+    """
+    Decode a value written by compress(), whatever codec it used.
+    """
+    blob = bytes(blob)
+    if not blob:
+        return b''
+    codec, payload = blob[0], blob[1:]
+    dict_id = None
+    if codec & DICT_FLAG:
+        codec &= ~DICT_FLAG
+        (dict_id,), payload = struct.unpack('>I', payload[:4]), payload[4:]
+
+    if codec == RAW:
+        return payload
+    if codec == ZLIB:
+        if dict_id is None:
+            return zlib.decompress(payload)
+        decompressor = zlib.decompressobj(zdict=get_dictionary(dict_id)[1])
+        return decompressor.decompress(payload) + decompressor.flush()
+    if codec == ZSTD:
+        return _zstd_codec('decompress', dict_id).decompress(payload)
+    raise ValueError(f"Unknown compression codec {codec}")
+
+
+def stored_codec(blob):
+    """
+    (codec, dictionary id or None) a value written by compress() used.
+    """
+    codec = blob[0]
+    if codec & DICT_FLAG:
+        return codec & ~DICT_FLAG, struct.unpack('>I', blob[1:5])[0]
+    return codec, None
+
+
+def reset_dictionaries():
+    _dictionaries.clear()
+    _zstd_dicts.clear()
+    _local.__dict__.pop('zstd', None)
+
+
+# ----------------------------------------------------------------------
+# Re-encoding stored rows (`manage.py compress_resume_fields`, storage
+# janitor). Saving a row only re-encodes the fields that were assigned, so
+# rows written before FIELD_COMPRESSION was turned on stay as they are
+# until they are rewritten here.
+# ----------------------------------------------------------------------
+
+def recompress(queryset, fields, codec=None, dry_run=False, batch_size=500):
+    """
+    Re-encode `fields` of the rows in `queryset` with the configured codec,
+    or with `codec` (no dictionary). Values already stored that way, or too
+    short to compress, are skipped, and so is a row whose values changed
+    since they were read. Returns the rows rewritten and the size of their
+    values before and after.
+    """
+    target = _config(codec)
+    result = {'rows': 0, 'before': 0, 'after': 0}
+    # Keyset pagination on the primary key: constant memory, no OFFSET scans
+    last_pk = None
+    while True:
+        rows = queryset.order_by('pk')
+        if last_pk is not None:
+            rows = rows.filter(pk__gt=last_pk)
+        batch = list(rows.values_list('pk', *fields)[:batch_size])
+        if not batch:
+            return result
+        last_pk = batch[-1][0]
+
+        for pk, *values in batch:
+            old, new = {}, {}
+            for name, value in zip(fields, values):
+                if value is None or not _needs_recompress(value.data, target):
+                    continue
+                old[name] = value.data
+                new[name] = _encode(decompress(value.data), *target)
+            if not new:
+                continue
+            if not dry_run:
+                # Compare-and-set on the stored bytes: a concurrent save wins
+                updated = queryset.filter(
+                    pk=pk, **{name: _binary(data) for name, data in old.items()}
+                ).update(**{name: _binary(data) for name, data in new.items()})
+                if not updated:
+                    continue
+            result['rows'] += 1
+            result['before'] += sum(map(len, old.values()))
+            result['after'] += sum(map(len, new.values()))
+
+
+def _needs_recompress(blob, target):
+    if not blob:
+        return False
+    codec, dict_id = stored_codec(blob)
+    if (codec, dict_id) == (target[0], target[2]):
+        return False
+    # compress() stores short values raw whatever the codec
+    return not (codec == RAW and len(blob) - 1 < MIN_COMPRESS_SIZE)
+
+
+def _binary(data):
+    # Already-encoded bytes, written and compared as they are instead of
+    # being encoded again by the field
+    return Value(data, output_field=models.BinaryField())
+
+
+# ----------------------------------------------------------------------
+# Dictionary training (`manage.py train_compression_dict`)
+# ----------------------------------------------------------------------
+
+def training_samples(limit=2000):
+    """
+    Recent extracted texts and feedback payloads, as UTF-8 bytes.
+    """
+    Resume = apps.get_model('AI_APP', 'Resume')
+    samples = []
+    for resume in Resume.objects.filter(status='completed').only(
+        'extracted_text', 'full_feedback'
+    )[:limit]:
+        if resume.extracted_text:
+            samples.append(resume.extracted_text.encode('utf-8'))
+        if resume.full_feedback:
+            samples.append(json.dumps(resume.full_feedback, ensure_ascii=False).encode('utf-8'))
+    return samples
+
+
+def train_dictionary(samples, codec, size):
+    """
+    Build a dictionary for `codec` ('zlib' or 'zstd') from `samples`.
+    """
+    if codec == 'zstd':
+        return _zstd().train_dictionary(size, samples).as_bytes()
+    if codec == 'zlib':
+        return _train_zlib_dictionary(samples, min(size, ZLIB_MAX_DICT_SIZE))
+    raise ValueError(f"Can't train a dictionary for {codec!r}")
+
+
+def _train_zlib_dictionary(samples, size):
+    # zlib has no trainer: a preset dictionary is just text the compressor
+    # may back-reference. Use the word n-grams that appear in the most
+    # documents, weighted by length, and put the most valuable ones last
+    # (closest to the data, cheapest to reference).
+    document_frequency = Counter()
+    for sample in samples:
+        words = sample.decode('utf-8', 'ignore').split()
+        grams = set()
+        for n in (1, 2, 3, 4):
+            for i in range(len(words) - n + 1):
+                grams.add(' '.join(words[i:i + n]))
+        document_frequency.update(grams)
+
+    candidates = sorted(
+        (gram for gram, df in document_frequency.items() if df > 1 and len(gram) > 3),
+        key=lambda gram: document_frequency[gram] * len(gram),
+        reverse=True,
+    )
+    chosen, used = [], 0
+    for gram in candidates:
+        if used + len(gram) + 1 > size:
+            continue
+        if any(gram in other for other in chosen[-200:]):
+            continue
+        chosen.append(gram)
+        used += len(gram.encode('utf-8')) + 1
+    return ' '.join(reversed(chosen)).encode('utf-8')[-size:]
@@ -0,0 +1,63 @@
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncJsonWebsocketConsumer
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+
+from .notifications import status_group_name
+
+# Sec-WebSocket-Protocol values offered by the client
+SUBPROTOCOL = "resume-status"
+TOKEN_PREFIX = "access_token."
+
+
+class ResumeStatusConsumer(AsyncJsonWebsocketConsumer):
+    """
+    WebSocket: ws/resumes/status/
+    Sec-WebSocket-Protocol: resume-status, access_token.<access token>
+
+    Subscribes the authenticated user to status changes of all their
+    resumes. Every message is the same JSON the detail endpoint returns,
+    so the client can update its state without another request.
+
+    Browsers can't set an Authorization header on a WebSocket, so the JWT
+    access token is offered as a subprotocol; unlike the query string,
+    headers don't end up in nginx or uvicorn access logs. The server only
+    ever selects `resume-status`.
+    """
+
+    async def connect(self):
+        self.group_name = None
+        user = await self._authenticate()
+        if user is None:
+            await self.close(code=4401)
+            return
+
+        self.group_name = status_group_name(user.id)
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept(subprotocol=SUBPROTOCOL)
+
+    async def disconnect(self, code):
+        if self.group_name:
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    async def resume_status(self, event):
+        await self.send_json(event["resume"])
+
+    async def _authenticate(self):
+        subprotocols = self.scope.get("subprotocols") or []
+        if SUBPROTOCOL not in subprotocols:
+            return None
+        raw_token = next(
+            (p[len(TOKEN_PREFIX):] for p in subprotocols if p.startswith(TOKEN_PREFIX)), None
+        )
+        if not raw_token:
+            return None
+
+        authentication = JWTAuthentication()
+        try:
+            validated_token = authentication.get_validated_token(raw_token)
+            user = await database_sync_to_async(authentication.get_user)(validated_token)
+        except (InvalidToken, TokenError, AuthenticationFailed):
+            return None
+        return user if user.is_active else None
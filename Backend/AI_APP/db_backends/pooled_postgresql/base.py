@@ -0,0 +1,113 @@
+import os
+import threading
+
+from django.core.exceptions import ImproperlyConfigured
+from django.db.backends.postgresql import base
+
+
+# ----------------------------------------------------------------------
+# PostgreSQL with a psycopg 3 connection pool, for Django 4.2.
+#
+# Django 5.1 has this built in (OPTIONS={'pool': ...}); this backend
+# takes the same option, so upgrading is just switching ENGINE back to
+# django.db.backends.postgresql. OPTIONS['pool'] is True or a dict of
+# psycopg_pool.ConnectionPool arguments (min_size, max_size, timeout,
+# max_idle, max_lifetime, ...).
+#
+# Django "closes" its connection after every request (CONN_MAX_AGE must
+# be 0); here that returns it to the pool instead. Connections are shared
+# by every thread of the process (sync_to_async threads, the analyzer
+# pool) up to max_size, and each one is checked with a round trip before
+# it is handed out, so a restarted database or a dropped socket costs a
+# reconnect instead of a failed request.
+#
+# Pools are per process (a pool's threads and sockets don't survive a
+# fork); for pooling across processes put PgBouncer in front.
+# ----------------------------------------------------------------------
+
+_pools = {}
+_lock = threading.Lock()
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    @property
+    def pool(self):
+        options = self.settings_dict['OPTIONS'].get('pool')
+        if not options:
+            return None
+        key = (self.alias, os.getpid())
+        pool = _pools.get(key)
+        if pool is None:
+            with _lock:
+                pool = _pools.get(key)
+                if pool is None:
+                    pool = _pools[key] = self._create_pool({} if options is True else dict(options))
+        return pool
+
+    def _create_pool(self, options):
+        if not base.is_psycopg3:
+            raise ImproperlyConfigured("Connection pooling requires psycopg 3.")
+        if self.settings_dict['CONN_MAX_AGE'] != 0:
+            raise ImproperlyConfigured("Connection pooling requires CONN_MAX_AGE = 0.")
+        try:
+            from psycopg_pool import ConnectionPool
+        except ImportError:
+            raise ImproperlyConfigured("OPTIONS['pool'] requires the 'psycopg_pool' package.")
+
+        return ConnectionPool(
+            kwargs=self.get_connection_params(),
+            # Health check on checkout
+            check=ConnectionPool.check_connection,
+            name=f'{self.alias}-{os.getpid()}',
+            open=True,
+            **options,
+        )
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        params.pop('pool', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        pool = self.pool
+        if pool is None:
+            return super().get_new_connection(conn_params)
+
+        # Same per-connection setup as the stock backend
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = base.IsolationLevel(options['isolation_level'])
+            set_isolation_level = True
+        except KeyError:
+            self.isolation_level = base.IsolationLevel.READ_COMMITTED
+            set_isolation_level = False
+        except ValueError:
+            raise ImproperlyConfigured(
+                f"Invalid transaction isolation level {options['isolation_level']} specified."
+            )
+
+        connection = pool.getconn()
+        if set_isolation_level:
+            connection.isolation_level = self.isolation_level
+        connection.cursor_factory = (
+            base.ServerBindingCursor if options.get('server_side_binding') is True else base.Cursor
+        )
+        return connection
+
+    def _close(self):
+        if self.connection is not None and self.pool is not None:
+            with self.wrap_database_errors:
+                # Back to the pool (rolled back there if a transaction is open)
+                self.pool.putconn(self.connection)
+                self.connection = None
+            return
+        return super()._close()
+
+
+def close_pools():
+    """
+    Close this process's pools (gunicorn worker exit).
+    """
+    with _lock:
+        for key in [key for key in _pools if key[1] == os.getpid()]:
+            _pools.pop(key).close()
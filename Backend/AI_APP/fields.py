@@ -0,0 +1,110 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import models
+from django.db.models.query_utils import DeferredAttribute
+
+from .compression import compress, decompress
+
+
+# ----------------------------------------------------------------------
+# Compressed model fields for large values that are written once and
+# rarely read again (see AI_APP/compression.py for the storage format).
+#
+# Loading a row does not decompress anything: the attribute holds a
+# `Compressed` wrapper until it is first read, so list endpoints that never
+# touch `extracted_text` don't pay for it, and saving an instance whose
+# field was never read writes the stored bytes back as they are.
+#
+# The columns are binary, so these fields can't be filtered on by content.
+# values() / values_list() return `Compressed` wrappers, use `.value`.
+# ----------------------------------------------------------------------
+
+
+class Compressed:
+    """
+    A stored value that hasn't been decompressed yet.
+    """
+    __slots__ = ('data', 'field')
+
+    def __init__(self, data, field):
+        self.data = data
+        self.field = field
+
+    @property
+    def value(self):
+        return self.field.decode(decompress(self.data))
+
+    def __repr__(self):
+        return f"<Compressed {self.field.name}: {len(self.data)} bytes>"
+
+
+class CompressedAttribute(DeferredAttribute):
+    # A data descriptor (has __set__), so reads go through __get__ even
+    # though the value lives in instance.__dict__. Decompresses on first
+    # access and keeps the result on the instance.
+    def __set__(self, instance, value):
+        instance.__dict__[self.field.attname] = value
+
+    def __get__(self, instance, cls=None):
+        value = super().__get__(instance, cls)
+        if isinstance(value, Compressed):
+            value = value.value
+            instance.__dict__[self.field.attname] = value
+        return value
+
+
+class CompressedField(models.BinaryField):
+    descriptor_class = CompressedAttribute
+
+    def encode(self, value):
+        raise NotImplementedError
+
+    def decode(self, data):
+        raise NotImplementedError
+
+    def _check_str_default_value(self):
+        # Defaults are Python values ('' / None), encoded on save
+        return []
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return None
+        return Compressed(bytes(value), self)
+
+    def get_prep_value(self, value):
+        value = super().get_prep_value(value)
+        if value is None:
+            return None
+        if isinstance(value, Compressed):
+            return value.data
+        return compress(self.encode(value))
+
+    def to_python(self, value):
+        # BinaryField would base64-decode strings here
+        if isinstance(value, Compressed):
+            return value.value
+        return value
+
+    def value_to_string(self, obj):
+        return self.value_from_object(obj)
+
+
+class CompressedTextField(CompressedField):
+    def encode(self, value):
+        return str(value).encode('utf-8')
+
+    def decode(self, data):
+        return data.decode('utf-8')
+
+
+class CompressedJSONField(CompressedField):
+    empty_strings_allowed = False
+
+    def encode(self, value):
+        return json.dumps(
+            value, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(',', ':')
+        ).encode('utf-8')
+
+    def decode(self, data):
+        return json.loads(data)
@@ -0,0 +1,281 @@
+import logging
+import os
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.db.models import F, Q
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .compression import recompress
+from .models import PendingFileDeletion, Resume
+from .notifications import publish_resume_status
+from .rollups import forget_analysis
+from .routers import mark_user_write
+
+
+# ----------------------------------------------------------------------
+# Storage lifecycle, run in the background by `manage.py storage_janitor`.
+#
+# 1. Deferred deletion: DELETE /api/resumes/{id}/ only records the PDF in
+#    PendingFileDeletion; the janitor removes the file and retries on
+#    errors (e.g. PermissionError on Windows) instead of leaking it.
+# 2. Orphan sweep: files under MEDIA_ROOT/resumes/ that no Resume points
+#    to (older than a grace period, so in-flight uploads are safe). A
+#    sweep that would delete more than ORPHAN_SWEEP_MAX_FILES files, or
+#    any file while there are no Resume rows at all (wrong or freshly
+#    created database), is refused instead.
+# 3. Retention:
+#    - completed analyses: drop the PDF after RESUME_PDF_RETENTION_DAYS,
+#      keep the analysis
+#    - failed / abandoned uploads: drop PDF and extracted text after
+#      FAILED_UPLOAD_RETENTION_DAYS. Both are timed from the last analysis
+#      attempt, not the upload, so reanalysing an old resume is safe
+#    - compress extracted_text of analyses older than
+#      EXTRACTED_TEXT_COMPACT_AFTER_DAYS (it is rarely read again), with
+#      FIELD_COMPRESSION or zlib when compression is off for new writes
+#
+# With dry_run nothing is changed; the counts are what a real pass would
+# have affected.
+# ----------------------------------------------------------------------
+
+UPLOAD_DIR = 'resumes'
+BATCH_SIZE = 500
+
+logger = logging.getLogger(__name__)
+
+
+def schedule_file_deletion(name):
+    """
+    Queue a stored file for deletion by the janitor.
+    """
+    if name:
+        PendingFileDeletion.objects.create(name=name)
+
+
+def process_deletions(limit=1000, dry_run=False):
+    """
+    Delete queued files. Returns (deleted, failed).
+    """
+    if dry_run:
+        return min(PendingFileDeletion.objects.count(), limit), 0
+
+    deleted = failed = 0
+    for pending in PendingFileDeletion.objects.all()[:limit]:
+        # Never delete a name that a Resume points to (again)
+        if Resume.objects.filter(pdf_file=pending.name).exists():
+            pending.delete()
+            continue
+        try:
+            default_storage.delete(pending.name)
+        except OSError as e:
+            pending.attempts += 1
+            pending.last_error = str(e)[:500]
+            pending.save(update_fields=['attempts', 'last_error'])
+            failed += 1
+            continue
+        pending.delete()
+        deleted += 1
+    return deleted, failed
+
+
+def sweep_orphans(grace_seconds=None, dry_run=False, force=False):
+    """
+    Delete files in MEDIA_ROOT/resumes/ with no Resume row. Returns a dict
+    with the orphans found, files deleted, bytes freed and why the sweep
+    was refused (None if it wasn't). `force` skips the safety checks.
+    """
+    grace_seconds = settings.ORPHAN_FILE_GRACE_SECONDS if grace_seconds is None else grace_seconds
+    cutoff = time.time() - grace_seconds
+
+    orphans = []
+    batch = []
+    for name, size, mtime in _iter_uploads():
+        if mtime > cutoff:
+            continue
+        batch.append((name, size))
+        if len(batch) >= BATCH_SIZE:
+            orphans += _unreferenced(batch)
+            batch = []
+    if batch:
+        orphans += _unreferenced(batch)
+
+    result = {'found': len(orphans), 'deleted': 0, 'freed': 0, 'refused': None}
+    if orphans and not force:
+        if not Resume.objects.exists():
+            result['refused'] = "the database has no resumes"
+        elif len(orphans) > settings.ORPHAN_SWEEP_MAX_FILES:
+            result['refused'] = f"more than ORPHAN_SWEEP_MAX_FILES ({settings.ORPHAN_SWEEP_MAX_FILES}) orphans"
+    if result['refused'] or dry_run:
+        return result
+
+    for start in range(0, len(orphans), BATCH_SIZE):
+        # Checked again: a row may have started pointing to it meanwhile
+        for name, size in _unreferenced(orphans[start:start + BATCH_SIZE]):
+            try:
+                default_storage.delete(name)
+            except OSError:
+                logger.warning("Could not delete orphan %s", name, exc_info=True)
+                continue
+            result['deleted'] += 1
+            result['freed'] += size
+    return result
+
+
+def _unreferenced(batch):
+    referenced = set(
+        Resume.objects.filter(pdf_file__in=[name for name, _ in batch])
+        .values_list('pdf_file', flat=True)
+    )
+    return [(name, size) for name, size in batch if name not in referenced]
+
+
+def enforce_retention(dry_run=False):
+    """
+    Apply the retention settings. Returns a dict of affected row counts.
+    """
+    now = timezone.now()
+    result = {'pdfs_dropped': 0, 'abandoned': 0, 'failed_cleared': 0, 'texts_compacted': 0}
+
+    if settings.RESUME_PDF_RETENTION_DAYS:
+        expired = Resume.objects.filter(
+            status='completed',
+            analyzed_at__lt=now - timedelta(days=settings.RESUME_PDF_RETENTION_DAYS),
+        ).exclude(pdf_file='')
+        result['pdfs_dropped'] = expired.count() if dry_run else _drop_pdfs(expired, now)
+
+    if settings.FAILED_UPLOAD_RETENTION_DAYS:
+        cutoff = now - timedelta(days=settings.FAILED_UPLOAD_RETENTION_DAYS)
+        # Jobs stuck in pending/processing this long were abandoned
+        abandoned = _abandoned(cutoff)
+        # pdf_purged_at marks rows already cleared, so each pass only
+        # touches newly expired ones
+        failed = Resume.objects.alias(
+            failed_at=Coalesce('analyzed_at', 'created_at'),
+        ).filter(status='failed', failed_at__lt=cutoff, pdf_purged_at__isnull=True)
+        if dry_run:
+            result['abandoned'] = abandoned.count()
+            result['failed_cleared'] = failed.exclude(pdf_file='').count()
+        else:
+            result['abandoned'] = _fail_abandoned(abandoned, now)
+            failed.update(extracted_text='')
+            result['failed_cleared'] = _drop_pdfs(failed.exclude(pdf_file=''), now)
+            failed.update(pdf_purged_at=now)
+
+    if settings.EXTRACTED_TEXT_COMPACT_AFTER_DAYS:
+        result['texts_compacted'] = _compact_texts(
+            now - timedelta(days=settings.EXTRACTED_TEXT_COMPACT_AFTER_DAYS), now, dry_run
+        )
+
+    return result
+
+
+def _abandoned(cutoff):
+    # Timed from the worker's last heartbeat, or when the job was last
+    # started or queued; rows from before those were recorded fall back to
+    # the upload time
+    return Resume.objects.alias(
+        active_at=Coalesce('heartbeat_at', 'started_at', 'queued_at', 'created_at'),
+    ).filter(status__in=['pending', 'processing'], active_at__lt=cutoff)
+
+
+def _fail_abandoned(queryset, now):
+    """
+    Mark abandoned uploads failed one by one, like a failed analysis: a
+    reanalysis that was already counted leaves the rollups, and the owner
+    is notified.
+    """
+    failed = 0
+    for resume in list(queryset):
+        # Compare-and-set, in case a worker finishes or restarts it right now
+        updated = queryset.filter(pk=resume.pk).update(
+            status='failed', weaknesses=["Upload abandoned"], analyzed_at=now
+        )
+        if not updated:
+            continue
+        forget_analysis(resume)
+        resume.status = 'failed'
+        resume.weaknesses = ["Upload abandoned"]
+        resume.analyzed_at = now
+        mark_user_write(resume.user_id)
+        publish_resume_status(resume)
+        failed += 1
+    return failed
+
+
+def _compact_texts(cutoff, now, dry_run):
+    # text_compacted_at marks analyses already compacted; a reanalysis
+    # writes a new text, so it is compacted again once it is old enough
+    queryset = Resume.objects.filter(status='completed', analyzed_at__lt=cutoff).filter(
+        Q(text_compacted_at__isnull=True) | Q(text_compacted_at__lt=F('analyzed_at'))
+    )
+    codec = None if settings.FIELD_COMPRESSION != 'none' else 'zlib'
+    compacted = recompress(queryset, ['extracted_text'], codec=codec, dry_run=dry_run)['rows']
+    if not dry_run:
+        queryset.update(text_compacted_at=now)
+    return compacted
+
+
+def _drop_pdfs(queryset, now):
+    dropped = 0
+    while True:
+        rows = list(queryset.values_list('pk', 'pdf_file')[:BATCH_SIZE])
+        if not rows:
+            return dropped
+        with transaction.atomic():
+            PendingFileDeletion.objects.bulk_create(
+                [PendingFileDeletion(name=name) for _, name in rows]
+            )
+            Resume.objects.filter(pk__in=[pk for pk, _ in rows]).update(
+                pdf_file='', pdf_purged_at=now
+            )
+        dropped += len(rows)
+
+
+def _iter_uploads():
+    root = os.path.join(settings.MEDIA_ROOT, UPLOAD_DIR)
+    if not os.path.isdir(root):
+        return
+    for entry in os.scandir(root):
+        if entry.is_file():
+            stat = entry.stat()
+            yield f"{UPLOAD_DIR}/{entry.name}", stat.st_size, stat.st_mtime
+
+
+def disk_usage():
+    """
+    Files and bytes currently under MEDIA_ROOT/resumes/.
+    """
+    files = size = 0
+    for _, file_size, _ in _iter_uploads():
+        files += 1
+        size += file_size
+    return {'files': files, 'bytes': size}
+
+
+def run_janitor(dry_run=False, force=False):
+    """
+    One full janitor pass. Returns a report with per-step durations and
+    disk usage before/after.
+    """
+    report = {'disk_before': disk_usage(), 'dry_run': dry_run}
+    started = time.perf_counter()
+
+    step = time.perf_counter()
+    report['retention'] = enforce_retention(dry_run=dry_run)
+    report['retention_seconds'] = time.perf_counter() - step
+
+    step = time.perf_counter()
+    report['deleted'], report['delete_failures'] = process_deletions(dry_run=dry_run)
+    report['deletion_seconds'] = time.perf_counter() - step
+
+    step = time.perf_counter()
+    report['orphans'] = sweep_orphans(dry_run=dry_run, force=force)
+    report['sweep_seconds'] = time.perf_counter() - step
+
+    report['disk_after'] = disk_usage()
+    report['total_seconds'] = time.perf_counter() - started
+    return report
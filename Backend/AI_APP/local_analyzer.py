@@ -0,0 +1,194 @@
+import re
+
+from django.conf import settings
+
+from .utils import extract_json_from_response, is_unparsed_feedback
+
+
+# ----------------------------------------------------------------------
+# Local analysis, used when no remote backend is configured or all of
+# them are failing (see AI_APP/analyzers.py). Runs on CPU in-process.
+#
+# By default it is a deterministic heuristic scorer: the same text always
+# gets the same feedback, it takes a few milliseconds and needs nothing
+# beyond the standard library. With USE_LOCAL_TRANSFORMERS=True and the
+# `transformers` package installed, LOCAL_MODEL_NAME is asked first and
+# the heuristic only fills in if its output isn't usable JSON.
+# ----------------------------------------------------------------------
+
+# Section headings a recruiter (and an ATS) expects, with common variants
+SECTIONS = {
+    'summary': ('summary', 'profile', 'objective', 'about me'),
+    'experience': ('experience', 'employment', 'work history'),
+    'education': ('education', 'academic'),
+    'skills': ('skills', 'technologies', 'tech stack'),
+    'projects': ('projects', 'portfolio'),
+}
+
+# Skills expected for a full-stack developer position, with the spellings
+# they show up under in resumes
+FULL_STACK_SKILLS = {
+    'JavaScript': r'javascript|\bjs\b|es6',
+    'TypeScript': r'typescript',
+    'React': r'react',
+    'HTML/CSS': r'\bhtml|\bcss|tailwind|sass',
+    'Node.js': r'node\.?js|express',
+    'Python': r'python|django|flask|fastapi',
+    'SQL databases': r'\bsql\b|postgres|mysql|sqlite',
+    'REST APIs': r'\brest\b|restful|\bapis?\b',
+    'Git': r'\bgit\b|github|gitlab',
+    'Docker': r'docker|container',
+    'CI/CD': r'ci/cd|\bci\b|github actions|jenkins|pipeline',
+    'Cloud (AWS/GCP/Azure)': r'\baws\b|gcp|google cloud|azure|heroku|vercel',
+    'Testing': r'testing|pytest|jest|unit test|cypress',
+}
+
+ACTION_VERBS = (
+    'built', 'designed', 'developed', 'implemented', 'led', 'launched', 'migrated',
+    'optimized', 'optimised', 'automated', 'reduced', 'improved', 'increased', 'created',
+    'delivered', 'shipped', 'architected', 'refactored', 'deployed', 'integrated',
+)
+
+_EMAIL_RE = re.compile(r'[\w.+-]+@[\w-]+\.[\w.]+')
+_PHONE_RE = re.compile(r'\+?\d[\d\s().-]{7,}\d')
+_LINK_RE = re.compile(r'linkedin|github\.com|portfolio|https?://', re.IGNORECASE)
+_NUMBER_RE = re.compile(r'\d+\s*(%|\+|k\b|x\b|ms\b|users|customers|requests)|\$\s*\d', re.IGNORECASE)
+
+_pipeline = None
+
+
+def _clamp(score):
+    return max(0, min(100, int(round(score))))
+
+
+def heuristic_feedback(resume_text):
+    """
+    Score `resume_text` without a model, in the same format as the LLM
+    feedback.
+    """
+    text = resume_text or ''
+    lower = text.lower()
+    lines = [line.strip() for line in text.splitlines() if line.strip()]
+    words = lower.split()
+
+    found_sections = [
+        name for name, headings in SECTIONS.items()
+        if any(re.search(rf'^\W*{heading}\b', line.lower()) for line in lines for heading in headings)
+    ]
+    missing_sections = [name for name in SECTIONS if name not in found_sections]
+    skills = [name for name, pattern in FULL_STACK_SKILLS.items() if re.search(pattern, lower)]
+    missing_skills = [name for name in FULL_STACK_SKILLS if name not in skills]
+
+    bullets = [line for line in lines if len(line.split()) >= 5]
+    quantified = [line for line in bullets if _NUMBER_RE.search(line)]
+    with_verbs = [
+        line for line in bullets
+        if line.lstrip('-•*· ').split(' ', 1)[0].lower().rstrip(',') in ACTION_VERBS
+    ]
+    has_email = bool(_EMAIL_RE.search(text))
+    has_phone = bool(_PHONE_RE.search(text))
+    has_links = bool(_LINK_RE.search(text))
+
+    quantified_share = len(quantified) / len(bullets) if bullets else 0
+    verb_share = len(with_verbs) / len(bullets) if bullets else 0
+    # 350-900 words is one to two pages
+    length_score = 1.0 if 350 <= len(words) <= 900 else max(0.0, 1 - abs(len(words) - 600) / 900)
+
+    overall = (
+        30 * len(found_sections) / len(SECTIONS)
+        + 30 * len(skills) / len(FULL_STACK_SKILLS)
+        + 20 * min(1.0, quantified_share / 0.5)
+        + 10 * min(1.0, verb_share / 0.5)
+        + 10 * length_score
+    )
+    non_ascii = sum(1 for char in text if ord(char) > 127) / max(len(text), 1)
+    ats = (
+        40 * len(found_sections) / len(SECTIONS)
+        + 10 * has_email + 10 * has_phone
+        + 20 * length_score
+        + 20 * (1 - min(1.0, non_ascii * 20))
+    )
+
+    strengths, weaknesses, suggestions = [], [], []
+    if skills:
+        strengths.append(f"Covers {len(skills)} core full-stack skills ({', '.join(skills[:4])})")
+    if quantified_share >= 0.3:
+        strengths.append(f"{len(quantified)} achievements are backed by numbers")
+    if verb_share >= 0.3:
+        strengths.append("Bullet points start with strong action verbs")
+    if not missing_sections:
+        strengths.append("Has all the standard resume sections")
+    if has_email and has_phone:
+        strengths.append("Contact details are easy to find")
+
+    if missing_sections:
+        weaknesses.append(f"Missing sections: {', '.join(missing_sections)}")
+        suggestions.append(f"Add clearly titled {', '.join(missing_sections)} section(s)")
+    if quantified_share < 0.3:
+        weaknesses.append("Few achievements are quantified")
+        suggestions.append("Quantify impact (users, latency, revenue, % improvement) in each bullet")
+    if verb_share < 0.3:
+        weaknesses.append("Bullet points rarely start with an action verb")
+        suggestions.append("Start each bullet with a verb such as Built, Led, Reduced or Shipped")
+    if len(words) < 350:
+        weaknesses.append("Resume is short on detail")
+        suggestions.append("Describe your projects and responsibilities in more depth")
+    elif len(words) > 900:
+        weaknesses.append("Resume is longer than two pages")
+        suggestions.append("Trim older or less relevant roles to keep it to one or two pages")
+    if not (has_email and has_phone):
+        weaknesses.append("Contact details are incomplete")
+        suggestions.append("Put your email and phone number at the top")
+    if not has_links:
+        suggestions.append("Link your GitHub, portfolio or LinkedIn profile")
+    if missing_skills:
+        suggestions.append(f"Show experience with {', '.join(missing_skills[:3])} if you have it")
+
+    return {
+        "overall_score": _clamp(overall),
+        "strengths": strengths or ["Resume text was readable"],
+        "weaknesses": weaknesses or ["No major structural issues found"],
+        "missing_skills": missing_skills,
+        "improvement_suggestions": suggestions or ["Tailor the summary to each job you apply for"],
+        "ats_score": _clamp(ats),
+    }
+
+
+def get_local_pipeline():
+    """
+    Return the transformers text2text pipeline for LOCAL_MODEL_NAME, or None
+    if USE_LOCAL_TRANSFORMERS is off or transformers isn't installed.
+    Loaded once per process; the first call downloads / loads the model.
+    """
+    global _pipeline
+    if not settings.USE_LOCAL_TRANSFORMERS:
+        return None
+    if _pipeline is None:
+        try:
+            from transformers import pipeline
+        except ImportError:
+            print("USE_LOCAL_TRANSFORMERS is set but transformers is not installed")
+            return None
+        _pipeline = pipeline('text2text-generation', model=settings.LOCAL_MODEL_NAME, device=-1)
+    return _pipeline
+
+
+def analyze_locally(request):
+    """
+    Feedback for a request built by AI_APP/prompts.py, computed in-process.
+    """
+    generator = get_local_pipeline()
+    if generator is not None:
+        try:
+            output = generator(
+                f"{request['system']}\n\n{request['prompt']}",
+                max_new_tokens=request['max_tokens'], do_sample=False,
+            )[0]['generated_text']
+            feedback = extract_json_from_response(output)
+            if not is_unparsed_feedback(feedback) and isinstance(feedback.get('overall_score'), (int, float)):
+                return feedback
+            print("Local model output was not usable, using the heuristic scorer")
+        except Exception as e:
+            print(f"Local model error: {e}")
+
+    return heuristic_feedback(request['resume_text'])
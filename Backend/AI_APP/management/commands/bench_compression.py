@@ -0,0 +1,185 @@
+import json
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Sum
+from django.db.models.functions import Coalesce, Length
+from django.test import override_settings
+
+from AI_APP.compression import reset_dictionaries, train_dictionary
+from AI_APP.models import CompressionDictionary, Resume, User
+from AI_APP.serializers import ResumeAnalysisSerializer
+
+
+SKILLS = [
+    "Python", "Django", "Django REST Framework", "React", "TypeScript", "PostgreSQL",
+    "Redis", "Docker", "Kubernetes", "AWS", "GraphQL", "Celery", "CI/CD", "Terraform",
+    "Linux", "Nginx", "Kafka", "MongoDB", "Go", "Java", "Spring Boot", "Node.js",
+]
+VERBS = ["Built", "Designed", "Led", "Migrated", "Optimised", "Automated", "Maintained", "Shipped"]
+THINGS = [
+    "a REST API serving {n}k requests per day", "the CI/CD pipeline for {n} services",
+    "a data pipeline processing {n} GB daily", "the billing system used by {n}k customers",
+    "an internal dashboard adopted by {n} teams", "the on-call process, cutting incidents by {n}%",
+]
+FIELDS = ("extracted_text", "full_feedback", "analysis_result")
+
+
+def synthetic_resume(i):
+    """
+    A generated resume text and matching feedback, for benchmarks.
+    """
+    skills = random.sample(SKILLS, random.randint(5, 10))
+    lines = [
+        f"Candidate {i}", f"candidate{i}@example.com | +1 555 {random.randint(1000, 9999)}",
+        "SUMMARY",
+        f"Software engineer with {random.randint(2, 15)} years of experience in {', '.join(skills[:3])}.",
+        "EXPERIENCE",
+    ]
+    for job in range(random.randint(2, 4)):
+        lines.append(f"Senior Software Engineer, Company {random.randint(1, 500)} "
+                     f"({2010 + job * 3} - {2013 + job * 3})")
+        for _ in range(random.randint(3, 6)):
+            thing = random.choice(THINGS).format(n=random.randint(2, 900))
+            lines.append(f"- {random.choice(VERBS)} {thing} using {random.choice(skills)}")
+    lines += ["SKILLS", ", ".join(skills), "EDUCATION",
+              f"B.Sc. Computer Science, University {random.randint(1, 80)}"]
+
+    missing = random.sample([s for s in SKILLS if s not in skills], 3)
+    feedback = {
+        "overall_score": random.randint(40, 95),
+        "strengths": [f"Strong experience with {s}" for s in skills[:3]],
+        "weaknesses": ["Few quantified results", "Summary is generic"],
+        "missing_skills": missing,
+        "improvement_suggestions": [
+            f"Add a project that shows {s}" for s in missing
+        ] + ["Quantify impact in every bullet point"],
+        "ats_score": random.randint(40, 95),
+    }
+    return "\n".join(lines), feedback
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a corpus of resume texts and feedback, then compare stored size and "
+        "read/write latency for each codec (none, zlib, zstd, with and without a "
+        "trained dictionary)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--resumes", type=int, default=2000)
+        parser.add_argument("--repeat", type=int, default=20, help="Timed reads per codec.")
+        parser.add_argument("--keep", action="store_true", help="Keep the seeded user and rows.")
+
+    def handle(self, *args, **options):
+        random.seed(42)
+        email = "bench-compression@example.com"
+        User.objects.filter(email=email).delete()
+        user = User.objects.create(email=email, username="bench-compression")
+        dictionaries = []
+
+        try:
+            documents = [synthetic_resume(i) for i in range(options["resumes"])]
+            with override_settings(FIELD_COMPRESSION="none"):
+                Resume.objects.bulk_create(
+                    [
+                        Resume(user=user, file_name=f"bench_{i}.pdf", pdf_file="", status="completed",
+                               extracted_text=text, full_feedback=feedback, analysis_result=feedback)
+                        for i, (text, feedback) in enumerate(documents)
+                    ],
+                    batch_size=500,
+                )
+            resumes = list(Resume.objects.filter(user=user).only("pk"))
+
+            # Dictionaries are trained on a fifth of the corpus
+            samples = []
+            for text, feedback in documents[::5]:
+                samples += [text.encode("utf-8"), json.dumps(feedback, ensure_ascii=False).encode("utf-8")]
+            configs = [("none", None), ("zlib", None)]
+            dictionaries.append(CompressionDictionary.objects.create(
+                codec="zlib", data=train_dictionary(samples, "zlib", 32 * 1024)))
+            configs.append(("zlib", dictionaries[-1].pk))
+            try:
+                import zstandard  # noqa: F401
+            except ImportError:
+                self.stdout.write("zstandard not installed, skipping zstd")
+            else:
+                configs.append(("zstd", None))
+                dictionaries.append(CompressionDictionary.objects.create(
+                    codec="zstd", data=train_dictionary(samples, "zstd", 64 * 1024)))
+                configs.append(("zstd", dictionaries[-1].pk))
+
+            self.stdout.write(
+                f"{'codec':<16}{'stored':>12}{'ratio':>8}{'write/row':>12}"
+                f"{'list page':>12}{'list+text':>12}{'full scan':>12}"
+            )
+            baseline = None
+            for codec, dict_id in configs:
+                with override_settings(FIELD_COMPRESSION=codec, FIELD_COMPRESSION_DICT_ID=dict_id):
+                    write_us = self._rewrite(resumes, documents)
+                reset_dictionaries()
+
+                stored = self._stored_bytes(user)
+                baseline = baseline or stored
+                page_ms = self._time(lambda: self._list_page(user, touch_text=False), options["repeat"])
+                page_text_ms = self._time(lambda: self._list_page(user, touch_text=True), options["repeat"])
+                scan_ms = self._time(lambda: self._full_scan(user), max(1, options["repeat"] // 5))
+
+                name = codec + ("+dict" if dict_id else "")
+                self.stdout.write(
+                    f"{name:<16}{stored / 1024 / 1024:>9.2f} MB{baseline / stored:>7.2f}x"
+                    f"{write_us:>9.1f} us{page_ms:>9.2f} ms{page_text_ms:>9.2f} ms{scan_ms:>9.1f} ms"
+                )
+
+            self.stdout.write(
+                "stored = bytes in extracted_text/full_feedback/analysis_result; "
+                "list page = 20 serialized resumes (extracted_text not read); "
+                "list+text = same, also reading extracted_text; full scan = every row's text"
+            )
+            if connection.vendor == "postgresql":
+                self.stdout.write(
+                    "note: PostgreSQL already pglz-compresses values over ~2 KB in TOAST, so the "
+                    "'none' row overstates the on-disk size of the old TextField."
+                )
+        finally:
+            if not options["keep"]:
+                user.delete()
+                CompressionDictionary.objects.filter(pk__in=[d.pk for d in dictionaries]).delete()
+                reset_dictionaries()
+
+    def _rewrite(self, resumes, documents):
+        for resume, (text, feedback) in zip(resumes, documents):
+            resume.extracted_text = text
+            resume.full_feedback = feedback
+            resume.analysis_result = feedback
+        started = time.perf_counter()
+        Resume.objects.bulk_update(resumes, list(FIELDS), batch_size=500)
+        return (time.perf_counter() - started) * 1_000_000 / len(resumes)
+
+    def _stored_bytes(self, user):
+        totals = Resume.objects.filter(user=user).aggregate(
+            **{field: Sum(Coalesce(Length(field), 0)) for field in FIELDS}
+        )
+        return sum(value or 0 for value in totals.values())
+
+    def _list_page(self, user, touch_text):
+        resumes = list(Resume.objects.filter(user=user)[:20])
+        data = ResumeAnalysisSerializer(resumes, many=True).data
+        if touch_text:
+            for resume in resumes:
+                resume.extracted_text
+        return data
+
+    def _full_scan(self, user):
+        return sum(len(r.extracted_text) for r in Resume.objects.filter(user=user).iterator(chunk_size=500))
+
+    def _time(self, fn, repeat):
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - started) * 1000)
+        return statistics.median(samples)
@@ -0,0 +1,115 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.test import override_settings
+
+from AI_APP.management.commands.bench_compression import VERBS, THINGS, SKILLS, synthetic_resume
+from AI_APP.models import Resume, ResumeLSHBucket, User
+from AI_APP.similarity import (
+    band_keys,
+    estimate_similarity,
+    find_similar,
+    minhash,
+    pack_signature,
+    unpack_signature,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed upload histories of growing size (resumes in families of edited versions) "
+        "and compare near-duplicate lookup through the LSH index with a full scan."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="100,1000,10000",
+                            help="Comma-separated history sizes (resumes per user).")
+        parser.add_argument("--versions", type=int, default=5, help="Edited versions per base resume.")
+        parser.add_argument("--repeat", type=int, default=50, help="Timed lookups per size.")
+
+    def handle(self, *args, **options):
+        random.seed(7)
+        email = "bench-lsh@example.com"
+        sizes = [int(size) for size in options["sizes"].split(",")]
+
+        self.stdout.write(
+            f"{'history':>8}{'sign/resume':>13}{'candidates':>12}{'lsh lookup':>12}"
+            f"{'full scan':>12}{'hit':>6}{'est.':>7}{'novel':>8}"
+        )
+        for size in sizes:
+            User.objects.filter(email=email).delete()
+            user = User.objects.create(email=email, username="bench-lsh")
+            try:
+                self._bench(user, size, options)
+            finally:
+                user.delete()
+
+    def _bench(self, user, size, options):
+        texts, sign_ms = [], []
+        while len(texts) < size:
+            base, _ = synthetic_resume(len(texts))
+            texts.append(base)
+            for _ in range(options["versions"] - 1):
+                texts.append(_edit(texts[-1]))
+        texts = texts[:size]
+
+        resumes, buckets = [], []
+        for i, text in enumerate(texts):
+            started = time.perf_counter()
+            signature = minhash(text)
+            sign_ms.append((time.perf_counter() - started) * 1000)
+            resume = Resume(user=user, file_name=f"bench_{i}.pdf", pdf_file="", status="completed",
+                            minhash=pack_signature(signature))
+            resumes.append(resume)
+            buckets += [ResumeLSHBucket(user=user, resume=resume, key=key) for key in band_keys(signature)]
+        with override_settings(FIELD_COMPRESSION="none"):
+            Resume.objects.bulk_create(resumes, batch_size=1000)
+        ResumeLSHBucket.objects.bulk_create(buckets, batch_size=5000)
+
+        # A new version of a random resume, and an unrelated one
+        source = random.randrange(size)
+        near = minhash(_edit(texts[source]))
+        novel = minhash(synthetic_resume(size + 1)[0])
+
+        lsh_ms = self._time(lambda: find_similar(user.pk, near), options["repeat"])
+        scan_ms = self._time(lambda: self._full_scan(user, near), max(1, options["repeat"] // 5))
+        candidates = (
+            ResumeLSHBucket.objects.filter(user=user, key__in=band_keys(near))
+            .values("resume_id").distinct().count()
+        )
+        match_id, similarity = find_similar(user.pk, near)
+        best_id, _ = self._full_scan(user, near)
+        novel_id, novel_similarity = find_similar(user.pk, novel)
+
+        self.stdout.write(
+            f"{size:>8}{statistics.median(sign_ms):>10.2f} ms{candidates:>12}{lsh_ms:>9.2f} ms"
+            f"{scan_ms:>9.2f} ms{'yes' if match_id == best_id else 'no':>6}{similarity:>7.2f}"
+            f"{novel_similarity:>8.2f}"
+        )
+
+    def _full_scan(self, user, signature):
+        best_id, best = None, 0.0
+        for pk, data in Resume.objects.filter(user=user).values_list("pk", "minhash"):
+            similarity = estimate_similarity(signature, unpack_signature(data))
+            if similarity > best:
+                best_id, best = pk, similarity
+        return best_id, best
+
+    def _time(self, fn, repeat):
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - started) * 1000)
+        return statistics.median(samples)
+
+
+def _edit(text):
+    # Rewrite one bullet point, the way users tweak a resume between uploads
+    lines = text.split("\n")
+    bullets = [i for i, line in enumerate(lines) if line.startswith("- ")]
+    thing = random.choice(THINGS).format(n=random.randint(2, 900))
+    lines[random.choice(bullets)] = f"- {random.choice(VERBS)} {thing} using {random.choice(SKILLS)}"
+    return "\n".join(lines)
@@ -0,0 +1,133 @@
+import asyncio
+import os
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+SCENARIOS = ("list", "retrieve", "upload")
+
+
+class Command(BaseCommand):
+    help = (
+        "Load-test one or more running deployments with concurrent authenticated "
+        "requests and compare throughput/latency, e.g. the sync gunicorn backend "
+        "against the ASGI (uvicorn) profile. Scenarios: list (GET --path), retrieve "
+        "(GET one resume) and upload (POST --pdf; raise THROTTLE_UPLOADS_RATE on the "
+        "targets, every request creates a resume)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--target",
+            action="append",
+            required=True,
+            help="name=base_url, e.g. sync=http://localhost:8000 (repeatable)",
+        )
+        parser.add_argument("--token", required=True, help="JWT access token used for every request")
+        parser.add_argument(
+            "--scenario",
+            action="append",
+            choices=SCENARIOS,
+            help="Repeatable (default: list and retrieve).",
+        )
+        parser.add_argument("--path", default="/api/resumes/", help="Path for the list scenario")
+        parser.add_argument("--resume-id", help="Resume to retrieve (default: the newest one of the token's user)")
+        parser.add_argument("--pdf", help="PDF to upload in the upload scenario")
+        parser.add_argument("--concurrency", type=int, default=200)
+        parser.add_argument("--requests", type=int, default=2000)
+        parser.add_argument("--timeout", type=float, default=60.0)
+
+    def handle(self, *args, **options):
+        targets = []
+        for target in options["target"]:
+            name, sep, base_url = target.partition("=")
+            if not sep:
+                raise CommandError(f"--target must look like name=url, got {target!r}")
+            targets.append((name, base_url.rstrip("/")))
+
+        scenarios = options["scenario"] or ["list", "retrieve"]
+        if "upload" in scenarios:
+            if not options["pdf"]:
+                raise CommandError("The upload scenario needs --pdf.")
+            with open(options["pdf"], "rb") as f:
+                options["pdf_bytes"] = f.read()
+
+        self.stdout.write(f"{options['requests']} requests per scenario at concurrency {options['concurrency']}")
+        self.stdout.write(
+            f"{'scenario':<10} {'target':<10} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}"
+        )
+        for scenario in scenarios:
+            for name, base_url in targets:
+                result = asyncio.run(self._run(scenario, base_url, options))
+                self.stdout.write(
+                    f"{scenario:<10} {name:<10} {result['rps']:>9.1f} {result['p50']:>9.1f} "
+                    f"{result['p95']:>9.1f} {result['p99']:>9.1f} {result['errors']:>7}"
+                )
+
+    async def _request_factory(self, scenario, client, base_url, options):
+        """
+        A coroutine function sending one request of `scenario`.
+        """
+        if scenario == "list":
+            url = base_url + options["path"]
+            return lambda: client.get(url)
+
+        if scenario == "retrieve":
+            resume_id = options["resume_id"]
+            if resume_id is None:
+                response = await client.get(base_url + "/api/resumes/")
+                results = response.json().get("results") if response.status_code == 200 else None
+                if not results:
+                    raise CommandError(f"{base_url}: no resume to retrieve, pass --resume-id or upload one.")
+                resume_id = results[0]["id"]
+            url = f"{base_url}/api/resumes/{resume_id}/"
+            return lambda: client.get(url)
+
+        url = base_url + "/api/resumes/"
+        file_name = os.path.basename(options["pdf"])
+        return lambda: client.post(
+            url,
+            data={"file_name": file_name},
+            files={"pdf_file": (file_name, options["pdf_bytes"], "application/pdf")},
+        )
+
+    async def _run(self, scenario, base_url, options):
+        import httpx
+
+        headers = {"Authorization": f"Bearer {options['token']}"}
+        latencies = []
+        errors = 0
+        remaining = options["requests"]
+        limits = httpx.Limits(max_connections=options["concurrency"])
+
+        async with httpx.AsyncClient(headers=headers, timeout=options["timeout"], limits=limits) as client:
+            send = await self._request_factory(scenario, client, base_url, options)
+
+            async def worker():
+                nonlocal remaining, errors
+                while remaining > 0:
+                    remaining -= 1
+                    started = time.perf_counter()
+                    try:
+                        response = await send()
+                        if response.status_code >= 400:
+                            errors += 1
+                    except httpx.HTTPError:
+                        errors += 1
+                    latencies.append((time.perf_counter() - started) * 1000)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(options["concurrency"])))
+            elapsed = time.perf_counter() - started
+
+        latencies.sort()
+        quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+        return {
+            "rps": len(latencies) / elapsed,
+            "p50": quantiles[49],
+            "p95": quantiles[94],
+            "p99": quantiles[98],
+            "errors": errors,
+        }
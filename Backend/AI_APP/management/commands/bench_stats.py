@@ -0,0 +1,116 @@
+import random
+import statistics
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from AI_APP.models import Resume, User
+from AI_APP.rollups import rebuild, record_analysis, user_stats
+
+
+SKILLS = [
+    "Docker", "Kubernetes", "TypeScript", "GraphQL", "Redis", "AWS", "CI/CD",
+    "Unit testing", "PostgreSQL", "System design", "Celery", "Terraform",
+    "Next.js", "Django REST Framework", "WebSockets", "OAuth", "Linux",
+    "Nginx", "Microservices", "Kafka", "MongoDB", "React Native", "Go",
+    "Rust", "Monitoring", "Accessibility", "Security", "Caching",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed one user with many completed analyses and compare GET /api/resumes/stats/ "
+        "served from the rollups against computing it on the fly."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--resumes", type=int, default=100_000)
+        parser.add_argument("--repeat", type=int, default=20, help="Timed reads per method.")
+        parser.add_argument("--keep", action="store_true", help="Keep the seeded user and rows.")
+
+    def handle(self, *args, **options):
+        email = "bench-stats@example.com"
+        User.objects.filter(email=email).delete()
+        user = User.objects.create(email=email, username="bench-stats")
+
+        try:
+            self._seed(user, options["resumes"])
+
+            started = time.perf_counter()
+            rebuild(user)
+            self.stdout.write(f"rebuild_resume_stats:        {time.perf_counter() - started:8.2f} s")
+
+            # Cost added to each completed analysis
+            samples = []
+            for resume in self._make_resumes(user, 200, save=True):
+                started = time.perf_counter()
+                record_analysis(resume)
+                samples.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(f"incremental update / analysis: {statistics.median(samples):6.2f} ms (median)")
+
+            rollup_ms = self._time(lambda: user_stats(user), options["repeat"])
+            self.stdout.write(f"stats from rollups:          {rollup_ms:8.2f} ms (median)")
+
+            naive_ms = self._time(lambda: self._naive_stats(user), max(1, options["repeat"] // 10))
+            self.stdout.write(f"stats computed on the fly:   {naive_ms:8.2f} ms (median)")
+
+            if rollup_ms:
+                self.stdout.write(self.style.SUCCESS(f"speed-up: {naive_ms / rollup_ms:.0f}x"))
+        finally:
+            if not options["keep"]:
+                user.delete()
+
+    def _seed(self, user, count):
+        started = time.perf_counter()
+        batch = 5000
+        for offset in range(0, count, batch):
+            Resume.objects.bulk_create(self._make_resumes(user, min(batch, count - offset)))
+        self.stdout.write(f"seeded {count} resumes in     {time.perf_counter() - started:8.2f} s")
+
+    def _make_resumes(self, user, count, save=False):
+        now = timezone.now()
+        resumes = []
+        for i in range(count):
+            resume = Resume(
+                user=user,
+                file_name=f"bench_{i}.pdf",
+                pdf_file="",
+                status="completed",
+                overall_score=random.randint(30, 95),
+                ats_score=random.randint(30, 95),
+                missing_skills=random.sample(SKILLS, random.randint(2, 6)),
+                analyzed_at=now - timedelta(days=random.randint(0, 364)),
+            )
+            if save:
+                resume.save()
+            resumes.append(resume)
+        return resumes
+
+    def _naive_stats(self, user):
+        # What the endpoint would do without rollups
+        rows = Resume.objects.filter(user=user, status="completed").values_list(
+            "overall_score", "ats_score", "analyzed_at", "missing_skills"
+        )
+        days, skills = {}, Counter()
+        overall = ats = n = 0
+        for overall_score, ats_score, analyzed_at, missing in rows.iterator(chunk_size=2000):
+            n += 1
+            overall += overall_score or 0
+            ats += ats_score or 0
+            day = days.setdefault(analyzed_at.date(), [0, 0, 0])
+            day[0] += 1
+            day[1] += overall_score or 0
+            day[2] += ats_score or 0
+            skills.update({" ".join(str(s).lower().split()) for s in missing or []})
+        return n, overall, ats, days, skills.most_common(10)
+
+    def _time(self, fn, repeat):
+        samples = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - started) * 1000)
+        return statistics.median(samples)
@@ -0,0 +1,119 @@
+import json
+import os
+import re
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+# `-X importtime` writes one line per module to stderr:
+#   import time: self [us] | cumulative | imported package
+#   import time:       123 |       4567 |   django.db
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)")
+
+# Importing the WSGI module only runs django.setup(); resolving the URLconf
+# is what a worker's first request does, and pulls in every view,
+# serializer and the analyzers
+_PROFILE_CODE = (
+    "import {module}, json, sys\n"
+    "from django.urls import get_resolver\n"
+    "get_resolver().url_patterns\n"
+    "print(json.dumps(sorted(sys.modules)))\n"
+)
+
+
+def profile_import(module):
+    """
+    Import `module` and the URLconf in a fresh interpreter. Returns the
+    total import time in ms, (name, self us, cumulative us) per imported
+    module, and the names in sys.modules afterwards.
+    """
+    env = os.environ.copy()
+    env.setdefault("DJANGO_SETTINGS_MODULE", "Resume_AI.settings")
+
+    # Run in a fresh interpreter: this process already has Django loaded
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", _PROFILE_CODE.format(module=module)],
+        cwd=settings.BASE_DIR,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise CommandError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    total_us = 0
+    imports = []
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if not match:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        imports.append((name, int(self_us), int(cumulative_us)))
+        # Top-level imports (least indented) add up to the full cost
+        if len(indent) == 1:
+            total_us += int(cumulative_us)
+
+    modules = set(json.loads(result.stdout.splitlines()[-1]))
+    return total_us / 1000, imports, modules
+
+
+def leaked_modules(modules):
+    """
+    IMPORT_TIME_FORBIDDEN_MODULES (or their submodules) found in `modules`.
+    """
+    return [
+        forbidden for forbidden in settings.IMPORT_TIME_FORBIDDEN_MODULES
+        if any(name == forbidden or name.startswith(forbidden + ".") for name in modules)
+    ]
+
+
+class Command(BaseCommand):
+    help = (
+        "Profile the import of the WSGI application and its URLconf with `python -X importtime` "
+        "and fail if it exceeds IMPORT_TIME_BUDGET_MS or imports a lazy module."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--budget-ms",
+            type=int,
+            default=settings.IMPORT_TIME_BUDGET_MS,
+            help="Maximum cumulative import time in milliseconds.",
+        )
+        parser.add_argument(
+            "--module",
+            default="Resume_AI.wsgi",
+            help="Module to import before resolving the URLconf (default: Resume_AI.wsgi).",
+        )
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=15,
+            help="How many of the slowest imports to print.",
+        )
+
+    def handle(self, *args, **options):
+        total_ms, imports, modules = profile_import(options["module"])
+
+        self.stdout.write(
+            f"Import of {options['module']} and the URLconf: {total_ms:.1f} ms ({len(imports)} modules)"
+        )
+        self.stdout.write(f"Slowest {options['top']} imports (self time):")
+        for name, self_us, cumulative_us in sorted(imports, key=lambda i: i[1], reverse=True)[: options["top"]]:
+            self.stdout.write(f"  {self_us / 1000:8.1f} ms  {name}")
+
+        leaked = leaked_modules(modules)
+        if leaked:
+            raise CommandError(
+                f"These modules must be imported lazily but were loaded at startup: {', '.join(leaked)}"
+            )
+
+        if total_ms > options["budget_ms"]:
+            raise CommandError(
+                f"Import time {total_ms:.1f} ms exceeds the budget of {options['budget_ms']} ms"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Within budget ({options['budget_ms']} ms)"))
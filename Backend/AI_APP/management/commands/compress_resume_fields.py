@@ -0,0 +1,47 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from AI_APP.compression import CODECS, recompress
+from AI_APP.models import Resume
+
+FIELDS = ["extracted_text", "full_feedback", "analysis_result"]
+
+
+class Command(BaseCommand):
+    help = (
+        "Re-encode the stored extracted texts and feedback of existing resumes with "
+        "FIELD_COMPRESSION (and FIELD_COMPRESSION_DICT_ID). Run it once after turning "
+        "compression on or deploying a new dictionary; rows already encoded that way "
+        "are skipped, so it can be interrupted and rerun."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--codec", choices=list(CODECS), default=None,
+                            help="Use this codec (no dictionary) instead of FIELD_COMPRESSION, "
+                                 "e.g. none to decompress everything.")
+        parser.add_argument("--field", action="append", choices=FIELDS,
+                            help="Only this field (repeatable, default: all).")
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Report what would be rewritten without writing.")
+
+    def handle(self, *args, **options):
+        codec = options["codec"]
+        if codec is None and settings.FIELD_COMPRESSION == "none":
+            raise CommandError("FIELD_COMPRESSION is 'none', set it first or pass --codec.")
+
+        started = time.perf_counter()
+        result = recompress(
+            Resume.objects.all(),
+            options["field"] or FIELDS,
+            codec=codec,
+            dry_run=options["dry_run"],
+            batch_size=options["batch_size"],
+        )
+        verb = "Would rewrite" if options["dry_run"] else "Rewrote"
+        self.stdout.write(self.style.SUCCESS(
+            f"{verb} {result['rows']} resumes in {time.perf_counter() - started:.2f}s: "
+            f"{result['before'] / 1024 / 1024:.2f} MB -> {result['after'] / 1024 / 1024:.2f} MB"
+        ))
@@ -0,0 +1,97 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from AI_APP.analyzers import (
+    BACKEND_CLASSES,
+    Analysis,
+    AnalyzerError,
+    get_backend,
+    run_analysis,
+    run_on_backend,
+)
+from AI_APP.management.commands.bench_compression import synthetic_resume
+from AI_APP.management.commands.prompt_report import HEADER, format_row, summarize
+from AI_APP.models import Resume
+from AI_APP.prompts import TEMPLATES, get_template
+from AI_APP.utils import UNPARSED_FEEDBACK
+
+
+class Command(BaseCommand):
+    help = (
+        "Offline A/B of prompt versions: analyze the same resumes with each version and "
+        "compare tokens, latency, JSON failures and scores. Calls the real backends."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--versions", default=",".join(TEMPLATES),
+                            help="Comma-separated prompt versions; the first is the baseline.")
+        parser.add_argument("--samples", type=int, default=10, help="Resumes per version.")
+        parser.add_argument("--synthetic", action="store_true",
+                            help="Use generated resumes instead of recent uploads.")
+        parser.add_argument("--backend", choices=sorted(BACKEND_CLASSES),
+                            help="Send every call to this backend (default: normal routing).")
+
+    def handle(self, *args, **options):
+        versions = [version.strip() for version in options["versions"].split(",") if version.strip()]
+        templates = [get_template(version) for version in versions]
+        texts = self._texts(options["samples"], options["synthetic"])
+        if options["backend"]:
+            backend = get_backend(options["backend"])
+            if not backend.is_configured():
+                raise CommandError(f"{backend.name} has no API key configured.")
+
+        results = {version: [] for version in versions}
+        for i, text in enumerate(texts):
+            # Alternate the order so neither version always goes first
+            order = templates if i % 2 == 0 else templates[::-1]
+            for template in order:
+                results[template.version].append(self._analyze(template, text, options["backend"]))
+            self.stdout.write(f"\r{i + 1}/{len(texts)} resumes", ending="")
+        self.stdout.write("")
+
+        self.stdout.write(HEADER + f"{'score diff':>12}{'backends':>22}")
+        baseline = results[versions[0]]
+        for version in versions:
+            analyses = results[version]
+            rows = [
+                (a.input_tokens, a.output_tokens, a.latency_ms, a.feedback.get("overall_score"),
+                 a.feedback.get("strengths"))
+                for a in analyses
+            ]
+            # Mean absolute score difference from the baseline on the same resumes
+            diff = statistics.mean(
+                abs((a.feedback.get("overall_score") or 0) - (b.feedback.get("overall_score") or 0))
+                for a, b in zip(analyses, baseline)
+            )
+            backends = ",".join(sorted({a.backend for a in analyses}))
+            self.stdout.write(format_row(version, summarize(rows)) + f"{diff:>12.1f}{backends:>22}")
+
+    def _texts(self, samples, synthetic):
+        texts = []
+        if not synthetic:
+            for resume in Resume.objects.filter(status="completed").order_by("-created_at").only(
+                "extracted_text"
+            )[:samples]:
+                if resume.extracted_text:
+                    texts.append(resume.extracted_text)
+        if len(texts) < samples:
+            random.seed(11)
+            texts += [synthetic_resume(i)[0] for i in range(samples - len(texts))]
+        return texts
+
+    def _analyze(self, template, text, backend_name):
+        request = template.analysis_request(text)
+        if not backend_name:
+            return run_analysis(request)
+        started = time.monotonic()
+        try:
+            return run_on_backend(backend_name, request)
+        except AnalyzerError:
+            # No failover with --backend: count it as a reply that wasn't JSON
+            analysis = Analysis(dict(UNPARSED_FEEDBACK), backend_name)
+            analysis.prompt_version = template.version
+            analysis.latency_ms = int((time.monotonic() - started) * 1000)
+            return analysis
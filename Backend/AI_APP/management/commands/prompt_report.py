@@ -0,0 +1,93 @@
+import statistics
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from AI_APP.models import Resume
+from AI_APP.utils import is_unparsed_feedback
+
+
+def percentile(values, p):
+    values = sorted(values)
+    if not values:
+        return None
+    return values[min(len(values) - 1, int(p * len(values)))]
+
+
+def summarize(rows):
+    """
+    Token, latency and quality figures for a list of
+    (input_tokens, output_tokens, analysis_ms, overall_score, strengths) rows.
+    """
+    inputs = [row[0] for row in rows if row[0] is not None]
+    outputs = [row[1] for row in rows if row[1] is not None]
+    latencies = [row[2] for row in rows if row[2] is not None]
+    return {
+        'count': len(rows),
+        'input_tokens': statistics.mean(inputs) if inputs else None,
+        'output_tokens': statistics.mean(outputs) if outputs else None,
+        'p50_ms': percentile(latencies, 0.5),
+        'p95_ms': percentile(latencies, 0.95),
+        'unparsed': sum(is_unparsed_feedback({'strengths': row[4]}) for row in rows) / len(rows),
+        'score': statistics.mean(row[3] or 0 for row in rows),
+    }
+
+
+def format_row(label, summary, width=22):
+    def number(value, spec):
+        return format(value, spec) if value is not None else 'n/a'
+
+    return (
+        f"{label:<{width}}{summary['count']:>7}{number(summary['input_tokens'], '.0f'):>10}"
+        f"{number(summary['output_tokens'], '.0f'):>10}{number(summary['p50_ms'], 'd'):>9}"
+        f"{number(summary['p95_ms'], 'd'):>9}{summary['unparsed']:>10.1%}{summary['score']:>8.1f}"
+    )
+
+
+HEADER = (
+    f"{'':<22}{'count':>7}{'in tok':>10}{'out tok':>10}{'p50 ms':>9}"
+    f"{'p95 ms':>9}{'unparsed':>10}{'score':>8}"
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare recent analyses per prompt version (and backend): average input/output "
+        "tokens (hedged calls included), latency of the LLM answers, share of unparsed "
+        "placeholders (older rows; non-JSON replies now fail over) and mean score. Use "
+        "with PROMPT_EXPERIMENT to A/B prompt versions on live traffic."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, default=7, help="Only analyses from the last N days.")
+        parser.add_argument("--by-backend", action="store_true", help="Split each version by backend.")
+
+    def handle(self, *args, **options):
+        since = timezone.now() - timedelta(days=options["days"])
+        rows = (
+            Resume.objects.filter(status="completed", analyzed_at__gte=since)
+            .exclude(prompt_version="")
+            .exclude(analyzed_by="reused")
+            .values_list(
+                "prompt_version", "analyzed_by", "input_tokens", "output_tokens",
+                "analysis_ms", "overall_score", "strengths",
+            )
+        )
+        groups = defaultdict(list)
+        for version, backend, *row in rows:
+            if backend == "local":
+                # A local fallback's time is the failed remote calls before
+                # it, not how fast this prompt gets answered
+                row[2] = None
+            key = f"{version} / {backend}" if options["by_backend"] else version
+            groups[key].append(row)
+
+        if not groups:
+            self.stdout.write(f"No analyses with a recorded prompt version in the last {options['days']} days.")
+            return
+
+        self.stdout.write(HEADER)
+        for key in sorted(groups):
+            self.stdout.write(format_row(key, summarize(groups[key])))
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from AI_APP.models import User
+from AI_APP.rollups import rebuild
+
+
+class Command(BaseCommand):
+    help = "Recompute the per-user stats rollups (GET /api/resumes/stats/) from the Resume table."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Only rebuild this user's rollups (email).")
+
+    def handle(self, *args, **options):
+        user = None
+        if options["user"]:
+            try:
+                user = User.objects.get(email=options["user"])
+            except User.DoesNotExist:
+                raise CommandError(f"No user with email {options['user']}")
+
+        started = time.perf_counter()
+        counted = rebuild(user)
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt rollups from {counted} completed analyses in {time.perf_counter() - started:.2f}s"
+        ))
@@ -0,0 +1,37 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from AI_APP.models import Resume, User
+from AI_APP.similarity import index_resume
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute MinHash signatures, the per-user LSH index and the near-duplicate "
+        "flags from extracted_text (e.g. for resumes uploaded before they existed)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", help="Only rebuild this user's index (email).")
+
+    def handle(self, *args, **options):
+        resumes = Resume.objects.exclude(status__in=['pending', 'processing'])
+        if options["user"]:
+            try:
+                resumes = resumes.filter(user=User.objects.get(email=options["user"]))
+            except User.DoesNotExist:
+                raise CommandError(f"No user with email {options['user']}")
+
+        started = time.perf_counter()
+        indexed = flagged = 0
+        # Oldest first, so every resume is compared with an already indexed history
+        for resume in resumes.order_by('created_at').iterator(chunk_size=500):
+            if index_resume(resume) is not None:
+                flagged += 1
+            resume.save(update_fields=['minhash', 'duplicate_of', 'similarity'])
+            indexed += 1
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Indexed {indexed} resumes ({flagged} near-duplicates) in {time.perf_counter() - started:.2f}s"
+        ))
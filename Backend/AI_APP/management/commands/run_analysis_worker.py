@@ -0,0 +1,171 @@
+import signal
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import close_old_connections, connection
+
+from AI_APP.scheduler import LeaseLost, claim_next, heartbeat, queue_depth, requeue_stale
+from AI_APP.services import process_resume
+
+
+class Command(BaseCommand):
+    help = (
+        "Process queued resume analyses (ANALYSIS_MODE=queued) with per-user "
+        "fair share and priority lanes. Run as many of these as you like. "
+        "Ctrl-C or SIGTERM stops claiming jobs and waits for the running ones; "
+        "press Ctrl-C again to stop right away."
+    )
+
+    # Longest sleep after repeated errors (database down, locked, ...)
+    max_backoff = 30.0
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int,
+                            help="Analyses to run in parallel (default 2, or 1 on SQLite).")
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Seconds to sleep when idle.")
+        parser.add_argument("--once", action="store_true", help="Drain the queue, then exit.")
+        parser.add_argument("--stats", action="store_true", help="Print queue depth and exit.")
+
+    def handle(self, *args, **options):
+        if options["stats"]:
+            self._print_depth()
+            return
+
+        # SQLite has no row locks: concurrent claims fail with "database is
+        # locked" instead of waiting for each other
+        sqlite = connection.vendor == "sqlite"
+        if options["threads"] is None:
+            options["threads"] = 1 if sqlite else 2
+        if sqlite and options["threads"] > 1:
+            raise CommandError("--threads > 1 needs PostgreSQL; SQLite can't take concurrent claims.")
+
+        self._requeue_lock = threading.Lock()
+        self._next_requeue = 0.0
+        self._requeue_stale()
+
+        # Lease tokens of the jobs running right now, renewed by _heartbeat()
+        self._leases = set()
+        self._leases_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._stopped = threading.Event()
+        signal.signal(signal.SIGTERM, self._request_stop)
+
+        self.stdout.write(f"Analysis worker started with {options['threads']} thread(s)")
+        self._print_depth()
+
+        # Daemon threads, so a second Ctrl-C can still end the process; their
+        # jobs are requeued by requeue_stale() once the heartbeat stops
+        threads = [
+            threading.Thread(target=self._loop, args=(options,), daemon=True)
+            for _ in range(options["threads"])
+        ]
+        threading.Thread(target=self._heartbeat, daemon=True).start()
+        for thread in threads:
+            thread.start()
+        try:
+            try:
+                self._join(threads)
+            except KeyboardInterrupt:
+                self._request_stop()
+                self._join(threads)
+        except KeyboardInterrupt:
+            self.stderr.write("Stopped, running jobs will be requeued")
+        else:
+            if self._stop.is_set():
+                self.stdout.write("Worker stopped")
+        finally:
+            self._stopped.set()
+
+    def _request_stop(self, *args):
+        if self._stop.is_set():
+            return
+        self._stop.set()
+        with self._leases_lock:
+            running = len(self._leases)
+        self.stdout.write(f"Stopping worker, waiting for {running} running job(s)")
+
+    def _join(self, threads):
+        # join() with a timeout so Ctrl-C reaches the main thread
+        for thread in threads:
+            while thread.is_alive():
+                thread.join(0.5)
+
+    def _loop(self, options):
+        errors = 0
+        while not self._stop.is_set():
+            try:
+                close_old_connections()
+                self._requeue_stale()
+                resume = claim_next()
+                if resume is None:
+                    if options["once"]:
+                        return
+                    self._stop.wait(options["poll_interval"])
+                    continue
+
+                with self._leases_lock:
+                    self._leases.add(resume.claimed_by)
+                try:
+                    started = time.monotonic()
+                    process_resume(resume)
+                finally:
+                    with self._leases_lock:
+                        self._leases.discard(resume.claimed_by)
+                self.stdout.write(
+                    f"{resume.id} ({resume.user_id}) -> {resume.status} "
+                    f"in {time.monotonic() - started:.1f}s"
+                )
+                errors = 0
+            except LeaseLost as e:
+                self.stderr.write(f"Resume {e} was requeued while it ran, result dropped")
+            except Exception:
+                # Keep the thread alive; a job it had claimed is picked up
+                # again by requeue_stale()
+                errors += 1
+                backoff = min(self.max_backoff, options["poll_interval"] * 2 ** errors)
+                self.stderr.write(f"Worker error, retrying in {backoff:.1f}s:\n{traceback.format_exc()}")
+                close_old_connections()
+                self._stop.wait(backoff)
+        close_old_connections()
+
+    def _heartbeat(self):
+        """
+        Renew the leases of running jobs four times per
+        ANALYSIS_STALE_AFTER_SECONDS, so requeue_stale() only takes jobs of
+        workers that are gone.
+        """
+        interval = settings.ANALYSIS_STALE_AFTER_SECONDS / 4
+        while not self._stopped.wait(interval):
+            with self._leases_lock:
+                leases = list(self._leases)
+            try:
+                close_old_connections()
+                heartbeat(leases)
+            except Exception:
+                self.stderr.write(f"Heartbeat failed:\n{traceback.format_exc()}")
+
+    def _requeue_stale(self):
+        """
+        Requeue jobs of crashed workers. Runs at startup and then every
+        quarter of ANALYSIS_STALE_AFTER_SECONDS, by one thread at a time.
+        """
+        if time.monotonic() < self._next_requeue or not self._requeue_lock.acquire(blocking=False):
+            return
+        try:
+            requeued = requeue_stale()
+            self._next_requeue = time.monotonic() + settings.ANALYSIS_STALE_AFTER_SECONDS / 4
+        finally:
+            self._requeue_lock.release()
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale job(s)")
+
+    def _print_depth(self):
+        depth = queue_depth()
+        lanes = ", ".join(f"{lane}={n}" for lane, n in depth["pending"].items())
+        self.stdout.write(
+            f"Queue: {lanes}; processing={depth['processing']}; "
+            f"users waiting={depth['users_waiting']}"
+        )
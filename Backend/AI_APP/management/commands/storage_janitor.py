@@ -0,0 +1,65 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from AI_APP.janitor import run_janitor
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete queued PDFs, sweep orphan files in MEDIA_ROOT/resumes/ and apply "
+        "the retention settings. Reports disk usage and how long each step took."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--loop", action="store_true", help="Keep running every --interval seconds.")
+        parser.add_argument("--interval", type=int, default=settings.JANITOR_INTERVAL_SECONDS)
+        parser.add_argument("--dry-run", action="store_true",
+                            help="Report what a pass would delete without changing anything.")
+        parser.add_argument("--force", action="store_true",
+                            help="Sweep orphans even if the safety checks refuse to.")
+
+    def handle(self, *args, **options):
+        while True:
+            close_old_connections()
+            self._report(run_janitor(dry_run=options["dry_run"], force=options["force"]))
+            if not options["loop"]:
+                return
+            time.sleep(options["interval"])
+
+    def _report(self, report):
+        before, after = report["disk_before"], report["disk_after"]
+        retention, orphans = report["retention"], report["orphans"]
+        self.stdout.write(
+            f"Janitor pass in {report['total_seconds']:.2f}s"
+            f"{' (dry run, nothing changed)' if report['dry_run'] else ''} | "
+            f"disk: {before['files']} files / {_mb(before['bytes'])} -> "
+            f"{after['files']} files / {_mb(after['bytes'])}"
+        )
+        self.stdout.write(
+            f"  retention ({report['retention_seconds']:.2f}s): "
+            f"{retention['pdfs_dropped']} PDFs dropped, "
+            f"{retention['abandoned']} abandoned uploads failed, "
+            f"{retention['failed_cleared']} failed uploads cleared, "
+            f"{retention['texts_compacted']} texts compressed"
+        )
+        self.stdout.write(
+            f"  deletions ({report['deletion_seconds']:.2f}s): "
+            f"{report['deleted']} deleted, {report['delete_failures']} will be retried"
+        )
+        if orphans["refused"]:
+            self.stdout.write(self.style.WARNING(
+                f"  orphan sweep ({report['sweep_seconds']:.2f}s): {orphans['found']} orphans, "
+                f"refused: {orphans['refused']} (--force to sweep anyway)"
+            ))
+        else:
+            self.stdout.write(
+                f"  orphan sweep ({report['sweep_seconds']:.2f}s): {orphans['found']} orphans, "
+                f"{orphans['deleted']} files, {_mb(orphans['freed'])} freed"
+            )
+
+
+def _mb(size):
+    return f"{size / (1024 * 1024):.1f} MB"
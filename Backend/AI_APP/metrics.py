@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.core.cache import cache
+
+
+# ----------------------------------------------------------------------
+# Operational counters, kept in the shared cache so every worker adds to
+# the same totals; exposed in Prometheus text format at GET /api/metrics/
+# (staff only). They reset when the cache is flushed, which Prometheus
+# counters handle.
+# ----------------------------------------------------------------------
+
+_THROTTLE_KEY = 'metrics:throttle_rejections:%s'
+_ANALYZER_KEY = 'metrics:analyzer_calls:%s:%s'
+_HEDGE_KEY = 'metrics:analyzer_hedges'
+ANALYZER_OUTCOMES = ('ok', 'error')
+
+
+def _incr(key):
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def record_throttle_rejection(scope):
+    _incr(_THROTTLE_KEY % scope)
+
+
+def throttle_rejections():
+    """
+    {scope: rejected requests} for every configured throttle scope.
+    """
+    scopes = list(settings.REST_FRAMEWORK.get('DEFAULT_THROTTLE_RATES', {}))
+    counts = cache.get_many([_THROTTLE_KEY % scope for scope in scopes])
+    return {scope: counts.get(_THROTTLE_KEY % scope, 0) for scope in scopes}
+
+
+def record_analyzer_call(backend, outcome):
+    _incr(_ANALYZER_KEY % (backend, outcome))
+
+
+def record_analyzer_hedge():
+    _incr(_HEDGE_KEY)
+
+
+def analyzer_calls(backends):
+    """
+    {(backend, outcome): calls} for `backends`, plus the hedge count.
+    """
+    keys = {(b, o): _ANALYZER_KEY % (b, o) for b in backends for o in ANALYZER_OUTCOMES}
+    counts = cache.get_many(list(keys.values()) + [_HEDGE_KEY])
+    return {k: counts.get(key, 0) for k, key in keys.items()}, counts.get(_HEDGE_KEY, 0)
+
+
+def render_prometheus():
+    from .analyzers import backend_status
+    lines = [
+        '# HELP resume_ai_throttle_rejections_total Requests rejected with 429, per throttle scope.',
+        '# TYPE resume_ai_throttle_rejections_total counter',
+    ]
+    for scope, count in throttle_rejections().items():
+        lines.append(f'resume_ai_throttle_rejections_total{{scope="{scope}"}} {count}')
+
+    status = backend_status()
+    calls, hedges = analyzer_calls([backend['name'] for backend in status])
+    lines += [
+        '# HELP resume_ai_analyzer_calls_total Analysis calls per backend and outcome.',
+        '# TYPE resume_ai_analyzer_calls_total counter',
+    ]
+    for (backend, outcome), count in calls.items():
+        lines.append(f'resume_ai_analyzer_calls_total{{backend="{backend}",outcome="{outcome}"}} {count}')
+    lines += [
+        '# HELP resume_ai_analyzer_hedges_total Analyses that fired a second (hedge) backend.',
+        '# TYPE resume_ai_analyzer_hedges_total counter',
+        f'resume_ai_analyzer_hedges_total {hedges}',
+        '# HELP resume_ai_analyzer_circuit_open 1 while a backend\'s circuit breaker is open.',
+        '# TYPE resume_ai_analyzer_circuit_open gauge',
+    ]
+    for backend in status:
+        lines.append(
+            f'resume_ai_analyzer_circuit_open{{backend="{backend["name"]}"}} {int(backend["state"] == "open")}'
+        )
+    lines += [
+        '# HELP resume_ai_analyzer_latency_p95_seconds p95 latency of recent calls, in this worker.',
+        '# TYPE resume_ai_analyzer_latency_p95_seconds gauge',
+    ]
+    for backend in status:
+        if backend['p95'] is not None:
+            lines.append(
+                f'resume_ai_analyzer_latency_p95_seconds{{backend="{backend["name"]}"}} {backend["p95"]:.3f}'
+            )
+    return '\n'.join(lines) + '\n'
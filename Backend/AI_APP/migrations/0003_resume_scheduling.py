@@ -0,0 +1,32 @@
+# Generated by Django 4.2 on 2026-10-19 15:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AI_APP', '0002_resume_full_feedback'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='priority',
+            field=models.PositiveSmallIntegerField(choices=[(0, 'Interactive'), (10, 'Bulk'), (20, 'Reanalysis')], default=0),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='queued_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='started_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='resume',
+            index=models.Index(fields=['status', 'priority', 'queued_at'], name='AI_APP_resu_status_4127e3_idx'),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 4.2 on 2026-10-19 15:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AI_APP', '0003_resume_scheduling'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='stats_day',
+            field=models.DateField(blank=True, editable=False, null=True),
+        ),
+        migrations.CreateModel(
+            name='ResumeDailyStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('analyses', models.IntegerField(default=0)),
+                ('overall_score_sum', models.BigIntegerField(default=0)),
+                ('ats_score_sum', models.BigIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'Resume daily stats',
+                'ordering': ['day'],
+            },
+        ),
+        migrations.CreateModel(
+            name='MissingSkillCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('skill', models.CharField(max_length=255)),
+                ('label', models.CharField(max_length=255)),
+                ('count', models.IntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='missing_skill_counts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-count'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='resumedailystats',
+            constraint=models.UniqueConstraint(fields=('user', 'day'), name='unique_daily_stats_per_user'),
+        ),
+        migrations.AddIndex(
+            model_name='missingskillcount',
+            index=models.Index(fields=['user', '-count'], name='AI_APP_miss_user_id_34a4e3_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='missingskillcount',
+            constraint=models.UniqueConstraint(fields=('user', 'skill'), name='unique_missing_skill_per_user'),
+        ),
+    ]
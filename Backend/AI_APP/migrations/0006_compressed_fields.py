@@ -0,0 +1,44 @@
+# Generated by Django 4.2 on 2026-10-19 16:05
+
+import AI_APP.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AI_APP', '0005_storage_lifecycle'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CompressionDictionary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('codec', models.CharField(choices=[('zlib', 'zlib'), ('zstd', 'Zstandard')], max_length=10)),
+                ('data', models.BinaryField()),
+                ('sample_count', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name_plural': 'Compression dictionaries',
+                'ordering': ['-created_at'],
+            },
+        ),
+        # New binary columns next to the old ones; 0007 fills them, 0008 swaps
+        migrations.AddField(
+            model_name='resume',
+            name='extracted_text_compressed',
+            field=AI_APP.fields.CompressedTextField(blank=True, default=''),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='analysis_result_compressed',
+            field=AI_APP.fields.CompressedJSONField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='full_feedback_compressed',
+            field=AI_APP.fields.CompressedJSONField(blank=True, null=True),
+        ),
+    ]
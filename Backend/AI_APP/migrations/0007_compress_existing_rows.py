@@ -0,0 +1,95 @@
+import zlib
+
+from django.db import migrations, models, transaction
+from django.db.models import Value
+
+from AI_APP.compression import compress
+
+
+BATCH_SIZE = 500
+
+# Pinned rather than FIELD_COMPRESSION, so what this migration writes
+# doesn't depend on the environment it runs in. Rows are only re-framed
+# (header + raw bytes); `manage.py compress_resume_fields` compresses them
+# once FIELD_COMPRESSION is set.
+CODEC = 'none'
+
+
+def _batches(Resume, fields, using):
+    # Keyset pagination on the primary key: constant memory, no OFFSET scans
+    last_pk = None
+    while True:
+        rows = Resume.objects.using(using).order_by('pk')
+        if last_pk is not None:
+            rows = rows.filter(pk__gt=last_pk)
+        batch = list(rows.values_list('pk', *fields)[:BATCH_SIZE])
+        if not batch:
+            return
+        yield batch
+        last_pk = batch[-1][0]
+
+
+def _pinned(Resume, name, value):
+    # Already-encoded bytes as an expression, which bulk_update() writes
+    # as they are instead of encoding them with FIELD_COMPRESSION
+    if value is None:
+        return None
+    data = compress(Resume._meta.get_field(name).encode(value), codec=CODEC)
+    return Value(data, output_field=models.BinaryField())
+
+
+def compress_rows(apps, schema_editor):
+    Resume = apps.get_model('AI_APP', 'Resume')
+    using = schema_editor.connection.alias
+    fields = ['extracted_text', 'extracted_text_archive', 'analysis_result', 'full_feedback']
+    for batch in _batches(Resume, fields, using):
+        resumes = []
+        for pk, text, archive, result, feedback in batch:
+            # Texts compacted by the storage janitor (0005) are folded back in
+            if not text and archive:
+                text = zlib.decompress(bytes(archive)).decode('utf-8')
+            resumes.append(Resume(
+                pk=pk,
+                extracted_text_compressed=_pinned(Resume, 'extracted_text_compressed', text or ''),
+                analysis_result_compressed=_pinned(Resume, 'analysis_result_compressed', result),
+                full_feedback_compressed=_pinned(Resume, 'full_feedback_compressed', feedback),
+            ))
+        # One transaction per batch so a large table isn't rewritten in a
+        # single long transaction
+        with transaction.atomic(using=using):
+            Resume.objects.using(using).bulk_update(
+                resumes,
+                ['extracted_text_compressed', 'analysis_result_compressed', 'full_feedback_compressed'],
+            )
+
+
+def decompress_rows(apps, schema_editor):
+    Resume = apps.get_model('AI_APP', 'Resume')
+    using = schema_editor.connection.alias
+    fields = ['extracted_text_compressed', 'analysis_result_compressed', 'full_feedback_compressed']
+    for batch in _batches(Resume, fields, using):
+        resumes = [
+            Resume(
+                pk=pk,
+                extracted_text=text.value if text is not None else '',
+                analysis_result=result.value if result is not None else None,
+                full_feedback=feedback.value if feedback is not None else None,
+            )
+            for pk, text, result, feedback in batch
+        ]
+        with transaction.atomic(using=using):
+            Resume.objects.using(using).bulk_update(resumes, ['extracted_text', 'analysis_result', 'full_feedback'])
+
+
+class Migration(migrations.Migration):
+    # Batches commit on their own; rerunning after a failure just
+    # recompresses from the untouched old columns
+    atomic = False
+
+    dependencies = [
+        ('AI_APP', '0006_compressed_fields'),
+    ]
+
+    operations = [
+        migrations.RunPython(compress_rows, decompress_rows),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 4.2 on 2026-10-19 16:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AI_APP', '0007_compress_existing_rows'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='resume',
+            name='extracted_text_archive',
+        ),
+        migrations.RemoveField(
+            model_name='resume',
+            name='extracted_text',
+        ),
+        migrations.RemoveField(
+            model_name='resume',
+            name='analysis_result',
+        ),
+        migrations.RemoveField(
+            model_name='resume',
+            name='full_feedback',
+        ),
+        migrations.RenameField(
+            model_name='resume',
+            old_name='extracted_text_compressed',
+            new_name='extracted_text',
+        ),
+        migrations.RenameField(
+            model_name='resume',
+            old_name='analysis_result_compressed',
+            new_name='analysis_result',
+        ),
+        migrations.RenameField(
+            model_name='resume',
+            old_name='full_feedback_compressed',
+            new_name='full_feedback',
+        ),
+    ]
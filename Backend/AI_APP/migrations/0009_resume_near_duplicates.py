@@ -0,0 +1,43 @@
+# Generated by Django 4.2 on 2026-10-19 15:36
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AI_APP', '0008_swap_compressed_fields'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='near_duplicates', to='AI_APP.resume'),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='minhash',
+            field=models.BinaryField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='similarity',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name='ResumeLSHBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField()),
+                ('resume', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to='AI_APP.resume')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='lsh_buckets', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='resumelshbucket',
+            index=models.Index(fields=['user', 'key'], name='AI_APP_resu_user_id_16cd74_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 15:46
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AI_APP', '0009_resume_near_duplicates'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='analyzed_by',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 4.2 on 2026-10-19 15:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AI_APP', '0010_resume_analyzed_by'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='analysis_ms',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='input_tokens',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='output_tokens',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='prompt_version',
+            field=models.CharField(blank=True, default='', max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2 on 2026-10-19 16:22
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AI_APP', '0011_resume_analysis_cost'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='text_compacted_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
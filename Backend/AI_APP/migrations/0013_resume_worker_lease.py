@@ -0,0 +1,23 @@
+# Generated by Django 4.2 on 2026-10-19 16:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('AI_APP', '0012_resume_text_compacted_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='resume',
+            name='claimed_by',
+            field=models.CharField(blank=True, default='', editable=False, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='resume',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -3,6 +3,8 @@ from django.contrib.auth.models import AbstractUser
 import uuid
 from django.core.exceptions import ValidationError
 
+from .fields import CompressedJSONField, CompressedTextField
+
 class User(AbstractUser):
     email =models.EmailField(unique=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -25,7 +27,8 @@ class Resume(models.Model):
     # File storage
     pdf_file = models.FileField(upload_to='resumes/')
     file_name = models.CharField(max_length=255)
-    extracted_text = models.TextField(blank=True)
+    # stored compressed (AI_APP/fields.py), decompressed on first access
+    extracted_text = CompressedTextField(blank=True, default='')
     
     # Analysis results from Claude
     overall_score = models.IntegerField(null=True, blank=True)
@@ -35,13 +38,21 @@ class Resume(models.Model):
     improvement_suggestions = models.JSONField(default=list, blank=True)
     ats_score = models.IntegerField(null=True, blank=True)
     
-    # feedback
-    analysis_result = models.JSONField(null=True, blank=True)
-    full_feedback = models.JSONField(null=True, blank=True)
+    # feedback (compressed like extracted_text)
+    analysis_result = CompressedJSONField(null=True, blank=True)
+    full_feedback = CompressedJSONField(null=True, blank=True)
     
     # timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     analyzed_at = models.DateTimeField(null=True, blank=True)
+    # backend that produced the feedback (AI_APP/analyzers.py)
+    analyzed_by = models.CharField(max_length=20, blank=True, default='')
+    
+    # prompt template (AI_APP/prompts.py) and what the analysis cost
+    prompt_version = models.CharField(max_length=20, blank=True, default='')
+    input_tokens = models.PositiveIntegerField(null=True, blank=True)
+    output_tokens = models.PositiveIntegerField(null=True, blank=True)
+    analysis_ms = models.PositiveIntegerField(null=True, blank=True)
     
     # status
     status = models.CharField(
@@ -55,6 +66,38 @@ class Resume(models.Model):
         default='pending'
     )
     
+    # scheduling (see AI_APP/scheduler.py) - only used when ANALYSIS_MODE=queued
+    priority = models.PositiveSmallIntegerField(
+        choices=[
+            (0, 'Interactive'),
+            (10, 'Bulk'),
+            (20, 'Reanalysis'),
+        ],
+        default=0
+    )
+    queued_at = models.DateTimeField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # lease of the queue worker running this job, renewed by its heartbeat
+    # (see AI_APP/scheduler.py)
+    claimed_by = models.CharField(max_length=32, blank=True, default='', editable=False)
+    heartbeat_at = models.DateTimeField(null=True, blank=True, editable=False)
+    
+    # storage lifecycle (see AI_APP/janitor.py)
+    pdf_purged_at = models.DateTimeField(null=True, blank=True)
+    # last time the janitor compressed extracted_text of this analysis
+    text_compacted_at = models.DateTimeField(null=True, blank=True, editable=False)
+    
+    # near-duplicate detection (see AI_APP/similarity.py)
+    minhash = models.BinaryField(null=True, blank=True, editable=False)
+    duplicate_of = models.ForeignKey(
+        'self', null=True, blank=True, on_delete=models.SET_NULL, related_name='near_duplicates'
+    )
+    similarity = models.FloatField(null=True, blank=True)
+    
+    # day this analysis was counted in the user's rollups (AI_APP/rollups.py),
+    # None if it isn't counted
+    stats_day = models.DateField(null=True, blank=True, editable=False)
+    
     def __str__(self):
         return f"{self.file_name} - {self.user.email}"
     
@@ -63,9 +106,102 @@ class Resume(models.Model):
         verbose_name_plural = "Resumes"
         indexes = [
             models.Index(fields=['user']),
+            models.Index(fields=['status', 'priority', 'queued_at']),
         ]
     
     def clean(self):
         if self.pdf_file:
             if not self.pdf_file.name.lower().endswith(".pdf"):
-                raise ValidationError("Only PDF files are allowed.")
\ No newline at end of file
+                raise ValidationError("Only PDF files are allowed.")
+
+
+# Per-user rollups behind GET /api/resumes/stats/, kept up to date
+# incrementally by AI_APP/rollups.py whenever an analysis completes.
+class ResumeDailyStats(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_stats')
+    day = models.DateField()
+    analyses = models.IntegerField(default=0)
+    overall_score_sum = models.BigIntegerField(default=0)
+    ats_score_sum = models.BigIntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.user_id} {self.day}: {self.analyses}"
+    
+    class Meta:
+        ordering = ['day']
+        verbose_name_plural = "Resume daily stats"
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'day'], name='unique_daily_stats_per_user'),
+        ]
+
+
+class MissingSkillCount(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='missing_skill_counts')
+    # normalised (lower-case, single-spaced) key; `label` keeps the first spelling seen
+    skill = models.CharField(max_length=255)
+    label = models.CharField(max_length=255)
+    count = models.IntegerField(default=0)
+    
+    def __str__(self):
+        return f"{self.label} x{self.count}"
+    
+    class Meta:
+        ordering = ['-count']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'skill'], name='unique_missing_skill_per_user'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-count']),
+        ]
+
+
+# Files whose Resume row is gone; deleted in the background by the storage
+# janitor instead of inside the DELETE request.
+class PendingFileDeletion(models.Model):
+    name = models.CharField(max_length=500)
+    requested_at = models.DateTimeField(auto_now_add=True)
+    attempts = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True)
+    
+    def __str__(self):
+        return self.name
+    
+    class Meta:
+        ordering = ['requested_at']
+
+
+# Per-user LSH index over Resume.minhash: one row per signature band.
+class ResumeLSHBucket(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='lsh_buckets')
+    resume = models.ForeignKey(Resume, on_delete=models.CASCADE, related_name='lsh_buckets')
+    key = models.BigIntegerField()
+    
+    def __str__(self):
+        return f"{self.resume_id}: {self.key}"
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'key']),
+        ]
+
+
+# Trained compression dictionaries (`manage.py train_compression_dict`).
+# Stored values reference them by id, so rows are never changed or deleted.
+class CompressionDictionary(models.Model):
+    codec = models.CharField(
+        max_length=10,
+        choices=[
+            ('zlib', 'zlib'),
+            ('zstd', 'Zstandard'),
+        ],
+    )
+    data = models.BinaryField()
+    sample_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    def __str__(self):
+        return f"{self.codec} dictionary #{self.pk} ({len(self.data)} bytes)"
+    
+    class Meta:
+        ordering = ['-created_at']
+        verbose_name_plural = "Compression dictionaries"
@@ -0,0 +1,57 @@
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+from .serializers import ResumeAnalysisSerializer
+
+logger = logging.getLogger(__name__)
+
+
+def status_group_name(user_id):
+    """
+    Channel-layer group that receives every status change of one user's resumes.
+    """
+    return f"resume_status_{user_id}"
+
+
+def _status_event(resume):
+    # Send the full analysis payload so clients never have to re-fetch
+    # /api/resumes/{id}/ after a notification.
+    return {
+        "type": "resume.status",
+        "resume": ResumeAnalysisSerializer(resume).data,
+    }
+
+
+def publish_resume_status(resume):
+    """
+    Push the current state of `resume` to its owner's WebSocket subscribers.
+
+    Best-effort: a missing/unreachable channel layer must never fail the
+    analysis pipeline, clients can still fall back to GET /api/resumes/{id}/.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(
+            status_group_name(resume.user_id), _status_event(resume)
+        )
+    except Exception:
+        logger.exception("Could not publish status for resume %s", resume.id)
+
+
+async def apublish_resume_status(resume):
+    """
+    Async version of `publish_resume_status` for the async pipeline.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        await channel_layer.group_send(
+            status_group_name(resume.user_id), _status_event(resume)
+        )
+    except Exception:
+        logger.exception("Could not publish status for resume %s", resume.id)
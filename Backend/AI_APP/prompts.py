@@ -0,0 +1,247 @@
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+
+# ----------------------------------------------------------------------
+# Versioned prompt templates. AI_APP/analyzers.py turns a request built
+# here into a Groq, Anthropic or local call.
+#
+#   v1 - the original prompt: instructions and schema in the user message,
+#        free-form text reply, temperature 0.7, up to 1500 output tokens.
+#        Kept as the A/B baseline.
+#   v2 - compact: the schema lives in a short system prompt, the user
+#        message is just the (whitespace-collapsed) resume. Uses the
+#        provider's structured output (Groq JSON mode, Anthropic forced
+#        tool call), temperature 0.2, and an output cap derived from
+#        per-field limits that are also enforced on the reply.
+#
+# A template never changes once resumes were analyzed with it: add a new
+# version instead, so Resume.prompt_version keeps meaning one prompt.
+#
+# PROMPT_VERSION picks the template; PROMPT_EXPERIMENT ("v1:20,v2:80")
+# splits uploads between versions instead, stably per resume, and
+# `manage.py prompt_report` compares them.
+# ----------------------------------------------------------------------
+
+SCORE_FIELDS = ('overall_score', 'ats_score')
+
+# Rough tokens per English word for the output cap
+TOKENS_PER_WORD = 1.4
+# JSON keys, quotes and punctuation
+JSON_OVERHEAD_TOKENS = 80
+
+
+class FieldCap:
+    def __init__(self, items, words):
+        self.items = items
+        self.words = words
+
+    def clip(self, values):
+        if not isinstance(values, list):
+            values = [values] if values else []
+        clipped = []
+        for value in values[:self.items]:
+            words = str(value).split()
+            if words:
+                clipped.append(' '.join(words[:self.words]))
+        return clipped
+
+
+class PromptTemplate:
+    def __init__(self, version, system, user, changes_user, temperature, top_p=None,
+                 max_tokens=None, fields=None, structured=False, max_resume_chars=4000,
+                 collapse_whitespace=False):
+        self.version = version
+        self.system = system
+        self.user = user
+        self.changes_user = changes_user
+        self.temperature = temperature
+        self.top_p = top_p
+        self.fields = fields or {}
+        self.structured = structured
+        self.max_resume_chars = max_resume_chars
+        self.collapse_whitespace = collapse_whitespace
+        self.max_tokens = max_tokens or self._output_budget()
+
+    def _output_budget(self):
+        words = sum(cap.items * cap.words for cap in self.fields.values())
+        return int(words * TOKENS_PER_WORD) + JSON_OVERHEAD_TOKENS
+
+    def json_schema(self):
+        """
+        JSON schema of the reply, for providers with tool calling.
+        """
+        properties = {field: {'type': 'integer', 'minimum': 0, 'maximum': 100} for field in SCORE_FIELDS}
+        for field, cap in self.fields.items():
+            properties[field] = {'type': 'array', 'items': {'type': 'string'}, 'maxItems': cap.items}
+        return {'type': 'object', 'properties': properties, 'required': list(properties)}
+
+    def _resume(self, resume_text):
+        if self.collapse_whitespace:
+            # PDF extraction leaves runs of spaces and blank lines, each a token
+            resume_text = '\n'.join(' '.join(line.split()) for line in resume_text.splitlines() if line.strip())
+        return resume_text[:self.max_resume_chars]
+
+    def _request(self, prompt, resume_text):
+        return {
+            "version": self.version,
+            "system": self.system,
+            "prompt": prompt,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "top_p": self.top_p,
+            "json_schema": self.json_schema() if self.structured else None,
+            # The local fallback scores the text itself instead of the prompt
+            "resume_text": resume_text,
+        }
+
+    def analysis_request(self, resume_text):
+        return self._request(self.user.format(resume=self._resume(resume_text)), resume_text)
+
+    def changes_request(self, changes, previous_feedback, resume_text):
+        """
+        Cheaper request for a near-duplicate upload (AI_APP/similarity.py):
+        only the lines that changed since the previous version, together
+        with that version's feedback.
+        """
+        sections = "\n\n".join(
+            "\n".join([f"[{heading}]"] + [f"+ {line}" for line in added] + [f"- {line}" for line in removed])
+            for heading, added, removed in changes
+        )[:3000]
+        previous = json.dumps(previous_feedback, ensure_ascii=False, separators=(',', ':'))
+        return self._request(self.changes_user.format(changes=sections, previous=previous), resume_text)
+
+    def clean(self, feedback):
+        """
+        Enforce the field caps on a parsed reply.
+        """
+        feedback = dict(feedback)
+        for field in SCORE_FIELDS:
+            try:
+                feedback[field] = max(0, min(100, int(feedback.get(field) or 0)))
+            except (TypeError, ValueError):
+                feedback[field] = 0
+        for field, cap in self.fields.items():
+            feedback[field] = cap.clip(feedback.get(field))
+        return feedback
+
+
+V1 = PromptTemplate(
+    version='v1',
+    system=(
+        "You are an expert resume analyzer. "
+        "Always respond with valid JSON only — no markdown, no extra commentary."
+    ),
+    user="""You are an expert resume analyzer and career coach.
+Analyze this resume for a full-stack developer position.
+Provide constructive, actionable feedback in JSON format.
+
+Resume text:
+{resume}
+
+Please respond ONLY with valid JSON in this exact format (no markdown, no code blocks):
+{{
+    "overall_score": <number 0-100>,
+    "strengths": [<list of 3-5 key strengths as strings>],
+    "weaknesses": [<list of 3-5 areas to improve as strings>],
+    "missing_skills": [<list of important full-stack skills not mentioned as strings>],
+    "improvement_suggestions": [<list of 5-7 specific actionable suggestions as strings>],
+    "ats_score": <number 0-100 for ATS-friendliness>
+}}
+
+Make sure each field contains actual strings, not null or empty values.
+If you cannot analyse the resume, provide default scores of 50.""",
+    changes_user="""You previously analyzed a resume for a full-stack developer position.
+The candidate has uploaded a new version. Only these lines changed
+("+" added, "-" removed), grouped by section:
+
+{changes}
+
+Your previous analysis (JSON):
+{previous}
+
+Update the analysis for the new version: re-score only what the changed sections
+affect and keep everything else as it was.
+
+Please respond ONLY with valid JSON in exactly the same format as the previous
+analysis (no markdown, no code blocks).""",
+    # ------------------------------------------------------------------
+    #   max_tokens   – limit generated response length
+    #   temperature  – 0.7 gives balanced creativity vs. determinism
+    #   top_p        – nucleus sampling: consider top-90% probable tokens
+    # ------------------------------------------------------------------
+    temperature=0.7,
+    top_p=0.9,
+    max_tokens=1500,
+)
+
+V2_FIELDS = {
+    'strengths': FieldCap(items=5, words=15),
+    'weaknesses': FieldCap(items=5, words=15),
+    'missing_skills': FieldCap(items=8, words=3),
+    'improvement_suggestions': FieldCap(items=7, words=20),
+}
+
+V2 = PromptTemplate(
+    version='v2',
+    system=(
+        "Review resumes for full-stack developer roles. Reply with one JSON object: "
+        '{"overall_score":0-100,"ats_score":0-100,'
+        '"strengths":[3-5, each <=15 words],"weaknesses":[3-5, each <=15 words],'
+        '"missing_skills":[<=8 skill names],"improvement_suggestions":[5-7, each <=20 words]}. '
+        "Be specific to this resume. No other text."
+    ),
+    user="{resume}",
+    changes_user=(
+        "Previous analysis of this resume:\n{previous}\n\n"
+        "The new version changed only these lines (+ added, - removed):\n{changes}\n\n"
+        "Return the updated analysis, keeping unaffected parts."
+    ),
+    temperature=0.2,
+    fields=V2_FIELDS,
+    structured=True,
+    collapse_whitespace=True,
+)
+
+TEMPLATES = {template.version: template for template in (V1, V2)}
+
+
+def get_template(version=None):
+    version = version or settings.PROMPT_VERSION
+    try:
+        return TEMPLATES[version]
+    except KeyError:
+        raise ImproperlyConfigured(f"Unknown prompt version {version!r} (have {', '.join(TEMPLATES)}).")
+
+
+def experiment_arms():
+    """
+    [(version, weight)] from PROMPT_EXPERIMENT, or [] when no experiment runs.
+    """
+    arms = []
+    for part in settings.PROMPT_EXPERIMENT.split(','):
+        if not part.strip():
+            continue
+        version, _, weight = part.partition(':')
+        get_template(version.strip())
+        arms.append((version.strip(), int(weight or 1)))
+    return arms
+
+
+def choose_version(resume_id):
+    """
+    Template version for a resume: PROMPT_VERSION, or its experiment arm.
+    The same resume always lands in the same arm (reanalysis included).
+    """
+    arms = experiment_arms()
+    if not arms:
+        return settings.PROMPT_VERSION
+    bucket = int.from_bytes(hashlib.blake2b(str(resume_id).encode(), digest_size=4).digest(), 'big')
+    point = bucket % sum(weight for _, weight in arms)
+    for version, weight in arms:
+        if point < weight:
+            return version
+        point -= weight
@@ -0,0 +1,221 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from .models import MissingSkillCount, Resume, ResumeDailyStats
+
+
+# ----------------------------------------------------------------------
+# Incrementally maintained per-user analytics.
+#
+# Every completed analysis adds itself to two small tables:
+# - ResumeDailyStats: count + score sums per user per day (trends, averages)
+# - MissingSkillCount: one counter per user per missing skill
+# and removes itself again before a reanalysis or deletion. Reading the
+# stats is then a handful of indexed rows, no matter how many resumes the
+# user has, and `missing_skills` JSON arrays are never unpacked at read time.
+# ----------------------------------------------------------------------
+
+
+def normalize_skill(skill):
+    return " ".join(str(skill).lower().split())[:255]
+
+
+def _score(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _skills(missing_skills):
+    # Deduplicate per resume so one resume counts a skill at most once
+    skills = {}
+    for skill in missing_skills or []:
+        key = normalize_skill(skill)
+        if key:
+            skills.setdefault(key, str(skill).strip()[:255])
+    return skills
+
+
+def record_analysis(resume):
+    """
+    Add a just-completed analysis to its owner's rollups.
+    Call after the results are saved; no-op if it is already counted.
+    """
+    if resume.status != 'completed' or resume.stats_day is not None:
+        return
+
+    day = timezone.localdate(resume.analyzed_at or timezone.now())
+    with transaction.atomic():
+        # Compare-and-set: only one of two processes saving the same row
+        # counts it
+        counted = Resume.objects.filter(pk=resume.pk, stats_day__isnull=True).update(stats_day=day)
+        if counted:
+            resume.stats_day = day
+            _bump(resume, day, +1)
+
+
+def forget_analysis(resume):
+    """
+    Remove an analysis from its owner's rollups (before it is reanalyzed,
+    fails on reanalysis, or is deleted). No-op if it isn't counted.
+
+    Goes by the stored row, not the in-memory `resume`: two workers on
+    the same row (a requeued job) or the janitor failing it may hold stale
+    copies, and only the one that clears stats_day subtracts the analysis.
+    """
+    resume.stats_day = None
+    with transaction.atomic():
+        counted = (
+            Resume.objects.select_for_update()
+            .filter(pk=resume.pk, stats_day__isnull=False)
+            .only('user_id', 'stats_day', 'overall_score', 'ats_score', 'missing_skills')
+            .first()
+        )
+        if counted is None:
+            return
+        # Compare-and-set: SQLite has no row locks
+        forgotten = Resume.objects.filter(pk=resume.pk, stats_day=counted.stats_day).update(stats_day=None)
+        if forgotten:
+            _bump(counted, counted.stats_day, -1)
+
+
+def _bump(resume, day, sign):
+    # Make sure the rows exist, then update with F() so concurrent
+    # workers never lose an increment
+    ResumeDailyStats.objects.bulk_create(
+        [ResumeDailyStats(user_id=resume.user_id, day=day)],
+        ignore_conflicts=True,
+    )
+    ResumeDailyStats.objects.filter(user_id=resume.user_id, day=day).update(
+        analyses=F('analyses') + sign,
+        overall_score_sum=F('overall_score_sum') + sign * _score(resume.overall_score),
+        ats_score_sum=F('ats_score_sum') + sign * _score(resume.ats_score),
+    )
+
+    skills = _skills(resume.missing_skills)
+    if not skills:
+        return
+    if sign > 0:
+        MissingSkillCount.objects.bulk_create(
+            [
+                MissingSkillCount(user_id=resume.user_id, skill=key, label=label)
+                for key, label in skills.items()
+            ],
+            ignore_conflicts=True,
+        )
+    counters = MissingSkillCount.objects.filter(user_id=resume.user_id, skill__in=skills)
+    counters.update(count=F('count') + sign)
+    if sign < 0:
+        counters.filter(count__lte=0).delete()
+
+
+def user_stats(user, days=90, limit=10):
+    """
+    Payload of GET /api/resumes/stats/, read entirely from the rollups.
+    """
+    totals = ResumeDailyStats.objects.filter(user=user).aggregate(
+        analyses=Sum('analyses'),
+        overall=Sum('overall_score_sum'),
+        ats=Sum('ats_score_sum'),
+    )
+    analyses = totals['analyses'] or 0
+
+    since = timezone.localdate() - timedelta(days=days - 1)
+    trend = [
+        {
+            "date": row.day.isoformat(),
+            "analyses": row.analyses,
+            "average_overall_score": _average(row.overall_score_sum, row.analyses),
+            "average_ats_score": _average(row.ats_score_sum, row.analyses),
+        }
+        for row in ResumeDailyStats.objects.filter(user=user, day__gte=since, analyses__gt=0)
+    ]
+
+    top_missing_skills = [
+        {"skill": label, "count": count}
+        for label, count in MissingSkillCount.objects.filter(user=user, count__gt=0)
+        .order_by('-count', 'skill')
+        .values_list('label', 'count')[:limit]
+    ]
+
+    return {
+        "total_analyses": analyses,
+        "average_overall_score": _average(totals['overall'], analyses),
+        "average_ats_score": _average(totals['ats'], analyses),
+        "trend": trend,
+        "top_missing_skills": top_missing_skills,
+    }
+
+
+def _average(total, n):
+    return round(total / n, 1) if n else None
+
+
+def rebuild(user=None):
+    """
+    Recompute the rollups from the Resume table (all users, or one).
+    Used by `manage.py rebuild_resume_stats` after bulk imports or to
+    repair drift. Returns the number of completed analyses counted.
+    """
+    resumes = Resume.objects.all()
+    if user is not None:
+        resumes = resumes.filter(user=user)
+    completed = resumes.filter(status='completed')
+
+    with transaction.atomic():
+        daily = ResumeDailyStats.objects.all()
+        skills = MissingSkillCount.objects.all()
+        if user is not None:
+            daily = daily.filter(user=user)
+            skills = skills.filter(user=user)
+        daily.delete()
+        skills.delete()
+
+        resumes.update(stats_day=None)
+        completed.update(stats_day=TruncDate('analyzed_at'))
+        # Completed rows without analyzed_at (shouldn't happen) count today
+        completed.filter(stats_day__isnull=True).update(stats_day=timezone.localdate())
+
+        rows = (
+            completed.values('user_id', 'stats_day')
+            .annotate(
+                analyses=Count('id'),
+                overall=Sum('overall_score'),
+                ats=Sum('ats_score'),
+            )
+            .order_by()
+        )
+        ResumeDailyStats.objects.bulk_create(
+            [
+                ResumeDailyStats(
+                    user_id=row['user_id'],
+                    day=row['stats_day'],
+                    analyses=row['analyses'],
+                    overall_score_sum=row['overall'] or 0,
+                    ats_score_sum=row['ats'] or 0,
+                )
+                for row in rows
+            ],
+            batch_size=1000,
+        )
+
+        # The only place skill arrays are unpacked
+        counters = {}
+        for user_id, missing in completed.values_list('user_id', 'missing_skills').iterator(chunk_size=2000):
+            for key, label in _skills(missing).items():
+                counter = counters.setdefault((user_id, key), [label, 0])
+                counter[1] += 1
+        MissingSkillCount.objects.bulk_create(
+            [
+                MissingSkillCount(user_id=user_id, skill=key, label=label, count=count)
+                for (user_id, key), (label, count) in counters.items()
+            ],
+            batch_size=1000,
+        )
+
+    return completed.count()
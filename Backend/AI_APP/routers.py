@@ -0,0 +1,79 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+
+# ----------------------------------------------------------------------
+# Read-replica routing (DATABASE_REPLICA_URLS).
+#
+# Nothing goes to a replica by default. Views opt in per request with
+# `replica_reads(user_id)` (ResumeViewSet list / retrieve / stats and
+# their async twins); every read inside it uses one randomly picked
+# replica, every write still goes to the primary.
+#
+# Read-your-writes: replicas lag a little behind the primary, so a user
+# who just uploaded, reanalyzed, deleted or got a result would see their
+# old list. `mark_user_write(user_id)` pins that user's reads to the
+# primary for DATABASE_REPLICA_STICKY_SECONDS. The pin is kept in the
+# cache, so it is only seen by all workers (and the queued analysis
+# worker) with the shared Redis cache.
+# ----------------------------------------------------------------------
+
+_read_alias = ContextVar('read_alias', default=None)
+
+_STICKY_KEY = 'db:sticky:%s'
+
+
+def mark_user_write(user_id):
+    if settings.DATABASE_REPLICAS:
+        cache.set(_STICKY_KEY % user_id, 1, timeout=settings.DATABASE_REPLICA_STICKY_SECONDS)
+
+
+def replica_for(user_id):
+    """
+    Replica alias to read `user_id`'s data from, or None for the primary.
+    """
+    if not settings.DATABASE_REPLICAS or cache.get(_STICKY_KEY % user_id):
+        return None
+    return random.choice(settings.DATABASE_REPLICAS)
+
+
+def start_replica_reads(user_id):
+    """
+    Route this context's reads to a replica; returns a token for
+    `stop_replica_reads`.
+    """
+    return _read_alias.set(replica_for(user_id))
+
+
+def stop_replica_reads(token):
+    _read_alias.reset(token)
+
+
+@contextmanager
+def replica_reads(user_id):
+    token = start_replica_reads(user_id)
+    try:
+        yield
+    finally:
+        stop_replica_reads(token)
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        # Explicitly, or Django would save an instance loaded from a
+        # replica back to that replica
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
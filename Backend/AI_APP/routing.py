@@ -0,0 +1,6 @@
+from django.urls import path
+from .consumers import ResumeStatusConsumer
+
+websocket_urlpatterns = [
+    path('ws/resumes/status/', ResumeStatusConsumer.as_asgi()),
+]
@@ -0,0 +1,252 @@
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Min
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Resume, User
+from .notifications import publish_resume_status
+
+
+# ----------------------------------------------------------------------
+# DB-backed analysis queue with per-user fair share.
+#
+# The queue *is* the Resume table: status='pending' rows are waiting,
+# status='processing' rows are running. No broker needed, any number of
+# `run_analysis_worker` processes can pull from it.
+#
+# Picking the next job:
+# 1. Lanes are strict priorities: interactive uploads run before bulk
+#    uploads, which run before reanalysis jobs.
+# 2. Users already running ANALYSIS_MAX_CONCURRENT_PER_USER jobs are
+#    skipped entirely.
+# 3. Inside a lane, the user with the fewest running jobs wins, ties go
+#    to whoever was served least recently. So one user queueing 200
+#    resumes gets one slot per "round", not the whole worker pool.
+# 4. That user's oldest job in the lane is claimed.
+#
+# A claimed job is leased to its worker (claimed_by). The worker renews
+# the lease with `heartbeat()` while the analysis runs and checks it with
+# `check_lease()` before saving anything, so a job requeued by
+# `requeue_stale()` is never saved twice.
+# ----------------------------------------------------------------------
+
+class LeaseLost(Exception):
+    """
+    The job was requeued while this worker ran it (its heartbeat stopped
+    for too long) and may belong to another worker now.
+    """
+
+
+INTERACTIVE = 0
+BULK = 10
+REANALYSIS = 20
+
+LANES = {
+    INTERACTIVE: 'interactive',
+    BULK: 'bulk',
+    REANALYSIS: 'reanalysis',
+}
+
+
+def is_queued_mode():
+    return settings.ANALYSIS_MODE == 'queued'
+
+
+def lane_for_upload(user_id):
+    """
+    A single upload is interactive; once a user already has
+    ANALYSIS_BULK_THRESHOLD jobs waiting, further uploads go to the bulk lane.
+    """
+    waiting = Resume.objects.filter(user_id=user_id, status='pending').count()
+    return BULK if waiting >= settings.ANALYSIS_BULK_THRESHOLD else INTERACTIVE
+
+
+def enqueue(resume, lane=INTERACTIVE):
+    """
+    Put `resume` in the queue. A worker will pick it up with `claim_next()`.
+    """
+    resume.status = 'pending'
+    resume.priority = lane
+    resume.queued_at = timezone.now()
+    resume.started_at = None
+    resume.claimed_by = ''
+    resume.save(update_fields=['status', 'priority', 'queued_at', 'started_at', 'claimed_by'])
+    publish_resume_status(resume)
+    return resume
+
+
+def claim_next():
+    """
+    Atomically move the next fair-share job from 'pending' to 'processing'
+    and return it, or None if nothing is runnable right now. The returned
+    job is leased to the caller: `resume.claimed_by` is its lease token.
+    """
+    cap = settings.ANALYSIS_MAX_CONCURRENT_PER_USER
+
+    for lane in sorted(LANES):
+        # Users with work in this lane, least-busy / least-recently-served first
+        for user_id in _fair_user_order(lane, cap):
+            resume = _claim_for_user(user_id, lane, cap)
+            if resume is not None:
+                return resume
+    return None
+
+
+def _fair_user_order(lane, cap):
+    waiting = (
+        Resume.objects.filter(status='pending', priority=lane)
+        .values('user')
+        .annotate(oldest=Min('queued_at'))
+    )
+    waiting = {row['user']: row['oldest'] for row in waiting}
+    if not waiting:
+        return []
+
+    running = dict(
+        Resume.objects.filter(status='processing', user__in=waiting)
+        .values('user')
+        .annotate(n=Count('id'))
+        .values_list('user', 'n')
+    )
+    last_served = dict(
+        Resume.objects.filter(user__in=waiting, started_at__isnull=False)
+        .values('user')
+        .annotate(last=Max('started_at'))
+        .values_list('user', 'last')
+    )
+
+    never = timezone.now() - timedelta(days=365 * 100)
+    eligible = [user_id for user_id in waiting if running.get(user_id, 0) < cap]
+    return sorted(
+        eligible,
+        key=lambda user_id: (
+            running.get(user_id, 0),
+            last_served.get(user_id) or never,
+            waiting[user_id],
+        ),
+    )
+
+
+def _claim_for_user(user_id, lane, cap):
+    with transaction.atomic():
+        # Serialise claims for one user so concurrent workers can't
+        # exceed the per-user cap. SQLite ignores FOR UPDATE and has no row
+        # locks: concurrent writers fail with "database is locked" instead,
+        # so run_analysis_worker only runs one thread there
+        User.objects.select_for_update().filter(pk=user_id).first()
+
+        if Resume.objects.filter(user_id=user_id, status='processing').count() >= cap:
+            return None
+
+        candidate = (
+            Resume.objects.filter(user_id=user_id, status='pending', priority=lane)
+            .order_by('queued_at')
+            .values_list('pk', flat=True)
+            .first()
+        )
+        if candidate is None:
+            return None
+
+        # Compare-and-set: only one worker wins this row
+        now = timezone.now()
+        claimed = Resume.objects.filter(pk=candidate, status='pending').update(
+            status='processing', started_at=now, heartbeat_at=now, claimed_by=uuid.uuid4().hex
+        )
+        if not claimed:
+            return None
+
+    return Resume.objects.get(pk=candidate)
+
+
+def heartbeat(leases):
+    """
+    Renew the leases of the jobs a worker is running. Returns the number
+    of jobs it still holds.
+    """
+    if not leases:
+        return 0
+    return Resume.objects.filter(status='processing', claimed_by__in=leases).update(
+        heartbeat_at=timezone.now()
+    )
+
+
+def check_lease(resume):
+    """
+    Raise LeaseLost unless `resume` is still leased to the worker that
+    claimed it. Call it inside the transaction that saves the job, it locks
+    the row so `requeue_stale()` can't take the job in between. Jobs
+    analyzed inline have no lease and always pass.
+    """
+    if not resume.claimed_by:
+        return
+    owned = (
+        Resume.objects.select_for_update()
+        .filter(pk=resume.pk, status='processing', claimed_by=resume.claimed_by)
+        .exists()
+    )
+    if not owned:
+        raise LeaseLost(resume.pk)
+
+
+def requeue_stale(max_age=None):
+    """
+    Put 'processing' jobs whose worker died (no heartbeat for `max_age`)
+    back in the queue and notify their owners. Returns the number of jobs
+    requeued.
+    """
+    max_age = max_age or timedelta(seconds=settings.ANALYSIS_STALE_AFTER_SECONDS)
+    now = timezone.now()
+    stale = Resume.objects.alias(alive_at=Coalesce('heartbeat_at', 'started_at')).filter(
+        status='processing', alive_at__lt=now - max_age
+    )
+
+    requeued = 0
+    for resume in stale:
+        # Compare-and-set: a heartbeat or save that landed after the scan wins
+        moved = Resume.objects.filter(
+            pk=resume.pk,
+            status='processing',
+            claimed_by=resume.claimed_by,
+            heartbeat_at=resume.heartbeat_at,
+        ).update(status='pending', queued_at=now, started_at=None, heartbeat_at=None, claimed_by='')
+        if not moved:
+            continue
+        resume.status = 'pending'
+        resume.queued_at = now
+        resume.started_at = resume.heartbeat_at = None
+        resume.claimed_by = ''
+        publish_resume_status(resume)
+        requeued += 1
+    return requeued
+
+
+def queue_depth(user=None):
+    """
+    Introspection: waiting jobs per lane, running jobs, and how many users
+    are waiting. Restricted to one user's jobs when `user` is given.
+    """
+    queryset = Resume.objects.filter(status__in=['pending', 'processing'])
+    if user is not None:
+        queryset = queryset.filter(user=user)
+
+    depth = {
+        'pending': {name: 0 for name in LANES.values()},
+        'processing': 0,
+    }
+    rows = queryset.values('status', 'priority').annotate(n=Count('id'))
+    for row in rows:
+        if row['status'] == 'processing':
+            depth['processing'] += row['n']
+        else:
+            depth['pending'][LANES.get(row['priority'], str(row['priority']))] += row['n']
+    depth['pending_total'] = sum(depth['pending'].values())
+
+    if user is None:
+        depth['users_waiting'] = (
+            Resume.objects.filter(status='pending').values('user').distinct().count()
+        )
+    return depth
@@ -0,0 +1,129 @@
+import os
+import re
+from email.utils import formatdate
+from urllib.parse import quote
+
+from django.conf import settings
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils.http import parse_etags
+
+
+# ----------------------------------------------------------------------
+# Serving stored files without streaming them through a Python worker.
+#
+# SENDFILE_BACKEND = 'nginx'  -> respond with an empty body and an
+#     X-Accel-Redirect header; nginx serves the file from its internal
+#     location (sendfile(2), Range, keep-alive) while the Django worker
+#     is already free for the next request.
+# SENDFILE_BACKEND = 'django' -> dev fallback: stream the file ourselves,
+#     with the same ETag and single-range support.
+# ----------------------------------------------------------------------
+
+_RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+_CHUNK_SIZE = 64 * 1024
+
+
+def file_etag(stat):
+    # Same format nginx uses for static files ("<mtime>-<size>" in hex), so
+    # the ETag doesn't change between the django and nginx backends.
+    return f'"{int(stat.st_mtime):x}-{stat.st_size:x}"'
+
+
+def sendfile_response(request, field_file, filename, content_type="application/pdf"):
+    """
+    Return a response that delivers `field_file` (a FieldFile on local
+    storage) to the client, honouring If-None-Match and Range.
+    """
+    path = field_file.path
+    stat = os.stat(path)
+    etag = file_etag(stat)
+
+    if_none_match = request.META.get("HTTP_IF_NONE_MATCH")
+    if if_none_match and (if_none_match.strip() == "*" or etag in parse_etags(if_none_match)):
+        response = HttpResponse(status=304)
+        response["ETag"] = etag
+        return response
+
+    if settings.SENDFILE_BACKEND == "nginx":
+        response = HttpResponse(content_type=content_type)
+        response["X-Accel-Redirect"] = quote(settings.SENDFILE_URL_PREFIX + field_file.name)
+    else:
+        response = _ranged_file_response(request, path, stat, etag, content_type)
+
+    response["ETag"] = etag
+    response["Last-Modified"] = formatdate(stat.st_mtime, usegmt=True)
+    response["Accept-Ranges"] = "bytes"
+    response["Cache-Control"] = "private, no-cache"
+    response["Content-Disposition"] = f"inline; filename*=UTF-8''{quote(filename)}"
+    return response
+
+
+def _ranged_file_response(request, path, stat, etag, content_type):
+    size = stat.st_size
+    byte_range = _parse_range(request, etag, size)
+
+    if byte_range == "unsatisfiable":
+        response = HttpResponse(status=416)
+        response["Content-Range"] = f"bytes */{size}"
+        return response
+
+    if byte_range is None:
+        start, end, status = 0, size - 1, 200
+    else:
+        (start, end), status = byte_range, 206
+
+    length = end - start + 1
+    response = StreamingHttpResponse(
+        _read_range(path, start, length), status=status, content_type=content_type
+    )
+    response["Content-Length"] = str(length)
+    if status == 206:
+        response["Content-Range"] = f"bytes {start}-{end}/{size}"
+    return response
+
+
+def _parse_range(request, etag, size):
+    """
+    Return (start, end) for a satisfiable single range, None to send the
+    whole file, or "unsatisfiable".
+    """
+    header = request.META.get("HTTP_RANGE")
+    if not header or size == 0:
+        return None
+
+    # If-Range: only honour the range if the client's copy is current
+    if_range = request.META.get("HTTP_IF_RANGE")
+    if if_range and if_range.strip() != etag:
+        return None
+
+    match = _RANGE_RE.match(header.strip())
+    if not match:
+        # Multi-range or malformed: ignoring Range is always allowed
+        return None
+
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        suffix = int(last)
+        if suffix == 0:
+            return "unsatisfiable"
+        return max(size - suffix, 0), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        return "unsatisfiable"
+    return start, end
+
+
+def _read_range(path, start, length):
+    with open(path, "rb") as f:
+        f.seek(start)
+        while length > 0:
+            chunk = f.read(min(_CHUNK_SIZE, length))
+            if not chunk:
+                break
+            length -= len(chunk)
+            yield chunk
@@ -2,6 +2,7 @@ from django.contrib.auth.password_validation import validate_password
 from rest_framework import serializers
 from django.contrib.auth import authenticate
 from django.utils import timezone
+from django.urls import reverse
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 from .models import User, Resume
@@ -79,6 +80,8 @@ class ResumeUploadSerializer(serializers.ModelSerializer):
         model = Resume
         fields = ["id", "pdf_file", "file_name", "created_at"]
         read_only_fields = ["id", "created_at"]
+        # Media isn't public, the file is fetched through download_url
+        extra_kwargs = {"pdf_file": {"write_only": True}}
     
     def validate_pdf_file(self, value):
         if not value.name.lower().endswith('.pdf'):
@@ -90,12 +93,17 @@ class ResumeUploadSerializer(serializers.ModelSerializer):
     
     
 class ResumeAnalysisSerializer(serializers.ModelSerializer):
+    # Authorised download (GET /api/resumes/{id}/download/), served by nginx
+    download_url = serializers.SerializerMethodField()
+    # Stored compressed (AI_APP/fields.py), DRF can't infer the field type
+    full_feedback = serializers.JSONField(read_only=True)
+
     class Meta:
         model = Resume
         fields = [
             'id',
             'file_name',
-            'pdf_file',
+            'download_url',
             'overall_score',
             'strengths',
             'weaknesses',
@@ -105,7 +113,10 @@ class ResumeAnalysisSerializer(serializers.ModelSerializer):
             'full_feedback',   # ← was 'analysis_result'
             'created_at',
             'analyzed_at',
+            'analyzed_by',
             'status',
+            'duplicate_of',
+            'similarity',
         ]
         read_only_fields = [
             'overall_score',
@@ -116,5 +127,15 @@ class ResumeAnalysisSerializer(serializers.ModelSerializer):
             'ats_score',
             'full_feedback',   # ← was 'analysis_result'
             'analyzed_at',
+            'analyzed_by',
             'status',
+            'duplicate_of',
+            'similarity',
         ]
+
+    def get_download_url(self, obj):
+        if not obj.pdf_file:
+            return None
+        url = reverse('resume-download', kwargs={'pk': obj.pk})
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
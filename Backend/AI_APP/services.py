@@ -0,0 +1,246 @@
+import logging
+
+from asgiref.sync import sync_to_async
+from django.db import connection, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .janitor import schedule_file_deletion
+from .models import Resume
+from .rollups import forget_analysis, record_analysis
+from .routers import mark_user_write
+from .notifications import publish_resume_status, apublish_resume_status
+from .prompts import choose_version
+from .scheduler import LeaseLost, check_lease, enqueue, is_queued_mode, lane_for_upload
+from .similarity import diff_analysis_input, index_resume
+from .analyzers import (
+    analyze_resume,
+    aanalyze_resume,
+    analyze_resume_changes,
+    aanalyze_resume_changes,
+    on_hedge_usage,
+)
+from .utils import extract_text_from_pdf
+
+logger = logging.getLogger(__name__)
+
+
+def submit_resume(resume, lane=None):
+    """
+    Analyze `resume` now (ANALYSIS_MODE=inline) or put it in the fair-share
+    queue for `run_analysis_worker` (ANALYSIS_MODE=queued).
+    """
+    # The uploader's next reads must see the new row, not a lagging replica
+    mark_user_write(resume.user_id)
+    if is_queued_mode():
+        if lane is None:
+            lane = lane_for_upload(resume.user_id)
+        return enqueue(resume, lane)
+
+    if resume.status != 'processing':
+        # A reanalysis; started_at times it for the janitor's abandoned rule
+        resume.status = 'processing'
+        resume.started_at = timezone.now()
+        resume.save(update_fields=['status', 'started_at'])
+    return process_resume(resume)
+
+
+async def asubmit_resume(resume, lane=None):
+    """
+    Async version of `submit_resume`.
+    """
+    await sync_to_async(mark_user_write)(resume.user_id)
+    if is_queued_mode():
+        if lane is None:
+            lane = await sync_to_async(lane_for_upload)(resume.user_id)
+        return await sync_to_async(enqueue)(resume, lane)
+
+    if resume.status != 'processing':
+        resume.status = 'processing'
+        resume.started_at = timezone.now()
+        await resume.asave(update_fields=['status', 'started_at'])
+    return await aprocess_resume(resume)
+
+
+def process_resume(resume):
+    """
+    Run the analysis pipeline for a saved Resume:
+    extract text -> find near-duplicates -> analyze (AI_APP/analyzers.py) -> store results.
+
+    Shared by the DRF (sync) viewset and the async views so both serving
+    modes produce exactly the same rows. Status changes are pushed to the
+    owner's WebSocket subscribers (see AI_APP/notifications.py).
+    """
+    publish_resume_status(resume)
+    try:
+        # Step 1: Extract text
+        extracted_text = extract_text_from_pdf(resume.pdf_file)
+
+        if not extracted_text:
+            _save_failure(resume, "Could not extract text from PDF")
+            publish_resume_status(resume)
+            return resume
+
+        resume.extracted_text = extracted_text
+        previous = index_resume(resume)
+        _save_extracted(resume)
+
+        # Step 2: Analyze (only the changes for a near-duplicate when
+        # NEAR_DUPLICATE_ANALYSIS=diff), with this resume's prompt version
+        version = choose_version(resume.pk)
+        changes = diff_analysis_input(previous, resume)
+        if changes is None:
+            analysis = analyze_resume(extracted_text, version)
+        else:
+            analysis = analyze_resume_changes(changes, previous.full_feedback, extracted_text, version)
+            _mark_incremental(analysis, previous)
+
+        # Step 3: Save results (and update the user's stats rollups)
+        _save_results(resume, analysis)
+        _count_hedge_usage(resume, analysis)
+
+    except LeaseLost:
+        _log_lease_lost(resume)
+        return resume
+    except Exception as e:
+        _save_failure(resume, f"Analysis failed: {str(e)[:200]}")
+
+    publish_resume_status(resume)
+    return resume
+
+
+async def aprocess_resume(resume):
+    """
+    Async version of `process_resume`.
+
+    PDF parsing is CPU-bound, so it runs in a worker thread; the LLM call
+    and the ORM writes are awaited natively. The final result is written in
+    a transaction together with the rollups, so that part runs in a thread.
+    """
+    await apublish_resume_status(resume)
+    try:
+        extracted_text = await sync_to_async(
+            extract_text_from_pdf, thread_sensitive=False
+        )(resume.pdf_file)
+
+        if not extracted_text:
+            await sync_to_async(_save_failure)(resume, "Could not extract text from PDF")
+            await apublish_resume_status(resume)
+            return resume
+
+        resume.extracted_text = extracted_text
+        previous = await sync_to_async(index_resume)(resume)
+        await sync_to_async(_save_extracted)(resume)
+
+        version = choose_version(resume.pk)
+        changes = await sync_to_async(diff_analysis_input)(previous, resume)
+        if changes is None:
+            analysis = await aanalyze_resume(extracted_text, version)
+        else:
+            analysis = await aanalyze_resume_changes(
+                changes, previous.full_feedback, extracted_text, version
+            )
+            _mark_incremental(analysis, previous)
+
+        await sync_to_async(_save_results)(resume, analysis)
+        _count_hedge_usage(resume, analysis)
+
+    except LeaseLost:
+        _log_lease_lost(resume)
+        return resume
+    except Exception as e:
+        await sync_to_async(_save_failure)(resume, f"Analysis failed: {str(e)[:200]}")
+
+    await apublish_resume_status(resume)
+    return resume
+
+
+def delete_resume(resume):
+    """
+    Delete the row now; the PDF itself is removed later by the storage
+    janitor so the request never waits on (or fails because of) the disk.
+    """
+    with transaction.atomic():
+        forget_analysis(resume)
+        name = resume.pdf_file.name if resume.pdf_file else ''
+        resume.delete()
+        schedule_file_deletion(name)
+    mark_user_write(resume.user_id)
+
+
+def _mark_incremental(analysis, previous):
+    # The local fallback always scores the whole text
+    if analysis.backend != 'local':
+        analysis.feedback['incremental_from'] = str(previous.pk)
+
+
+def _log_lease_lost(resume):
+    # requeue_stale() gave the job to another worker, which saves the result
+    logger.warning("Resume %s was requeued while it was analyzed, dropping this result", resume.id)
+
+
+def _save_extracted(resume):
+    with transaction.atomic():
+        check_lease(resume)
+        resume.save()
+
+
+def _save_results(resume, analysis):
+    with transaction.atomic():
+        check_lease(resume)
+        resume.claimed_by = ''
+        # A reanalysis replaces the previous result in the rollups
+        forget_analysis(resume)
+        _apply_feedback(resume, analysis.feedback)
+        # what the analysis cost, compared per prompt version by
+        # `manage.py prompt_report`
+        resume.analyzed_by = analysis.backend
+        resume.prompt_version = analysis.prompt_version
+        resume.input_tokens = analysis.input_tokens
+        resume.output_tokens = analysis.output_tokens
+        resume.analysis_ms = analysis.latency_ms
+        resume.save()
+        record_analysis(resume)
+    mark_user_write(resume.user_id)
+
+
+def _count_hedge_usage(resume, analysis):
+    # A hedged call that lost the race is billed too: add its tokens to
+    # this analysis when it answers, so prompt_report shows the real cost
+    def add(input_tokens, output_tokens):
+        try:
+            # Unless the resume was analyzed again meanwhile
+            Resume.objects.filter(pk=resume.pk, analyzed_at=resume.analyzed_at).update(
+                input_tokens=Coalesce(F('input_tokens'), Value(0)) + input_tokens,
+                output_tokens=Coalesce(F('output_tokens'), Value(0)) + output_tokens,
+            )
+        finally:
+            # Runs in an analyzer thread, which must not keep a connection
+            connection.close()
+
+    on_hedge_usage(analysis, add)
+
+
+def _save_failure(resume, reason):
+    with transaction.atomic():
+        check_lease(resume)
+        resume.claimed_by = ''
+        forget_analysis(resume)
+        resume.status = 'failed'
+        resume.weaknesses = [reason]
+        resume.analyzed_at = timezone.now()
+        resume.save()
+    mark_user_write(resume.user_id)
+
+
+def _apply_feedback(resume, feedback):
+    resume.overall_score = feedback.get('overall_score', 0)
+    resume.strengths = feedback.get('strengths', [])
+    resume.weaknesses = feedback.get('weaknesses', [])
+    resume.missing_skills = feedback.get('missing_skills', [])
+    resume.improvement_suggestions = feedback.get('improvement_suggestions', [])
+    resume.ats_score = feedback.get('ats_score', 0)
+    resume.full_feedback = feedback
+    resume.analyzed_at = timezone.now()
+    resume.status = 'completed'
@@ -0,0 +1,204 @@
+import hashlib
+import random
+import re
+import struct
+
+from django.conf import settings
+from django.db import transaction
+
+from .models import Resume, ResumeLSHBucket
+
+
+# ----------------------------------------------------------------------
+# Near-duplicate detection across a user's upload history.
+#
+# Users upload many slightly edited versions of one resume. Each text gets
+# a MinHash signature (NUM_PERM minimums of salted shingle hashes); the
+# share of equal positions in two signatures estimates the Jaccard
+# similarity of their word shingles.
+#
+# To avoid comparing against the whole history, signatures are split into
+# BANDS bands of ROWS values and each band is hashed into a bucket key
+# (ResumeLSHBucket, per user). Only resumes sharing at least one bucket are
+# compared; with 16 x 8 a pair at 0.8 similarity shares a bucket with
+# ~95% probability, a pair at 0.4 with ~1%.
+# ----------------------------------------------------------------------
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 5
+
+_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+# Fixed seed: stored signatures are only comparable with the same permutations
+_rng = random.Random(20240613)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+_SIGNATURE = struct.Struct(f'>{NUM_PERM}I')
+
+_WORD_RE = re.compile(r"[a-z0-9+#./-]+")
+_HEADING_RE = re.compile(r"^[A-Z][A-Z &/-]{2,40}:?$")
+
+
+def _shingles(text):
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {' '.join(words)} if words else set()
+    return {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def minhash(text):
+    """
+    MinHash signature of `text` as a tuple of NUM_PERM ints, or None if
+    the text has no words.
+    """
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=8).digest(), 'big')
+        for shingle in _shingles(text or '')
+    ]
+    if not hashes:
+        return None
+    return tuple(
+        min((a * h + b) % _PRIME for h in hashes) & _MAX_HASH
+        for a, b in _PERMUTATIONS
+    )
+
+
+def pack_signature(signature):
+    return _SIGNATURE.pack(*signature)
+
+
+def unpack_signature(data):
+    return _SIGNATURE.unpack(bytes(data))
+
+
+def estimate_similarity(a, b):
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def band_keys(signature):
+    # The band number is part of the hash, so one indexed column is enough
+    return [
+        int.from_bytes(
+            hashlib.blake2b(
+                struct.pack(f'>B{ROWS}I', band, *signature[band * ROWS:(band + 1) * ROWS]),
+                digest_size=8,
+            ).digest(),
+            'big',
+            signed=True,
+        )
+        for band in range(BANDS)
+    ]
+
+
+def find_similar(user_id, signature, exclude=None, before=None):
+    """
+    Return (resume_id, similarity) of the most similar earlier resume of the
+    user, or (None, 0.0). Only LSH candidates are compared.
+    """
+    candidates = ResumeLSHBucket.objects.filter(user_id=user_id, key__in=band_keys(signature))
+    if exclude is not None:
+        candidates = candidates.exclude(resume_id=exclude)
+    resumes = Resume.objects.filter(pk__in=candidates.values('resume_id'))
+    if before is not None:
+        resumes = resumes.filter(created_at__lt=before)
+
+    best_id, best = None, 0.0
+    # Latest first, so ties go to the most recent version
+    for pk, data in resumes.order_by('-created_at').values_list('pk', 'minhash'):
+        similarity = estimate_similarity(signature, unpack_signature(data))
+        if similarity > best:
+            best_id, best = pk, similarity
+    return best_id, best
+
+
+def index_resume(resume):
+    """
+    Sign `resume.extracted_text`, add it to its owner's LSH index and flag
+    it if an earlier upload is at least NEAR_DUPLICATE_THRESHOLD similar.
+    Sets minhash / duplicate_of / similarity (the caller saves the resume)
+    and returns the earlier Resume, or None.
+    """
+    signature = minhash(resume.extracted_text)
+    with transaction.atomic():
+        ResumeLSHBucket.objects.filter(resume=resume).delete()
+        resume.minhash = resume.duplicate_of = resume.similarity = None
+        if signature is None:
+            return None
+
+        match_id, similarity = find_similar(
+            resume.user_id, signature, exclude=resume.pk, before=resume.created_at
+        )
+        ResumeLSHBucket.objects.bulk_create([
+            ResumeLSHBucket(user_id=resume.user_id, resume=resume, key=key)
+            for key in band_keys(signature)
+        ])
+
+    resume.minhash = pack_signature(signature)
+    if match_id is None or similarity < settings.NEAR_DUPLICATE_THRESHOLD:
+        return None
+    resume.duplicate_of_id = match_id
+    resume.similarity = round(similarity, 3)
+    return Resume.objects.get(pk=match_id)
+
+
+# ----------------------------------------------------------------------
+# Diff-focused reanalysis (NEAR_DUPLICATE_ANALYSIS=diff)
+# ----------------------------------------------------------------------
+
+# Above this share of changed text a full analysis is just as cheap
+MAX_CHANGED_SHARE = 0.6
+
+
+def _sections(text):
+    # Resume headings come out of PDFs as short upper-case lines
+    sections, current = {}, 'HEADER'
+    for line in (text or '').splitlines():
+        line = ' '.join(line.split())
+        if not line:
+            continue
+        if _HEADING_RE.match(line):
+            current = line.rstrip(':')
+            continue
+        sections.setdefault(current, []).append(line)
+    return sections
+
+
+def changed_sections(old_text, new_text):
+    """
+    What changed between two versions, per section: a list of
+    (heading, added lines, removed lines) for every section that differs.
+    """
+    old, new = _sections(old_text), _sections(new_text)
+    changes = []
+    for heading in list(new) + [heading for heading in old if heading not in new]:
+        old_lines, new_lines = old.get(heading, []), new.get(heading, [])
+        if old_lines == new_lines:
+            continue
+        old_set, new_set = set(old_lines), set(new_lines)
+        added = [line for line in new_lines if line not in old_set]
+        removed = [line for line in old_lines if line not in new_set]
+        # Reordered or repeated lines change nothing worth analyzing
+        if added or removed:
+            changes.append((heading, added, removed))
+    return changes
+
+
+def diff_analysis_input(previous, resume):
+    """
+    Return the changed sections to send to a diff-focused analysis, or None
+    if `resume` should get a full analysis instead.
+    """
+    if settings.NEAR_DUPLICATE_ANALYSIS != 'diff' or previous is None:
+        return None
+    if previous.status != 'completed' or not previous.full_feedback:
+        return None
+    # Error placeholders (rate limit, missing key...) score 0
+    if not previous.full_feedback.get('overall_score'):
+        return None
+
+    changes = changed_sections(previous.extracted_text, resume.extracted_text)
+    changed = sum(len(line) for _, added, _ in changes for line in added)
+    if changed > MAX_CHANGED_SHARE * len(resume.extracted_text):
+        return None
+    return changes
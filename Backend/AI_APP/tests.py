@@ -1,3 +1,927 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+from types import SimpleNamespace
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from channels.routing import URLRouter
+from channels.testing import WebsocketCommunicator
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import CommandError, call_command
+from django.db import connections, router
+from django.contrib.auth.models import AnonymousUser
+from django.test import AsyncRequestFactory, Client, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from . import compression
+from .analyzers import (
+    BACKEND_CLASSES, Analysis, AnalyzerBackend, AnalyzerError, _parse_feedback, arun_analysis,
+    get_backend, on_hedge_usage, reset_analyzers, run_analysis,
+)
+from .async_views import AsyncResumeDetailView, AsyncResumeListView
+from .checks import check_analyzer_deadline
+from .db_backends.pooled_postgresql.base import DatabaseWrapper, close_pools
+from .db_backends.pooled_postgresql.base import _pools as pools
+from .janitor import enforce_retention
+from .management.commands.check_import_time import leaked_modules, profile_import
+from .models import CompressionDictionary, Resume, ResumeDailyStats, ResumeLSHBucket, User
+from .notifications import apublish_resume_status
+from .prompts import get_template
+from .rollups import forget_analysis, rebuild, user_stats
+from .routers import mark_user_write, replica_for, replica_reads
+from .routing import websocket_urlpatterns
+from .sendfile import sendfile_response
+from .scheduler import BULK, INTERACTIVE, LeaseLost, claim_next, heartbeat, requeue_stale
+from .services import _save_results, delete_resume
+from .similarity import BANDS, changed_sections, estimate_similarity, index_resume, minhash
+from .throttling import SlidingWindowThrottle
+
+
+class ImportTimeTests(SimpleTestCase):
+    def test_lazy_modules_not_imported_at_startup(self):
+        # Timing is left to `manage.py check_import_time`, a loaded test
+        # machine would make it flaky here
+        _, _, modules = profile_import('Resume_AI.wsgi')
+
+        self.assertEqual(leaked_modules(modules), [])
+
+
+@skipUnless(settings.DATABASE_REPLICAS, "run with --settings=Resume_AI.test_settings")
+class ReplicaRoutingTests(TestCase):
+    # replica_1 is a separate database: rows created here exist on the
+    # primary only, as if the replica hadn't caught up yet
+    databases = {'default', *settings.DATABASE_REPLICAS}
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create(email='replica@example.com', username='replica')
+        self.resume = Resume.objects.create(user=self.user, file_name='cv.pdf', status='completed')
+        token = RefreshToken.for_user(self.user).access_token
+        self.client = Client(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def get(self, path):
+        """
+        Response to GET `path`, and the number of queries each database ran.
+        """
+        with CaptureQueriesContext(connections['default']) as primary, \
+                CaptureQueriesContext(connections['replica_1']) as replica:
+            response = self.client.get(path)
+        return response, len(primary), len(replica)
+
+    def test_reads_go_to_replica(self):
+        response, _, replica = self.get('/api/resumes/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['count'], 0)
+        self.assertGreater(replica, 0)
+
+        response, _, replica = self.get(f'/api/resumes/{self.resume.pk}/')
+        self.assertEqual(response.status_code, 404)
+        self.assertGreater(replica, 0)
+
+        response, _, replica = self.get('/api/resumes/stats/')
+        self.assertEqual(response.status_code, 200)
+        self.assertGreater(replica, 0)
+
+    def test_other_actions_read_primary(self):
+        response, _, replica = self.get('/api/resumes/queue/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(replica, 0)
+
+    def test_writes_go_to_primary(self):
+        with replica_reads(self.user.pk):
+            self.assertEqual(router.db_for_read(Resume), 'replica_1')
+            self.assertEqual(router.db_for_write(Resume), 'default')
+            Resume.objects.create(user=self.user, file_name='new.pdf')
+
+        self.assertTrue(Resume.objects.using('default').filter(file_name='new.pdf').exists())
+        self.assertFalse(Resume.objects.using('replica_1').filter(file_name='new.pdf').exists())
+        self.assertEqual(router.db_for_read(Resume), 'default')
+
+    @override_settings(DATABASE_REPLICA_STICKY_SECONDS=1)
+    def test_reads_stick_to_primary_after_write(self):
+        mark_user_write(self.user.pk)
+
+        response, primary, replica = self.get('/api/resumes/')
+        self.assertEqual(response.json()['count'], 1)
+        self.assertEqual(replica, 0)
+        response, _, replica = self.get(f'/api/resumes/{self.resume.pk}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(replica, 0)
+
+        # Other users still read from the replica
+        self.assertEqual(replica_for(self.user.pk + 1), 'replica_1')
+
+        time.sleep(1.1)
+        response, _, replica = self.get('/api/resumes/')
+        self.assertEqual(response.json()['count'], 0)
+        self.assertGreater(replica, 0)
+
+    def test_delete_pins_user_to_primary(self):
+        response = self.client.delete(f'/api/resumes/{self.resume.pk}/')
+        self.assertEqual(response.status_code, 204)
+        self.assertIsNone(replica_for(self.user.pk))
+
+
+class PooledBackendTests(SimpleTestCase):
+    def wrapper(self, **overrides):
+        settings_dict = {
+            'ENGINE': 'AI_APP.db_backends.pooled_postgresql', 'NAME': 'resume_ai', 'USER': 'app',
+            'PASSWORD': '', 'HOST': 'localhost', 'PORT': '', 'CONN_MAX_AGE': 0,
+            'CONN_HEALTH_CHECKS': False, 'AUTOCOMMIT': True, 'ATOMIC_REQUESTS': False,
+            'TIME_ZONE': None, 'OPTIONS': {'pool': {'min_size': 0, 'max_size': 2}},
+        }
+        settings_dict.update(overrides)
+        return DatabaseWrapper(settings_dict, alias='pool_test')
+
+    def tearDown(self):
+        for pool in [pool for key, pool in pools.items() if key[0] == 'pool_test']:
+            pool.close()
+        pools.clear()
+
+    def test_pool_option_not_passed_to_psycopg(self):
+        self.assertNotIn('pool', self.wrapper().get_connection_params())
+
+    def test_requires_conn_max_age_zero(self):
+        with self.assertRaises(ImproperlyConfigured):
+            self.wrapper(CONN_MAX_AGE=600).pool
+
+    def test_one_pool_per_alias_and_process(self):
+        wrapper = self.wrapper()
+        self.assertIs(wrapper.pool, self.wrapper().pool)
+        self.assertEqual(wrapper.pool.max_size, 2)
+        close_pools()
+        self.assertEqual(pools, {})
+
+    def test_no_pool_without_option(self):
+        self.assertIsNone(self.wrapper(OPTIONS={}).pool)
+
+
+class AsyncReadTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email='async@example.com', username='async')
+        token = RefreshToken.for_user(self.user).access_token
+        self.auth = {'AUTHORIZATION': f'Bearer {token}'}
+        self.factory = AsyncRequestFactory()
+        sample = b'Python Django PostgreSQL Kubernetes experience ' * 20
+        dictionary = CompressionDictionary.objects.create(codec='zlib', data=sample)
+        self.feedback = {'overall_score': 80, 'summary': 'Python Django PostgreSQL ' * 10}
+        with self.settings(FIELD_COMPRESSION='zlib', FIELD_COMPRESSION_DICT_ID=dictionary.pk):
+            self.resume = Resume.objects.create(
+                user=self.user, file_name='cv.pdf', status='completed', full_feedback=self.feedback
+            )
+        # Read the row back from the primary when replicas are configured
+        cache.clear()
+        mark_user_write(self.user.pk)
+        # A fresh process: the dictionary is loaded on the first read
+        compression.reset_dictionaries()
+        self.addCleanup(compression.reset_dictionaries)
+
+    async def test_detail_decompresses_with_dictionary(self):
+        request = self.factory.get(f'/api/resumes/{self.resume.pk}/', **self.auth)
+        response = await AsyncResumeDetailView.as_view()(request, pk=self.resume.pk)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['full_feedback'], self.feedback)
+
+    async def test_list_decompresses_with_dictionary(self):
+        response = await AsyncResumeListView.as_view()(self.factory.get('/api/resumes/', **self.auth))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(json.loads(response.content)['results'][0]['full_feedback'], self.feedback)
+
+
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email='views@example.com', username='views')
+        token = RefreshToken.for_user(self.user).access_token
+        self.auth = {'AUTHORIZATION': f'Bearer {token}'}
+        self.factory = AsyncRequestFactory()
+        self.resumes = [
+            Resume.objects.create(user=self.user, file_name=f'cv{i}.pdf', status='completed')
+            for i in range(settings.REST_FRAMEWORK['PAGE_SIZE'] + 1)
+        ]
+        cache.clear()
+        mark_user_write(self.user.pk)
+
+    async def list(self, query=''):
+        request = self.factory.get(f'/api/resumes/{query}', **self.auth)
+        return await AsyncResumeListView.as_view()(request)
+
+    async def test_list_pages_like_drf(self):
+        first = json.loads((await self.list()).content)
+        second = json.loads((await self.list('?page=2')).content)
+
+        self.assertEqual(first['count'], len(self.resumes))
+        self.assertEqual(len(first['results']), settings.REST_FRAMEWORK['PAGE_SIZE'])
+        self.assertEqual(first['next'], 'http://testserver/api/resumes/?page=2')
+        self.assertIsNone(first['previous'])
+        self.assertEqual(len(second['results']), 1)
+        self.assertIsNone(second['next'])
+        self.assertEqual(second['previous'], 'http://testserver/api/resumes/')
+
+    async def test_list_rejects_pages_out_of_range(self):
+        for query in ('?page=0', '?page=3', '?page=x'):
+            self.assertEqual((await self.list(query)).status_code, 404)
+
+    async def test_list_requires_a_token(self):
+        response = await AsyncResumeListView.as_view()(self.factory.get('/api/resumes/'))
+        self.assertEqual(response.status_code, 401)
+
+    async def test_patch_is_delegated_to_the_viewset(self):
+        resume = self.resumes[0]
+        request = self.factory.patch(
+            f'/api/resumes/{resume.pk}/', 'file_name=renamed.pdf',
+            content_type='application/x-www-form-urlencoded', **self.auth,
+        )
+        response = await AsyncResumeDetailView.as_view()(request, pk=resume.pk)
+
+        self.assertEqual(response.status_code, 200)
+        await resume.arefresh_from_db()
+        self.assertEqual(resume.file_name, 'renamed.pdf')
+
+
+class CompressionCodecTests(TestCase):
+    def setUp(self):
+        self.samples = [
+            f"Candidate {i}: {i % 9} years of Python, Django and PostgreSQL at company {i * 37}. "
+            f"Led a team of {i % 5} engineers, shipped REST APIs and Kubernetes deployments.".encode()
+            for i in range(300)
+        ]
+        self.data = b''.join(self.samples[:20])
+        self.addCleanup(compression.reset_dictionaries)
+
+    def dictionary(self, codec):
+        data = compression.train_dictionary(self.samples, codec, 4096)
+        return CompressionDictionary.objects.create(codec=codec, data=data).pk
+
+    def assertRoundTrip(self, codec, dict_id=None):
+        with self.settings(FIELD_COMPRESSION=codec, FIELD_COMPRESSION_DICT_ID=dict_id):
+            blob = compression.compress(self.data)
+        # Decoded by a fresh process, whatever the settings are now
+        compression.reset_dictionaries()
+        self.assertEqual(compression.stored_codec(blob), (compression.CODECS[codec], dict_id))
+        self.assertEqual(compression.decompress(blob), self.data)
+        return blob
+
+    def test_none(self):
+        self.assertRoundTrip('none')
+
+    def test_zlib(self):
+        blob = self.assertRoundTrip('zlib')
+        self.assertLess(len(blob), len(self.data))
+
+    def test_zlib_with_dictionary(self):
+        plain = self.assertRoundTrip('zlib')
+        self.assertLess(len(self.assertRoundTrip('zlib', self.dictionary('zlib'))), len(plain))
+
+    @skipUnless(zstandard, "zstandard is not installed")
+    def test_zstd(self):
+        self.assertRoundTrip('zstd')
+
+    @skipUnless(zstandard, "zstandard is not installed")
+    def test_zstd_with_dictionary(self):
+        self.assertRoundTrip('zstd', self.dictionary('zstd'))
+
+    def test_short_values_stay_raw(self):
+        with self.settings(FIELD_COMPRESSION='zlib'):
+            blob = compression.compress(b'short')
+        self.assertEqual(blob, bytes([compression.RAW]) + b'short')
+
+    def test_dictionary_must_match_the_codec(self):
+        dict_id = self.dictionary('zlib')
+        with self.settings(FIELD_COMPRESSION='zstd', FIELD_COMPRESSION_DICT_ID=dict_id):
+            with self.assertRaises(ImproperlyConfigured):
+                compression.compress(self.data)
+
+
+class CompressResumeFieldsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email='backfill@example.com', username='backfill')
+        self.text = 'Senior Python developer, Django and PostgreSQL. ' * 50
+        self.resume = Resume.objects.create(
+            user=self.user, file_name='cv.pdf', extracted_text=self.text, full_feedback={'score': 1}
+        )
+
+    def stored(self, field):
+        return Resume.objects.values_list(field, flat=True).get(pk=self.resume.pk).data
+
+    @override_settings(FIELD_COMPRESSION='zlib')
+    def test_backfill_compresses_existing_rows(self):
+        self.assertEqual(compression.stored_codec(self.stored('extracted_text')), (compression.RAW, None))
+
+        out = StringIO()
+        call_command('compress_resume_fields', '--dry-run', stdout=out)
+        self.assertIn('Would rewrite 1 resumes', out.getvalue())
+        self.assertEqual(compression.stored_codec(self.stored('extracted_text')), (compression.RAW, None))
+
+        call_command('compress_resume_fields', stdout=StringIO())
+        self.assertEqual(compression.stored_codec(self.stored('extracted_text')), (compression.ZLIB, None))
+        # Too short to compress, left raw
+        self.assertEqual(compression.stored_codec(self.stored('full_feedback')), (compression.RAW, None))
+        resume = Resume.objects.get(pk=self.resume.pk)
+        self.assertEqual(resume.extracted_text, self.text)
+        self.assertEqual(resume.full_feedback, {'score': 1})
+
+        out = StringIO()
+        call_command('compress_resume_fields', stdout=out)
+        self.assertIn('Rewrote 0 resumes', out.getvalue())
+
+    def test_refuses_without_codec(self):
+        with self.assertRaises(CommandError):
+            call_command('compress_resume_fields')
+
+
+@override_settings(RESUME_PDF_RETENTION_DAYS=0, FAILED_UPLOAD_RETENTION_DAYS=7, EXTRACTED_TEXT_COMPACT_AFTER_DAYS=30)
+class JanitorRetentionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email='janitor@example.com', username='janitor')
+        self.now = timezone.now()
+        self.long_ago = self.now - timedelta(days=60)
+
+    def resume(self, **fields):
+        resume = Resume.objects.create(user=self.user, file_name='cv.pdf', pdf_file='resumes/cv.pdf')
+        Resume.objects.filter(pk=resume.pk).update(created_at=self.long_ago, **fields)
+        return Resume.objects.get(pk=resume.pk)
+
+    def test_old_upload_reanalysed_now_is_not_abandoned(self):
+        running = self.resume(status='processing', started_at=self.now)
+        queued = self.resume(status='pending', queued_at=self.now)
+        stuck = self.resume(status='processing', started_at=self.long_ago)
+
+        self.assertEqual(enforce_retention()['abandoned'], 1)
+        self.assertEqual(Resume.objects.get(pk=running.pk).status, 'processing')
+        self.assertEqual(Resume.objects.get(pk=queued.pk).status, 'pending')
+        self.assertEqual(Resume.objects.get(pk=stuck.pk).status, 'failed')
+
+    def test_failed_reanalysis_is_kept_for_the_retention_period(self):
+        recent = self.resume(status='failed', analyzed_at=self.now, extracted_text='text')
+        expired = self.resume(status='failed', analyzed_at=self.long_ago, extracted_text='text')
+
+        self.assertEqual(enforce_retention()['failed_cleared'], 1)
+        recent, expired = Resume.objects.get(pk=recent.pk), Resume.objects.get(pk=expired.pk)
+        self.assertEqual((recent.pdf_file.name, recent.extracted_text), ('resumes/cv.pdf', 'text'))
+        self.assertEqual((expired.pdf_file.name, expired.extracted_text), ('', ''))
+        self.assertIsNotNone(expired.pdf_purged_at)
+
+    def test_dry_run_counts_match_real_pass(self):
+        text = 'Python developer with Django experience. ' * 20
+        self.resume(status='processing', started_at=self.long_ago)
+        self.resume(status='pending', queued_at=self.long_ago)
+        self.resume(status='failed', analyzed_at=self.long_ago)
+        self.resume(status='completed', analyzed_at=self.long_ago, extracted_text=text)
+        self.resume(status='completed', analyzed_at=self.now, extracted_text=text)
+
+        with CaptureQueriesContext(connections['default']) as queries:
+            planned = enforce_retention(dry_run=True)
+        self.assertFalse([q for q in queries if not q['sql'].startswith('SELECT')])
+
+        self.assertEqual(planned, {'pdfs_dropped': 0, 'abandoned': 2, 'failed_cleared': 1, 'texts_compacted': 1})
+        self.assertEqual(enforce_retention(), planned)
+        # Already done, nothing left for the next pass
+        self.assertEqual(enforce_retention(dry_run=True), {
+            'pdfs_dropped': 0, 'abandoned': 0, 'failed_cleared': 0, 'texts_compacted': 0,
+        })
+
+    def test_compaction_keeps_text_readable(self):
+        text = 'Python developer with Django experience. ' * 20
+        resume = self.resume(status='completed', analyzed_at=self.long_ago, extracted_text=text)
+
+        enforce_retention()
+        stored = Resume.objects.values_list('extracted_text', flat=True).get(pk=resume.pk).data
+        self.assertEqual(compression.stored_codec(stored), (compression.ZLIB, None))
+        self.assertEqual(Resume.objects.get(pk=resume.pk).extracted_text, text)
+
+
+class ResumeStatusSocketTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email='socket@example.com', username='socket')
+        self.token = str(RefreshToken.for_user(self.user).access_token)
+
+    async def connect(self, path='/ws/resumes/status/', subprotocols=None):
+        communicator = WebsocketCommunicator(
+            URLRouter(websocket_urlpatterns), path, subprotocols=subprotocols
+        )
+        connected, subprotocol = await communicator.connect()
+        return communicator, connected, subprotocol
+
+    async def test_token_in_subprotocol(self):
+        communicator, connected, subprotocol = await self.connect(
+            subprotocols=['resume-status', f'access_token.{self.token}']
+        )
+        self.assertTrue(connected)
+        # The token itself is never echoed back
+        self.assertEqual(subprotocol, 'resume-status')
+
+        resume = await Resume.objects.acreate(user=self.user, file_name='cv.pdf', status='completed')
+        await apublish_resume_status(resume)
+        self.assertEqual((await communicator.receive_json_from())['id'], str(resume.pk))
+        await communicator.disconnect()
+
+    async def test_token_in_query_string_is_rejected(self):
+        _, connected, _ = await self.connect(path=f'/ws/resumes/status/?token={self.token}')
+        self.assertFalse(connected)
+
+    async def test_invalid_token_is_rejected(self):
+        _, connected, _ = await self.connect(subprotocols=['resume-status', 'access_token.bogus'])
+        self.assertFalse(connected)
+
+
+def fake_backend(name, reply, delay=0.0):
+    """
+    An AnalyzerBackend class answering `reply` (a feedback dict, raw text
+    or an exception) after `delay` seconds, or timing out when the call's
+    timeout is shorter.
+    """
+    class FakeBackend(AnalyzerBackend):
+        calls = []
+
+        def analyze(self, request):
+            self.calls.append(request)
+            timeout = request.get('timeout', settings.ANALYZER_TIMEOUT)
+            time.sleep(min(delay, timeout))
+            if delay > timeout:
+                raise TimeoutError(f"{self.name} timed out")
+            if isinstance(reply, Exception):
+                raise reply
+            feedback = _parse_feedback(self.name, reply) if isinstance(reply, str) else dict(reply)
+            return Analysis(feedback, self.name, 100, 20)
+
+    FakeBackend.name = name
+    return FakeBackend
+
+
+FEEDBACK = {'overall_score': 70, 'ats_score': 60, 'strengths': ['Clear layout']}
+
+
+@override_settings(
+    ANALYZER_BACKENDS=['first', 'second'], ANALYZER_HEDGE=False, ANALYZER_LOCAL_FALLBACK=True,
+    ANALYZER_CIRCUIT_FAILURES=2, ANALYZER_CIRCUIT_COOLDOWN=60, ANALYZER_DEADLINE=5, ANALYZER_TIMEOUT=5,
+)
+class AnalyzerRoutingTests(SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+        reset_analyzers()
+        self.addCleanup(reset_analyzers)
+        self.request = get_template('v2').analysis_request('Python developer\nExperience\nDjango, React')
+
+    def backends(self, first, second=FEEDBACK, first_delay=0.0, second_delay=0.0):
+        classes = {
+            'first': fake_backend('first', first, first_delay),
+            'second': fake_backend('second', second, second_delay),
+        }
+        patcher = mock.patch.dict(BACKEND_CLASSES, classes)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        return classes['first'], classes['second']
+
+    def test_error_fails_over_to_next_backend(self):
+        first, second = self.backends(RuntimeError('503'))
+        analysis = run_analysis(self.request)
+        self.assertEqual(analysis.backend, 'second')
+        self.assertEqual(analysis.feedback['overall_score'], 70)
+        self.assertEqual((len(first.calls), len(second.calls)), (1, 1))
+
+    def test_non_json_reply_fails_over(self):
+        self.backends('Sorry, I can only help with resumes.')
+        self.assertEqual(run_analysis(self.request).backend, 'second')
+        self.assertEqual(cache.get('analyzer:first:failures'), 1)
+
+    def test_breaker_opens_and_probe_closes_it(self):
+        first, _ = self.backends(RuntimeError('503'))
+        run_analysis(self.request)
+        run_analysis(self.request)
+        self.assertEqual(get_backend('first').breaker.state(), 'open')
+
+        # Open: skipped without a call
+        self.assertEqual(run_analysis(self.request).backend, 'second')
+        self.assertEqual(len(first.calls), 2)
+
+        # Cooldown over: exactly one probe is let through
+        cache.set('analyzer:first:open_until', time.time() - 1, timeout=None)
+        breaker = get_backend('first').breaker
+        self.assertEqual(breaker.state(), 'half_open')
+        self.assertTrue(breaker.allow())
+        self.assertFalse(breaker.allow())
+        breaker.record_success()
+        self.assertEqual(breaker.state(), 'closed')
+
+    def test_local_fallback_when_every_backend_fails(self):
+        self.backends(RuntimeError('503'), RuntimeError('429'))
+        self.assertEqual(run_analysis(self.request).backend, 'local')
+        with self.settings(ANALYZER_LOCAL_FALLBACK=False):
+            with self.assertRaises(AnalyzerError):
+                run_analysis(self.request)
+
+    @override_settings(ANALYZER_HEDGE=True, ANALYZER_HEDGE_AFTER_SECONDS=0.05)
+    def test_slow_backend_is_hedged(self):
+        self.backends(FEEDBACK, first_delay=0.5)
+        self.assertEqual(run_analysis(self.request).backend, 'second')
+
+    @override_settings(ANALYZER_DEADLINE=1.5, ANALYZER_HEDGE=True, ANALYZER_HEDGE_AFTER_SECONDS=0.2)
+    def test_deadline_bounds_remote_calls(self):
+        first, second = self.backends(FEEDBACK, FEEDBACK, first_delay=5, second_delay=5)
+        started = time.monotonic()
+        analysis = run_analysis(self.request)
+        self.assertLess(time.monotonic() - started, 2.5)
+        self.assertEqual(analysis.backend, 'local')
+        # Each call only gets the time left
+        self.assertLessEqual(first.calls[0]['timeout'], 1.5)
+        self.assertLessEqual(second.calls[0]['timeout'], 1.3)
+
+    @override_settings(ANALYZER_HEDGE=True, ANALYZER_HEDGE_AFTER_SECONDS=0.05)
+    def test_hedge_loser_usage_is_reported(self):
+        self.backends(FEEDBACK, first_delay=0.3)
+        analysis = run_analysis(self.request)
+        reported = []
+        done = threading.Event()
+
+        def add(input_tokens, output_tokens):
+            reported.append((input_tokens, output_tokens))
+            done.set()
+
+        on_hedge_usage(analysis, add)
+        self.assertTrue(done.wait(5))
+        self.assertEqual(analysis.backend, 'second')
+        self.assertEqual(reported, [(100, 20)])
+
+    def test_deadline_must_fit_inline_request(self):
+        with self.settings(ANALYSIS_MODE='inline', REQUEST_TIMEOUT=60, ANALYZER_DEADLINE=55):
+            self.assertEqual([e.id for e in check_analyzer_deadline(None)], ['AI_APP.E001'])
+        with self.settings(ANALYSIS_MODE='queued', REQUEST_TIMEOUT=60, ANALYZER_DEADLINE=55):
+            self.assertEqual(check_analyzer_deadline(None), [])
+
+    def test_async_fails_over(self):
+        self.backends('not json')
+        self.assertEqual(async_to_sync(arun_analysis)(self.request).backend, 'second')
+
+
+class RollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email='rollups@example.com', username='rollups')
+        self.resume = Resume.objects.create(user=self.user, file_name='cv.pdf', status='processing')
+
+    def analyze(self, resume, score, missing_skills):
+        feedback = {'overall_score': score, 'ats_score': score - 10, 'missing_skills': missing_skills}
+        _save_results(resume, Analysis(feedback, 'local'))
+
+    def stats(self):
+        return user_stats(self.user)
+
+    def test_reanalysis_replaces_the_previous_result(self):
+        self.analyze(self.resume, 60, ['Docker', 'SQL'])
+        self.analyze(self.resume, 80, ['Docker'])
+
+        stats = self.stats()
+        self.assertEqual(stats['total_analyses'], 1)
+        self.assertEqual(stats['average_overall_score'], 80)
+        self.assertEqual(stats['average_ats_score'], 70)
+        self.assertEqual(stats['top_missing_skills'], [{'skill': 'Docker', 'count': 1}])
+
+    def test_delete_removes_the_analysis(self):
+        self.analyze(self.resume, 60, ['Docker'])
+        delete_resume(self.resume)
+
+        stats = self.stats()
+        self.assertEqual(stats['total_analyses'], 0)
+        self.assertEqual(stats['top_missing_skills'], [])
+
+    def test_stale_copies_forget_once(self):
+        self.analyze(self.resume, 60, ['Docker'])
+        other = Resume.objects.get(pk=self.resume.pk)
+        stale = Resume.objects.get(pk=self.resume.pk)
+
+        # e.g. a requeued job's second worker and the janitor
+        forget_analysis(other)
+        forget_analysis(stale)
+
+        self.assertEqual(ResumeDailyStats.objects.get(user=self.user).analyses, 0)
+        self.assertEqual(self.stats()['top_missing_skills'], [])
+
+    def test_concurrent_saves_count_once(self):
+        first = Resume.objects.get(pk=self.resume.pk)
+        second = Resume.objects.get(pk=self.resume.pk)
+        self.analyze(first, 60, ['Docker'])
+        self.analyze(second, 80, ['Docker'])
+
+        self.assertEqual(self.stats()['total_analyses'], 1)
+        self.assertEqual(self.stats()['average_overall_score'], 80)
+        self.assertEqual(self.stats()['top_missing_skills'], [{'skill': 'Docker', 'count': 1}])
+
+    def test_rebuild_matches_incremental(self):
+        self.analyze(self.resume, 60, ['Docker'])
+        other = Resume.objects.create(user=self.user, file_name='b.pdf', status='processing')
+        self.analyze(other, 90, ['Docker', 'AWS'])
+        incremental = self.stats()
+
+        rebuild(self.user)
+        self.assertEqual(self.stats(), incremental)
+
+
+class SchedulerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.alice = User.objects.create(email='alice@example.com', username='alice')
+        self.bob = User.objects.create(email='bob@example.com', username='bob')
+        for user in (self.alice, self.bob):
+            mark_user_write(user.pk)
+
+    def queue(self, user, lane=INTERACTIVE, count=1):
+        return [
+            Resume.objects.create(
+                user=user, file_name='cv.pdf', status='pending', priority=lane, queued_at=timezone.now()
+            )
+            for _ in range(count)
+        ]
+
+    def expire(self, resume):
+        Resume.objects.filter(pk=resume.pk).update(
+            heartbeat_at=timezone.now() - timedelta(seconds=settings.ANALYSIS_STALE_AFTER_SECONDS + 1)
+        )
+
+    def test_interactive_lane_runs_before_bulk(self):
+        self.queue(self.alice, BULK)
+        interactive, = self.queue(self.bob)
+
+        self.assertEqual(claim_next().pk, interactive.pk)
+
+    def test_users_take_turns(self):
+        self.queue(self.alice, count=3)
+        self.queue(self.bob)
+
+        owners = [claim_next().user_id for _ in range(3)]
+
+        self.assertEqual(owners, [self.alice.pk, self.bob.pk, self.alice.pk])
+
+    @override_settings(ANALYSIS_MAX_CONCURRENT_PER_USER=1)
+    def test_per_user_cap(self):
+        self.queue(self.alice, count=2)
+
+        self.assertIsNotNone(claim_next())
+        self.assertIsNone(claim_next())
+
+    def test_heartbeat_keeps_a_slow_job(self):
+        self.queue(self.alice)
+        resume = claim_next()
+        self.expire(resume)
+
+        self.assertEqual(heartbeat([resume.claimed_by]), 1)
+        self.assertEqual(requeue_stale(), 0)
+
+    def test_requeue_stale_job(self):
+        self.queue(self.alice)
+        resume = claim_next()
+        self.expire(resume)
+
+        with mock.patch('AI_APP.scheduler.publish_resume_status') as publish:
+            self.assertEqual(requeue_stale(), 1)
+
+        resume.refresh_from_db()
+        self.assertEqual((resume.status, resume.claimed_by), ('pending', ''))
+        self.assertGreater(resume.queued_at, timezone.now() - timedelta(minutes=1))
+        self.assertEqual(publish.call_args.args[0].status, 'pending')
+
+    def test_requeued_job_is_saved_once(self):
+        self.queue(self.alice)
+        first = claim_next()
+        self.expire(first)
+        requeue_stale()
+        second = claim_next()
+
+        with self.assertRaises(LeaseLost):
+            _save_results(first, Analysis(FEEDBACK, 'local'))
+        _save_results(second, Analysis(FEEDBACK, 'local'))
+
+        second.refresh_from_db()
+        self.assertEqual(second.status, 'completed')
+        self.assertEqual(ResumeDailyStats.objects.get(user=self.alice).analyses, 1)
+
+
+RESUME_TEXT = "\n".join([
+    "JANE DOE",
+    "EXPERIENCE",
+    "Senior backend engineer at Acme, 2019-2024: built Django REST APIs serving two million users.",
+    "Moved the billing service to PostgreSQL partitioning and cut report times from minutes to seconds.",
+    "Mentored four engineers and ran the on-call rotation for the payments team.",
+    "Backend engineer at Initech, 2015-2019: Python services, Celery workers and Redis caching.",
+    "SKILLS",
+    "Python, Django, PostgreSQL, Redis, Celery, Docker, Kubernetes, Terraform, AWS.",
+    "EDUCATION",
+    "BSc Computer Science, University of Somewhere, 2015.",
+])
+
+
+class SimilarityTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create(email='lsh@example.com', username='lsh')
+
+    def upload(self, text, user=None):
+        resume = Resume.objects.create(user=user or self.user, file_name='cv.pdf', extracted_text=text)
+        previous = index_resume(resume)
+        resume.save()
+        return resume, previous
+
+    def test_signature_estimates_jaccard_similarity(self):
+        edited = RESUME_TEXT.replace("four engineers", "five engineers")
+        unrelated = "Pastry chef with ten years in French bakeries, croissants and sourdough. " * 5
+
+        self.assertEqual(estimate_similarity(minhash(RESUME_TEXT), minhash(RESUME_TEXT)), 1.0)
+        self.assertGreater(estimate_similarity(minhash(RESUME_TEXT), minhash(edited)), 0.8)
+        self.assertLess(estimate_similarity(minhash(RESUME_TEXT), minhash(unrelated)), 0.1)
+        self.assertIsNone(minhash(''))
+
+    def test_edited_upload_is_flagged(self):
+        original, _ = self.upload(RESUME_TEXT)
+        edited, previous = self.upload(RESUME_TEXT.replace("four engineers", "five engineers"))
+
+        self.assertEqual(previous.pk, original.pk)
+        self.assertEqual(edited.duplicate_of_id, original.pk)
+        self.assertGreaterEqual(edited.similarity, settings.NEAR_DUPLICATE_THRESHOLD)
+
+    def test_unrelated_and_other_users_uploads_are_not_flagged(self):
+        other = User.objects.create(email='other@example.com', username='other')
+        self.upload(RESUME_TEXT, user=other)
+        resume, previous = self.upload(RESUME_TEXT)
+        unrelated, _ = self.upload("Pastry chef with ten years in French bakeries. " * 10)
+
+        self.assertIsNone(previous)
+        self.assertIsNone(resume.duplicate_of_id)
+        self.assertIsNone(unrelated.duplicate_of_id)
+
+    def test_reindexing_replaces_the_buckets(self):
+        resume, _ = self.upload(RESUME_TEXT)
+        resume.extracted_text = RESUME_TEXT + "\nAWARDS\nEngineer of the year 2023."
+        index_resume(resume)
+
+        self.assertEqual(resume.near_duplicates.count(), 0)
+        self.assertEqual(ResumeLSHBucket.objects.filter(resume=resume).count(), BANDS)
+
+
+class PromptTests(SimpleTestCase):
+    def test_clean_enforces_the_caps(self):
+        feedback = get_template('v2').clean({
+            'overall_score': '120',
+            'ats_score': 'n/a',
+            'strengths': 'Clear layout',
+            'missing_skills': ['Docker', 'Continuous integration and delivery pipelines', ''] + ['x'] * 10,
+        })
+
+        self.assertEqual((feedback['overall_score'], feedback['ats_score']), (100, 0))
+        self.assertEqual(feedback['strengths'], ['Clear layout'])
+        self.assertEqual(feedback['weaknesses'], [])
+        self.assertEqual(feedback['missing_skills'][:2], ['Docker', 'Continuous integration and'])
+        self.assertEqual(len(feedback['missing_skills']), 7)
+
+    def test_changed_sections(self):
+        old = "SKILLS\nPython\nDjango\nEXPERIENCE\nAcme 2019-2024\nAWARDS\nHackathon winner"
+        new = "SKILLS\nDjango\nPython\nEXPERIENCE\nAcme 2019-2025\nPROJECTS\nResume analyzer"
+
+        self.assertEqual(changed_sections(old, new), [
+            ('EXPERIENCE', ['Acme 2019-2025'], ['Acme 2019-2024']),
+            ('PROJECTS', ['Resume analyzer'], []),
+            ('AWARDS', [], ['Hackathon winner']),
+        ])
+
+    def test_reordered_lines_are_no_change(self):
+        self.assertEqual(changed_sections("SKILLS\nPython\nDjango", "SKILLS\nDjango\nPython"), [])
+
+
+class PromptReportTests(TestCase):
+    def test_local_fallbacks_are_left_out_of_latency(self):
+        user = User.objects.create(email='report@example.com', username='report')
+        for backend, ms in (('groq', 1200), ('groq', 1200), ('local', 5)):
+            Resume.objects.create(
+                user=user, file_name='cv.pdf', status='completed', analyzed_at=timezone.now(),
+                prompt_version='v2', analyzed_by=backend, analysis_ms=ms,
+            )
+
+        out = StringIO()
+        call_command('prompt_report', stdout=out)
+
+        label, count, _, _, p50, p95, *_ = out.getvalue().splitlines()[1].split()
+        self.assertEqual((label, count, p50, p95), ('v2', '3', '1200', '1200'))
+
+
+class MinuteThrottle(SlidingWindowThrottle):
+    scope = 'test'
+    rate = '10/min'
+
+
+class ThrottleTests(SimpleTestCase):
+    limit = 10
+
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().get('/api/resumes/')
+        self.request.user = AnonymousUser()
+        self.now = 6000.0
+
+    def throttle(self):
+        throttle = MinuteThrottle()
+        throttle.timer = lambda: self.now
+        return throttle
+
+    def send(self, count=1):
+        return [self.throttle().allow_request(self.request, None) for _ in range(count)]
+
+    def test_limit_per_window(self):
+        self.assertEqual(self.send(self.limit + 2), [True] * self.limit + [False] * 2)
+        # Rejected requests gave their slot back
+        self.assertEqual(cache.get(f'throttle:test:127.0.0.1:{int(self.now // 60)}'), self.limit)
+
+    def test_previous_window_slides_out(self):
+        self.send(self.limit)
+        # Half of the previous window still overlaps: it counts for 5
+        self.now += 90
+        self.assertEqual(self.send(6), [True] * 5 + [False])
+
+    def test_wait_until_the_next_request_fits(self):
+        self.send(self.limit)
+        self.now += 70
+        self.send(self.limit)
+        throttle = self.throttle()
+        self.assertFalse(throttle.allow_request(self.request, None))
+        wait = throttle.wait()
+
+        self.now += wait - 1
+        self.assertEqual(self.send(), [False])
+        self.now += 1
+        self.assertEqual(self.send(), [True])
+
+    def test_evicted_counter_is_not_an_error(self):
+        self.send(self.limit)
+        with mock.patch.object(cache, 'decr', side_effect=ValueError):
+            self.assertEqual(self.send(), [False])
+
+
+class SendfileTests(SimpleTestCase):
+    content = b'%PDF-1.4 0123456789'
+
+    def setUp(self):
+        handle, path = tempfile.mkstemp(suffix='.pdf')
+        with os.fdopen(handle, 'wb') as f:
+            f.write(self.content)
+        self.addCleanup(os.remove, path)
+        self.file = SimpleNamespace(path=path, name='resumes/cv.pdf')
+        self.etag = self.send().headers['ETag']
+
+    def send(self, **headers):
+        request = RequestFactory().get('/api/resumes/1/download/', **headers)
+        return sendfile_response(request, self.file, 'my cv.pdf')
+
+    def body(self, response):
+        return b''.join(response.streaming_content)
+
+    def test_whole_file(self):
+        response = self.send()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.body(response), self.content)
+        self.assertEqual(response['Content-Length'], str(len(self.content)))
+        self.assertEqual(response['Content-Disposition'], "inline; filename*=UTF-8''my%20cv.pdf")
+
+    def test_ranges(self):
+        size = len(self.content)
+        for header, status, expected in (
+            ('bytes=2-5', 206, self.content[2:6]),
+            ('bytes=10-', 206, self.content[10:]),
+            ('bytes=-3', 206, self.content[-3:]),
+            ('bytes=0-1,4-5', 200, self.content),
+        ):
+            response = self.send(HTTP_RANGE=header)
+            self.assertEqual((response.status_code, self.body(response)), (status, expected), header)
+
+        response = self.send(HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response['Content-Range'], f'bytes 2-5/{size}')
+        response = self.send(HTTP_RANGE=f'bytes={size}-')
+        self.assertEqual((response.status_code, response['Content-Range']), (416, f'bytes */{size}'))
+
+    def test_if_range(self):
+        current = self.send(HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE=self.etag)
+        stale = self.send(HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE='"0-0"')
+        self.assertEqual(current.status_code, 206)
+        self.assertEqual((stale.status_code, self.body(stale)), (200, self.content))
+
+    def test_if_none_match(self):
+        self.assertEqual(self.send(HTTP_IF_NONE_MATCH=self.etag).status_code, 304)
+        self.assertEqual(self.send(HTTP_IF_NONE_MATCH=f'"0-0", {self.etag}').status_code, 304)
+        self.assertEqual(self.send(HTTP_IF_NONE_MATCH='"0-0"').status_code, 200)
+
+    @override_settings(SENDFILE_BACKEND='nginx', SENDFILE_URL_PREFIX='/protected-media/')
+    def test_nginx_gets_the_file_path(self):
+        response = self.send(HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, b'')
+        self.assertEqual(response['X-Accel-Redirect'], '/protected-media/resumes/cv.pdf')
+        self.assertEqual(response['ETag'], self.etag)
+        self.assertEqual(self.send(HTTP_IF_NONE_MATCH=self.etag).status_code, 304)
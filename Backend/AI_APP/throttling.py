@@ -0,0 +1,131 @@
+import math
+
+from rest_framework.throttling import SimpleRateThrottle
+
+from .metrics import record_throttle_rejection
+
+
+# ----------------------------------------------------------------------
+# Scoped request budgets, shared by every gunicorn / ASGI worker through
+# the default cache (Redis when REDIS_URL is set).
+#
+# DRF's built-in throttles keep a list of timestamps per client and
+# rewrite it on every request (read-modify-write, racy across workers).
+# These use a sliding-window counter instead: one atomic INCR on the
+# current fixed window, and the previous window's count weighted by how
+# much of it still overlaps the sliding window:
+#
+#   estimate = previous * (1 - elapsed / duration) + current
+#
+# Scopes (rates in REST_FRAMEWORK['DEFAULT_THROTTLE_RATES']):
+#   uploads - analyses (upload / reanalyze), per user: each costs an LLM call
+#   reads   - everything else, per user (or per IP when anonymous)
+#   login   - login and registration, per IP: each costs a password hash
+#
+# Rejections return 429 with Retry-After (DRF's Throttled exception) and are
+# counted in AI_APP/metrics.py.
+# ----------------------------------------------------------------------
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    cache_format = 'throttle:%(scope)s:%(ident)s'
+
+    def get_cache_key(self, request, view):
+        if request.user and request.user.is_authenticated:
+            ident = request.user.pk
+        else:
+            ident = self.get_ident(request)
+        return self.cache_format % {'scope': self.scope, 'ident': ident}
+
+    def applies_to(self, request, view):
+        return True
+
+    def allow_request(self, request, view):
+        if self.rate is None or not self.applies_to(request, view):
+            return True
+        self.key = self.get_cache_key(request, view)
+        if self.key is None:
+            return True
+
+        self.now = self.timer()
+        window = int(self.now // self.duration)
+        self.elapsed = self.now - window * self.duration
+        current_key = f'{self.key}:{window}'
+
+        # Count first, then check: concurrent workers can't all slip in
+        # under the limit, and a rejected request gives its slot back
+        self.cache.add(current_key, 0, timeout=self.duration * 2)
+        try:
+            self.current = self.cache.incr(current_key)
+        except ValueError:
+            # Evicted between add() and incr()
+            self.cache.set(current_key, 1, timeout=self.duration * 2)
+            self.current = 1
+        self.previous = self.cache.get(f'{self.key}:{window - 1}', 0)
+
+        if self._estimate(self.current) <= self.num_requests:
+            return True
+        try:
+            self.cache.decr(current_key)
+        except ValueError:
+            # Evicted since the incr(): there is no slot left to give back
+            pass
+        self.current -= 1
+        record_throttle_rejection(self.scope)
+        return False
+
+    def _estimate(self, current):
+        return self.previous * (1 - self.elapsed / self.duration) + current
+
+    def wait(self):
+        """
+        Seconds until one more request fits in the sliding window.
+        """
+        duration, elapsed, limit = self.duration, self.elapsed, self.num_requests
+        if self.current < limit and self.previous:
+            # Enough of the previous window has to slide out
+            wait = duration * (1 - (limit - self.current - 1) / self.previous) - elapsed
+            if wait <= duration - elapsed:
+                return max(wait, 1)
+        # Otherwise wait for the current window to become the previous one
+        # and slide out far enough
+        return (duration - elapsed) + duration * max(0, 1 - (limit - 1) / max(self.current, 1))
+
+
+class UploadRateThrottle(SlidingWindowThrottle):
+    scope = 'uploads'
+
+    # ResumeViewSet actions (and the async upload view) that start an analysis
+    costly_actions = ('create', 'reanalyze')
+
+    def applies_to(self, request, view):
+        return getattr(view, 'action', None) in self.costly_actions
+
+
+class ReadRateThrottle(SlidingWindowThrottle):
+    scope = 'reads'
+
+    def applies_to(self, request, view):
+        # Everything that isn't an analysis, including deletes
+        return getattr(view, 'action', None) not in UploadRateThrottle.costly_actions
+
+
+class LoginRateThrottle(SlidingWindowThrottle):
+    scope = 'login'
+
+    def get_cache_key(self, request, view):
+        # Per client IP, also for logged-in users
+        return self.cache_format % {'scope': self.scope, 'ident': self.get_ident(request)}
+
+
+def check_throttles(request, view, throttle_classes):
+    """
+    For views outside DRF (AI_APP/async_views.py): return the Retry-After
+    seconds if any throttle rejects the request, else None.
+    """
+    waits = []
+    for throttle_class in throttle_classes:
+        throttle = throttle_class()
+        if not throttle.allow_request(request, view):
+            waits.append(throttle.wait())
+    return math.ceil(max(waits)) if waits else None
@@ -5,7 +5,8 @@ from .views import (
     CustomTokenObtainPairView, 
     LogoutView, 
     UserProfileView, 
-    ResumeViewSet
+    ResumeViewSet,
+    MetricsView,
 )
 from rest_framework_simplejwt.views import TokenRefreshView
 
@@ -23,6 +24,9 @@ urlpatterns = [
     # User Profile
     path('auth/profile/', UserProfileView.as_view(), name='profile'),
     
+    # Operational metrics (staff only)
+    path('metrics/', MetricsView.as_view(), name='metrics'),
+    
     # Viewset routes (resumes)
     path('', include(router.urls)),
 ]
@@ -1,8 +1,96 @@
+import asyncio
 import json
 import re
-from groq import Groq
-from PyPDF2 import PdfReader
-from django.conf import settings
+
+
+# The LLM SDKs (httpx, pydantic, ...) and PyPDF2 are only needed once a
+# resume is actually processed, so they are imported on first use instead of
+# at module import time. This keeps `manage.py` commands and worker boot
+# cheap; gunicorn's preload warmup (see AI_APP/warmup.py) imports them once in
+# the master so forked workers share the pages copy-on-write.
+_groq_clients = {}
+_async_groq_clients = {}
+_anthropic_clients = {}
+_async_anthropic_clients = {}
+# AI_APP/analyzers.py fails over to another backend instead; SDK retries
+# would multiply the per-call timeout past ANALYZER_DEADLINE
+MAX_RETRIES = 0
+
+
+def get_groq_client(api_key):
+    """
+    Return a Groq client for `api_key`, importing the SDK on first call.
+    Clients are cached per process so the HTTP connection pool is reused.
+    """
+    client = _groq_clients.get(api_key)
+    if client is None:
+        from groq import Groq
+
+        client = Groq(api_key=api_key, max_retries=MAX_RETRIES)
+        _groq_clients[api_key] = client
+    return client
+
+
+def get_async_groq_client(api_key):
+    """
+    Return an AsyncGroq client for `api_key` bound to the running event loop.
+    httpx async pools can't be shared between loops, so the cache is per loop.
+    """
+    key = (api_key, id(asyncio.get_running_loop()))
+    client = _async_groq_clients.get(key)
+    if client is None:
+        from groq import AsyncGroq
+
+        client = AsyncGroq(api_key=api_key, max_retries=MAX_RETRIES)
+        _async_groq_clients[key] = client
+    return client
+
+
+def get_anthropic_client(api_key):
+    """
+    Return an Anthropic client for `api_key`, importing the SDK on first call.
+    """
+    client = _anthropic_clients.get(api_key)
+    if client is None:
+        from anthropic import Anthropic
+
+        client = Anthropic(api_key=api_key, max_retries=MAX_RETRIES)
+        _anthropic_clients[api_key] = client
+    return client
+
+
+def get_async_anthropic_client(api_key):
+    """
+    Return an AsyncAnthropic client for `api_key` bound to the running event loop.
+    """
+    key = (api_key, id(asyncio.get_running_loop()))
+    client = _async_anthropic_clients.get(key)
+    if client is None:
+        from anthropic import AsyncAnthropic
+
+        client = AsyncAnthropic(api_key=api_key, max_retries=MAX_RETRIES)
+        _async_anthropic_clients[key] = client
+    return client
+
+
+def get_pdf_reader_class():
+    """
+    Return PyPDF2's PdfReader, importing PyPDF2 on first call.
+    """
+    from PyPDF2 import PdfReader
+
+    return PdfReader
+
+
+def reset_clients():
+    """
+    Drop cached SDK clients. Called after fork so a worker never shares
+    sockets opened by the gunicorn master.
+    """
+    _groq_clients.clear()
+    _async_groq_clients.clear()
+    _anthropic_clients.clear()
+    _async_anthropic_clients.clear()
 
 
 def extract_text_from_pdf(pdf_file):
@@ -10,6 +98,7 @@ def extract_text_from_pdf(pdf_file):
     Extract text from PDF using PyPDF2
     """ 
     try:
+        PdfReader = get_pdf_reader_class()
         pdf_reader = PdfReader(pdf_file)
         text = ""
         
@@ -25,164 +114,33 @@ def extract_text_from_pdf(pdf_file):
         return ""
 
 
-def analyze_resume_with_groq(resume_text):
-    """
-    Send resume text to the Groq SDK for analysis.
-
-    The prompt asks the model to:
-    1. Score the resume overall (0-100)
-    2. List strengths (things done well)
-    3. List weaknesses (areas to improve)
-    4. Identify missing skills for full-stack dev role
-    5. Give specific improvement suggestions
-    6. Score ATS-friendliness (0-100)
-
-    Why ask for JSON?
-    - Structured data is easier to display in frontend
-    - Can validate and parse reliably
-    - Can store in database as JSONField
-    """
-
-    # --- Guard: API key must be available ---
-    api_key = settings.GROQ_API_KEY
-    if not api_key:
-        return {
-            "overall_score": 0,
-            "strengths": ["API key not configured"],
-            "weaknesses": ["Missing GROQ_API_KEY in environment"],
-            "missing_skills": [],
-            "improvement_suggestions": ["Please set GROQ_API_KEY in your .env file"],
-            "ats_score": 0,
-        }
+# Returned when a model reply isn't JSON at all
+UNPARSED_FEEDBACK = {
+    "overall_score": 50,
+    "strengths": ["Could not parse AI response"],
+    "weaknesses": ["Response format was unexpected"],
+    "missing_skills": [],
+    "improvement_suggestions": ["Please try uploading the resume again"],
+    "ats_score": 50,
+}
 
-    try:
-        client = Groq(api_key=api_key)
-        model = getattr(settings, "GROQ_MODEL", None) or "mixtral-8x7b-32768"
-
-        # Truncate long resumes to avoid token limits (~4 000 chars ≈ ~1 000 tokens)
-        resume_text = resume_text[:4000]
-
-        prompt = f"""You are an expert resume analyzer and career coach.
-Analyze this resume for a full-stack developer position.
-Provide constructive, actionable feedback in JSON format.
-
-Resume text:
-{resume_text}
-
-Please respond ONLY with valid JSON in this exact format (no markdown, no code blocks):
-{{
-    "overall_score": <number 0-100>,
-    "strengths": [<list of 3-5 key strengths as strings>],
-    "weaknesses": [<list of 3-5 areas to improve as strings>],
-    "missing_skills": [<list of important full-stack skills not mentioned as strings>],
-    "improvement_suggestions": [<list of 5-7 specific actionable suggestions as strings>],
-    "ats_score": <number 0-100 for ATS-friendliness>
-}}
-
-Make sure each field contains actual strings, not null or empty values.
-If you cannot analyse the resume, provide default scores of 50."""
-
-        print(f"Calling Groq API with model: {model}")
-        print(f"API key configured: {bool(api_key)}")
-
-        # ------------------------------------------------------------------
-        # Use the Groq SDK chat-completions endpoint
-        # Parameters:
-        #   max_tokens   – limit generated response length
-        #   temperature  – 0.7 gives balanced creativity vs. determinism
-        #   top_p        – nucleus sampling: consider top-90% probable tokens
-        # ------------------------------------------------------------------
-        chat_response = client.chat.completions.create(
-            model=model,
-            messages=[
-                {
-                    "role": "system",
-                    "content": (
-                        "You are an expert resume analyzer. "
-                        "Always respond with valid JSON only — no markdown, no extra commentary."
-                    ),
-                },
-                {
-                    "role": "user",
-                    "content": prompt,
-                },
-            ],
-            max_tokens=1500,
-            temperature=0.7,
-            top_p=0.9,
-        )
-
-        # Extract the generated text from the SDK response object
-        generated_text = chat_response.choices[0].message.content
-        print(f"Raw Groq response:\n{generated_text[:300]}")
-
-        if not generated_text:
-            print("No generated text in Groq response")
-            return {
-                "overall_score": 0,
-                "strengths": ["No response from model"],
-                "weaknesses": ["Model did not generate output"],
-                "missing_skills": [],
-                "improvement_suggestions": ["Please try again"],
-                "ats_score": 0,
-            }
-
-        # Parse JSON from the model's reply
-        feedback = extract_json_from_response(generated_text)
-        return feedback
 
-    except Exception as e:
-        error_str = str(e).lower()
-        print(f"Groq API Error: {e}")
-
-        if "rate limit" in error_str or "rate_limit" in error_str:
-            return {
-                "overall_score": 0,
-                "strengths": [],
-                "weaknesses": ["Rate limit exceeded"],
-                "missing_skills": [],
-                "improvement_suggestions": [
-                    "You have exceeded the Groq rate limit. Please wait a moment and try again."
-                ],
-                "ats_score": 0,
-            }
-        elif "timeout" in error_str:
-            return {
-                "overall_score": 0,
-                "strengths": [],
-                "weaknesses": ["API Timeout"],
-                "missing_skills": [],
-                "improvement_suggestions": [
-                    "The Groq API took too long to respond. Please try again."
-                ],
-                "ats_score": 0,
-            }
-        elif "connection" in error_str:
-            return {
-                "overall_score": 0,
-                "strengths": [],
-                "weaknesses": ["API Connection Error"],
-                "missing_skills": [],
-                "improvement_suggestions": [
-                    "Could not reach the Groq API. Check your internet connection and try again."
-                ],
-                "ats_score": 0,
-            }
-        else:
-            return {
-                "overall_score": 0,
-                "strengths": [],
-                "weaknesses": [f"Error: {str(e)[:100]}"],
-                "missing_skills": [],
-                "improvement_suggestions": ["An unexpected error occurred. Please try again."],
-                "ats_score": 0,
-            }
+def is_unparsed_feedback(feedback):
+    return feedback.get("strengths") == UNPARSED_FEEDBACK["strengths"]
 
 
 def extract_json_from_response(text):
     # Remove markdown code fences if present  (```json ... ``` or ``` ... ```)
     text = re.sub(r"```(?:json)?|```", "", text).strip()
 
+    # Structured-output replies are exactly one JSON object
+    try:
+        parsed = json.loads(text)
+        if isinstance(parsed, dict):
+            return parsed
+    except json.JSONDecodeError:
+        pass
+
     # Try to find the first {...} block in the text(regex function)
     r"""
         | Part        | Meaning                       |
@@ -200,18 +158,5 @@ def extract_json_from_response(text):
         except json.JSONDecodeError as e:
             print(f"JSON parse error after extraction: {e}")
 
-    # Last-resort: try parsing the whole (stripped) text
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
-
     # Return a safe default if nothing worked
-    return {
-        "overall_score": 50,
-        "strengths": ["Could not parse AI response"],
-        "weaknesses": ["Response format was unexpected"],
-        "missing_skills": [],
-        "improvement_suggestions": ["Please try uploading the resume again"],
-        "ats_score": 50,
-    }
\ No newline at end of file
+    return dict(UNPARSED_FEEDBACK)
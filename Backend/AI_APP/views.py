@@ -1,18 +1,28 @@
 from rest_framework import status, viewsets
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework.permissions import AllowAny, IsAuthenticated
+from rest_framework.permissions import AllowAny, IsAdminUser, IsAuthenticated
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
 from .serializers import *
 from rest_framework_simplejwt.exceptions import TokenError
 from rest_framework.parsers import MultiPartParser, FormParser
 from django.core.files.storage import default_storage
+from django.http import HttpResponse
+from rest_framework.decorators import action
+from .services import submit_resume, delete_resume
+from .scheduler import REANALYSIS, is_queued_mode, queue_depth
+from .sendfile import sendfile_response
+from .rollups import user_stats
+from .throttling import LoginRateThrottle, ReadRateThrottle, UploadRateThrottle
+from .metrics import render_prometheus
+from .routers import start_replica_reads, stop_replica_reads
 
 
 
 class RegisterView(APIView):
     permission_classes = [AllowAny]
+    throttle_classes = [LoginRateThrottle]
     
     def post(self, request):
         serializer = RegisterSerializer(data=request.data)
@@ -30,6 +40,7 @@ class RegisterView(APIView):
 class CustomTokenObtainPairView(TokenObtainPairView):
     # Enhanced login endpoint with user data
     permission_classes = [AllowAny]
+    throttle_classes = [LoginRateThrottle]
     serializer_class = CustomTokenObtainPairSerializer
     
 
@@ -66,10 +77,34 @@ class UserProfileView(APIView):
         return Response(serializer.data)
     
 
+class MetricsView(APIView):
+    # Prometheus scrape endpoint (see AI_APP/metrics.py)
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return HttpResponse(render_prometheus(), content_type='text/plain; version=0.0.4')
+
+
 class ResumeViewSet(viewsets.ModelViewSet):
     queryset = Resume.objects.all()
     permission_classes = [IsAuthenticated]
     parser_classes = (MultiPartParser, FormParser)
+    # Analyses (create / reanalyze) have their own, much smaller budget
+    throttle_classes = [UploadRateThrottle, ReadRateThrottle]
+    # Read-only actions that may be served by a replica (AI_APP/routers.py)
+    replica_actions = ('list', 'retrieve', 'stats')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action in self.replica_actions:
+            self.replica_token = start_replica_reads(request.user.pk)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        token = getattr(self, 'replica_token', None)
+        if token is not None:
+            stop_replica_reads(token)
+            self.replica_token = None
+        return super().finalize_response(request, response, *args, **kwargs)
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -80,50 +115,67 @@ class ResumeViewSet(viewsets.ModelViewSet):
         return self.queryset.filter(user=self.request.user).order_by('-created_at')
 
     def perform_create(self, serializer):
-        from django.utils import timezone
-        from .utils import extract_text_from_pdf, analyze_resume_with_groq
-
         resume = serializer.save(user=self.request.user, status='processing')
+        submit_resume(resume)
 
+    @action(detail=True, methods=['post'])
+    def reanalyze(self, request, pk=None):
+        resume = self.get_object()
+        if resume.status in ('pending', 'processing'):
+            return Response(
+                {"detail": "This resume is already being analyzed."},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        # Reanalysis runs in the lowest-priority lane when queued
+        submit_resume(resume, lane=REANALYSIS)
+        return Response(
+            ResumeAnalysisSerializer(resume, context={'request': request}).data,
+            status=status.HTTP_202_ACCEPTED if is_queued_mode() else status.HTTP_200_OK,
+        )
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        # get_object() only sees the user's own resumes, so ownership is
+        # checked here; the bytes themselves are sent by nginx (or streamed
+        # with Range support when SENDFILE_BACKEND=django)
+        resume = self.get_object()
+        if resume.pdf_purged_at:
+            return Response(
+                {"detail": "The PDF is no longer retained; the analysis is still available."},
+                status=status.HTTP_410_GONE,
+            )
+        if not resume.pdf_file:
+            return Response({"detail": "PDF not available."}, status=status.HTTP_404_NOT_FOUND)
+        try:
+            return sendfile_response(request, resume.pdf_file, resume.file_name or "resume.pdf")
+        except FileNotFoundError:
+            return Response({"detail": "PDF not available."}, status=status.HTTP_404_NOT_FOUND)
+
+    @action(detail=False, methods=['get'])
+    def stats(self, request):
+        # Served from the per-user rollups, never from the Resume rows
         try:
-            # Step 1: Extract text
-            extracted_text = extract_text_from_pdf(resume.pdf_file)
-
-            if not extracted_text:
-                resume.status = 'failed'
-                resume.weaknesses = ["Could not extract text from PDF"]
-                resume.analyzed_at = timezone.now()
-                resume.save()
-                return
-
-            resume.extracted_text = extracted_text
-            resume.save()
-
-            # Step 2: Analyze with Groq
-            feedback = analyze_resume_with_groq(extracted_text)
-
-            # Step 3: Save results
-            resume.overall_score = feedback.get('overall_score', 0)
-            resume.strengths = feedback.get('strengths', [])
-            resume.weaknesses = feedback.get('weaknesses', [])
-            resume.missing_skills = feedback.get('missing_skills', [])
-            resume.improvement_suggestions = feedback.get('improvement_suggestions', [])
-            resume.ats_score = feedback.get('ats_score', 0)
-            resume.full_feedback = feedback
-            resume.analyzed_at = timezone.now()
-            resume.status = 'completed'
-            resume.save()
-
-        except Exception as e:
-            resume.status = 'failed'
-            resume.weaknesses = [f"Analysis failed: {str(e)[:200]}"]
-            resume.analyzed_at = timezone.now()
-            resume.save()
+            days = min(max(int(request.query_params.get('days', 90)), 1), 3650)
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 100)
+        except ValueError:
+            return Response(
+                {"detail": "days and limit must be integers."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(user_stats(request.user, days=days, limit=limit))
+
+    @action(detail=False, methods=['get'])
+    def queue(self, request):
+        overall = queue_depth()
+        return Response({
+            "mode": "queued" if is_queued_mode() else "inline",
+            "mine": queue_depth(user=request.user),
+            "overall": {
+                "pending_total": overall["pending_total"],
+                "processing": overall["processing"],
+            },
+        })
 
     def perform_destroy(self, instance):
-        if instance.pdf_file:
-            try:
-                instance.pdf_file.delete(save=False)
-            except PermissionError:
-                pass
-        instance.delete()
+        delete_resume(instance)
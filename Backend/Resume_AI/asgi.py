@@ -3,6 +3,9 @@ ASGI config for Resume_AI project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+HTTP goes to Django; WebSockets (resume status notifications) go to
+Channels consumers.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/6.0/howto/deployment/asgi/
 """
@@ -13,4 +16,20 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'Resume_AI.settings')
 
-application = get_asgi_application()
+# Initialise Django before importing anything that touches models
+django_asgi_app = get_asgi_application()
+
+from channels.routing import ProtocolTypeRouter, URLRouter  # noqa: E402
+from channels.security.websocket import OriginValidator  # noqa: E402
+from django.conf import settings  # noqa: E402
+
+from AI_APP.routing import websocket_urlpatterns  # noqa: E402
+
+application = ProtocolTypeRouter({
+    'http': django_asgi_app,
+    'websocket': OriginValidator(
+        URLRouter(websocket_urlpatterns),
+        # Same origins the REST API accepts
+        settings.CORS_ALLOWED_ORIGINS + settings.ALLOWED_HOSTS,
+    ),
+})
@@ -64,6 +64,7 @@ INSTALLED_APPS = [
     'rest_framework_simplejwt',
     'corsheaders',
     'rest_framework_simplejwt.token_blacklist',
+    'channels',
 ]
 
 MIDDLEWARE = [
@@ -96,6 +97,12 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = 'Resume_AI.wsgi.application'
+ASGI_APPLICATION = 'Resume_AI.asgi.application'
+
+# Serve the resume list/upload/retrieve paths with async views.
+# Only useful under an ASGI server (uvicorn workers); under WSGI every
+# async view would just be run in its own event loop.
+ASYNC_VIEWS = os.getenv('ASYNC_VIEWS', 'False') == 'True'
 
 
 # Database
@@ -104,10 +111,44 @@ WSGI_APPLICATION = 'Resume_AI.wsgi.application'
 DATABASES = {
     'default': dj_database_url.config(
         default=os.environ.get('DATABASE_URL'),
-        conn_max_age=600
+        conn_max_age=600,
+        # Ping a reused connection before the first query of a request, so
+        # a restarted database doesn't fail the request
+        conn_health_checks=True,
     )
 }
 
+# Read replicas (see AI_APP/routers.py): comma-separated URLs, used as
+# aliases replica_1, replica_2, ... Only the ResumeViewSet list / retrieve /
+# stats reads go there, and not for a user who wrote in the last
+# DATABASE_REPLICA_STICKY_SECONDS. In tests a replica mirrors 'default'.
+DATABASE_REPLICAS = []
+for i, url in enumerate(u for u in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if u.strip()):
+    alias = f'replica_{i + 1}'
+    DATABASES[alias] = dj_database_url.parse(
+        url.strip(), conn_max_age=600, conn_health_checks=True, test_options={'MIRROR': 'default'}
+    )
+    DATABASE_REPLICAS.append(alias)
+DATABASE_REPLICA_STICKY_SECONDS = int(os.getenv('DATABASE_REPLICA_STICKY_SECONDS', '15'))
+DATABASE_ROUTERS = ['AI_APP.routers.ReplicaRouter']
+
+# psycopg 3 connection pool per process (AI_APP/db_backends/pooled_postgresql),
+# for PostgreSQL databases only. Replaces persistent connections.
+DB_POOL = os.getenv('DB_POOL', 'False') == 'True'
+if DB_POOL:
+    for database in DATABASES.values():
+        if database['ENGINE'] == 'django.db.backends.postgresql':
+            database['ENGINE'] = 'AI_APP.db_backends.pooled_postgresql'
+            database['CONN_MAX_AGE'] = 0
+            database.setdefault('OPTIONS', {})['pool'] = {
+                'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+                'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+                # seconds to wait for a free connection before failing
+                'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+                'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', '300')),
+                'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', '3600')),
+            }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -153,6 +194,41 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / "media"
 
+# Storage lifecycle (`manage.py storage_janitor`, see AI_APP/janitor.py).
+# A value of 0 disables the rule.
+RESUME_PDF_RETENTION_DAYS = int(os.getenv('RESUME_PDF_RETENTION_DAYS', '0'))
+FAILED_UPLOAD_RETENTION_DAYS = int(os.getenv('FAILED_UPLOAD_RETENTION_DAYS', '7'))
+# Extracted text of analyses older than this is compressed, with FIELD_COMPRESSION
+# or zlib when that is 'none' (it is rarely read again)
+EXTRACTED_TEXT_COMPACT_AFTER_DAYS = int(os.getenv('EXTRACTED_TEXT_COMPACT_AFTER_DAYS', '30'))
+# Files younger than this are never treated as orphans (upload in flight)
+ORPHAN_FILE_GRACE_SECONDS = int(os.getenv('ORPHAN_FILE_GRACE_SECONDS', '3600'))
+# A sweep finding more orphans than this is refused (`storage_janitor --force`)
+ORPHAN_SWEEP_MAX_FILES = int(os.getenv('ORPHAN_SWEEP_MAX_FILES', '100'))
+JANITOR_INTERVAL_SECONDS = int(os.getenv('JANITOR_INTERVAL_SECONDS', '3600'))
+
+# Compressed model fields (Resume.extracted_text / full_feedback / analysis_result).
+# Codec for new writes: none | zlib | zstd (needs `zstandard`); opt-in, the
+# default stores values uncompressed. Existing rows are always readable, and
+# `manage.py compress_resume_fields` re-encodes them. FIELD_COMPRESSION_DICT_ID:
+# id printed by `manage.py train_compression_dict`, trained for the same codec.
+FIELD_COMPRESSION = os.getenv('FIELD_COMPRESSION', 'none')
+FIELD_COMPRESSION_LEVEL = int(os.getenv('FIELD_COMPRESSION_LEVEL', '0')) or None
+FIELD_COMPRESSION_DICT_ID = int(os.getenv('FIELD_COMPRESSION_DICT_ID', '0')) or None
+
+# Near-duplicate uploads (AI_APP/similarity.py): uploads at least this
+# similar to an earlier one of the same user are flagged (duplicate_of).
+# NEAR_DUPLICATE_ANALYSIS=diff sends only the changed sections plus the
+# previous feedback to the model instead of running a full analysis.
+NEAR_DUPLICATE_THRESHOLD = float(os.getenv('NEAR_DUPLICATE_THRESHOLD', '0.8'))
+NEAR_DUPLICATE_ANALYSIS = os.getenv('NEAR_DUPLICATE_ANALYSIS', 'full')  # full | diff
+
+# How GET /api/resumes/{id}/download/ delivers the PDF (see AI_APP/sendfile.py)
+# nginx:  X-Accel-Redirect to SENDFILE_URL_PREFIX (an `internal` nginx location)
+# django: stream from Python with Range/ETag support (development)
+SENDFILE_BACKEND = os.getenv('SENDFILE_BACKEND', 'django')
+SENDFILE_URL_PREFIX = os.getenv('SENDFILE_URL_PREFIX', '/protected-media/')
+
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
         'rest_framework_simplejwt.authentication.JWTAuthentication',
@@ -162,8 +238,56 @@ REST_FRAMEWORK = {
     ),
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
     'PAGE_SIZE': 10,
+    # Sliding-window budgets in the shared cache (see AI_APP/throttling.py).
+    # ResumeViewSet and the auth views pick their own classes.
+    'DEFAULT_THROTTLE_CLASSES': (
+        'AI_APP.throttling.ReadRateThrottle',
+    ),
+    'DEFAULT_THROTTLE_RATES': {
+        'uploads': os.getenv('THROTTLE_UPLOADS_RATE', '20/hour'),
+        'reads': os.getenv('THROTTLE_READS_RATE', '300/min'),
+        'login': os.getenv('THROTTLE_LOGIN_RATE', '10/min'),
+    },
+    # Reverse proxies in front of Django (1 behind nginx), so the client IP
+    # is taken from X-Forwarded-For without trusting client-supplied values
+    'NUM_PROXIES': int(os.getenv('NUM_PROXIES')) if os.getenv('NUM_PROXIES') else None,
 }
 
+# Channels — WebSocket status notifications (see AI_APP/consumers.py).
+# Redis in production so every process (sync gunicorn, ASGI, workers) can
+# publish to the sockets held by the ASGI server; in-memory otherwise
+# (single process: runserver/daphne/tests).
+REDIS_URL = os.getenv('REDIS_URL')
+if REDIS_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels_redis.core.RedisChannelLayer',
+            'CONFIG': {'hosts': [REDIS_URL]},
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        },
+    }
+
+# Cache behind the throttles and metrics. Needs to be shared (Redis) for the
+# limits to hold across gunicorn workers; local memory is per process.
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+    }
+
 # CORS — allow React/Vite dev server to talk to Django
 CORS_ALLOWED_ORIGINS = [
     "https://resume-ai-analyzer-drf-react.vercel.app",
@@ -190,14 +314,59 @@ SIMPLE_JWT = {
     "BLACKLIST_AFTER_ROTATION": True,
 }
 
-# Anthropic Claude API Configuration
+# LLM analyzer backends (see AI_APP/analyzers.py)
+# Remote backends in preference order; unconfigured ones (no API key) are skipped
+ANALYZER_BACKENDS = [
+    name.strip() for name in os.getenv('ANALYZER_BACKENDS', 'groq,anthropic').split(',') if name.strip()
+]
 GROQ_API_KEY = os.getenv('GROQ_API_KEY')
-
-if not GROQ_API_KEY:
-    raise ValueError("GROQ_API_KEY is not set in environment variables")
 GROQ_MODEL = os.getenv('GROQ_MODEL', 'llama-3.3-70b-versatile') 
-
+ANTHROPIC_API_KEY = os.getenv('ANTHROPIC_API_KEY')
+ANTHROPIC_MODEL = os.getenv('ANTHROPIC_MODEL', 'claude-3-5-haiku-latest')
+
+# Per-call timeout (seconds) for remote backends
+ANALYZER_TIMEOUT = float(os.getenv('ANALYZER_TIMEOUT', '25'))
+# Budget (seconds) for one analysis across all remote calls, hedges and
+# failover included; the local fallback answers when it runs out. Inline
+# analyses run inside the upload request, so it has to stay well under
+# gunicorn's timeout (GUNICORN_TIMEOUT) and nginx's proxy_read_timeout
+# (both 60s), leaving time for PDF extraction (checked by `manage.py check`)
+ANALYZER_DEADLINE = float(os.getenv('ANALYZER_DEADLINE', '40'))
+REQUEST_TIMEOUT = int(os.getenv('GUNICORN_TIMEOUT', '60'))
+# Fire a second backend when the first is slower than its p95 (or this many
+# seconds while its latency is still unknown)
+ANALYZER_HEDGE = os.getenv('ANALYZER_HEDGE', 'True') == 'True'
+ANALYZER_HEDGE_AFTER_SECONDS = float(os.getenv('ANALYZER_HEDGE_AFTER_SECONDS', '15'))
+# Consecutive errors that open a backend's circuit, and for how long
+ANALYZER_CIRCUIT_FAILURES = int(os.getenv('ANALYZER_CIRCUIT_FAILURES', '5'))
+ANALYZER_CIRCUIT_COOLDOWN = int(os.getenv('ANALYZER_CIRCUIT_COOLDOWN', '60'))
+# Threads per worker for sync (WSGI) calls; hedging can use two per analysis
+ANALYZER_MAX_THREADS = int(os.getenv('ANALYZER_MAX_THREADS', '8'))
+# Score locally when no remote backend answers (otherwise the analysis fails)
+ANALYZER_LOCAL_FALLBACK = os.getenv('ANALYZER_LOCAL_FALLBACK', 'True') == 'True'
+
+# Prompt template (AI_APP/prompts.py): v1 = original verbose prompt, v2 = compact
+# structured-output prompt
+PROMPT_VERSION = os.getenv('PROMPT_VERSION', 'v2')
+# A/B split between versions, e.g. "v1:20,v2:80" (empty: everyone gets PROMPT_VERSION)
+PROMPT_EXPERIMENT = os.getenv('PROMPT_EXPERIMENT', '')
+
+# Local fallback: heuristic scorer, or this model via transformers (CPU) when
+# USE_LOCAL_TRANSFORMERS=True and transformers is installed
 USE_LOCAL_TRANSFORMERS = os.getenv('USE_LOCAL_TRANSFORMERS', 'False') == 'True'
+LOCAL_MODEL_NAME = os.getenv('LOCAL_MODEL_NAME', 'google/flan-t5-base')
+
+# Analysis scheduling (see AI_APP/scheduler.py)
+# inline: analyze inside the upload request (default, no worker needed)
+# queued: uploads are queued in the DB and `manage.py run_analysis_worker`
+#         processes them with per-user fair share and priority lanes
+ANALYSIS_MODE = os.getenv('ANALYSIS_MODE', 'inline')
+ANALYSIS_MAX_CONCURRENT_PER_USER = int(os.getenv('ANALYSIS_MAX_CONCURRENT_PER_USER', '2'))
+# Uploads beyond this many already-waiting jobs go to the bulk lane
+ANALYSIS_BULK_THRESHOLD = int(os.getenv('ANALYSIS_BULK_THRESHOLD', '3'))
+# 'processing' jobs whose worker sent no heartbeat for this long are assumed
+# orphaned and requeued (workers renew their leases 4 times per period)
+ANALYSIS_STALE_AFTER_SECONDS = int(os.getenv('ANALYSIS_STALE_AFTER_SECONDS', '900'))
 
 # Maximum PDF file size: 5 MB
 MAX_UPLOAD_SIZE = 5 * 1024 * 1024
@@ -205,6 +374,36 @@ ALLOWED_UPLOAD_EXTENSIONS = ['pdf']
 
 AUTH_USER_MODEL = 'AI_APP.User'
 
+# Application logs (AI_APP.*) go to stderr
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'app': {'format': '%(asctime)s %(levelname)s %(name)s: %(message)s'},
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'app'},
+    },
+    'loggers': {
+        'AI_APP': {'handlers': ['console'], 'level': os.getenv('APP_LOG_LEVEL', 'INFO')},
+    },
+}
+
+# Startup / import-time budget
+# Modules imported by the gunicorn master before forking (see AI_APP/warmup.py).
+# They are deliberately NOT imported at module level anywhere else.
+WARMUP_IMPORTS = [
+    'AI_APP.views',
+    'AI_APP.serializers',
+    'groq',
+    'anthropic',
+    'PyPDF2',
+]
+# `python manage.py check_import_time` fails if importing the WSGI app
+# takes longer than this, or pulls in any of the forbidden (lazy) modules.
+IMPORT_TIME_BUDGET_MS = int(os.getenv('IMPORT_TIME_BUDGET_MS', '1500'))
+IMPORT_TIME_FORBIDDEN_MODULES = ['groq', 'anthropic', 'transformers', 'PyPDF2', 'pandas', 'scipy', 'nibabel', 'nipype', 'rdflib']
+
 # Celery Configuration Options
 # CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL")
 # CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND")
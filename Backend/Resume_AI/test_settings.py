@@ -0,0 +1,27 @@
+"""
+Settings for `python manage.py test --settings=Resume_AI.test_settings`.
+
+Adds a read replica (AI_APP/routers.py) as a second SQLite database. It is
+deliberately not a TEST MIRROR of 'default': rows written only to the
+primary are missing on it, like on a lagging replica, so the tests can
+tell which database answered.
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import BASE_DIR, DATABASES
+
+DATABASES['replica_1'] = {
+    'ENGINE': 'django.db.backends.sqlite3',
+    'NAME': BASE_DIR / 'replica.sqlite3',
+}
+DATABASE_REPLICAS = ['replica_1']
+
+# Read-your-writes pins live in the cache; keep them in this process
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+
+# The test client speaks plain HTTP; with DEBUG off every request would be
+# answered with a 301 to https://
+SECURE_SSL_REDIRECT = False
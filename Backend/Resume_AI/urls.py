@@ -14,6 +14,7 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path, include
 
@@ -21,3 +22,7 @@ urlpatterns = [
     path('api/', include('AI_APP.urls')),
     path('admin/', admin.site.urls),
 ]
+
+if settings.ASYNC_VIEWS:
+    # Async resume views take precedence over the DRF viewset routes
+    urlpatterns.insert(0, path('api/', include('AI_APP.async_urls')))
@@ -0,0 +1,60 @@
+"""
+Gunicorn configuration for Resume_AI.
+
+Gunicorn picks this file up automatically when started from the Backend
+directory (the container's /app). Every value can be overridden from the
+environment so docker-compose / Render can tune it without code changes.
+"""
+
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "sync")
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+
+# Load Django (and warm it up) once in the master, then fork.
+# Workers share the imported code copy-on-write, so adding workers is
+# fast and costs much less memory per process.
+preload_app = os.getenv("GUNICORN_PRELOAD", "True") == "True"
+
+# Recycle workers now and then to cap slow memory growth
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+
+
+def when_ready(server):
+    if not preload_app:
+        return
+    from AI_APP.warmup import warmup
+
+    warmup()
+    server.log.info("Django warmup finished in master")
+
+
+def pre_fork(server, worker):
+    # Never hand a DB connection opened in the master to a worker
+    if not preload_app:
+        return
+    from django.db import connections
+
+    connections.close_all()
+
+
+def post_fork(server, worker):
+    if not preload_app:
+        return
+    from AI_APP.utils import reset_clients
+
+    reset_clients()
+
+
+def worker_exit(server, worker):
+    # Close pooled DB connections cleanly
+    from django.conf import settings
+
+    if settings.DB_POOL:
+        from AI_APP.db_backends.pooled_postgresql.base import close_pools
+
+        close_pools()
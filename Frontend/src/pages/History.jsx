@@ -1,7 +1,8 @@
 import React, { useEffect } from 'react';
 import { useAppDispatch, useCurrentResume, useDetailLoading, useHistoryLoading, useResumeHistory } from '../store/hooks';
 import { useNavigate } from 'react-router-dom';
-import { fetchResumeHistory, fetchResumeDetail, deleteResume } from '../store/slices/resumeSlice';
+import { fetchResumeHistory, fetchResumeDetail, deleteResume, resumeStatusReceived } from '../store/slices/resumeSlice';
+import { downloadResume, subscribeResumeStatus } from '../services/api';
 import { 
   FileText, 
   Trash2, 
@@ -14,7 +15,8 @@ import {
   ShieldAlert,
   Calendar,
   ArrowUpRight,
-  Loader2
+  Loader2,
+  Download
 } from 'lucide-react';
 
 const History = () => {
@@ -29,6 +31,12 @@ const History = () => {
         dispatch(fetchResumeHistory());
     }, [dispatch]);
 
+    // Live status updates for analyses still processing (no polling)
+    useEffect(() => {
+        const subscription = subscribeResumeStatus((payload) => dispatch(resumeStatusReceived(payload)));
+        return () => subscription.close();
+    }, [dispatch]);
+
     const handleViewDetails = (id) => dispatch(fetchResumeDetail(id));
 
     const handleDelete = async (id, e) => {
@@ -39,6 +47,22 @@ const History = () => {
         }
     };
 
+    // The PDF needs the auth header, so it is fetched as a blob
+    const handleDownload = async (resume) => {
+        try {
+            const response = await downloadResume(resume.id);
+            const url = URL.createObjectURL(response.data);
+            const link = document.createElement('a');
+            link.href = url;
+            link.download = resume.file_name;
+            link.click();
+            // The download starts asynchronously, revoking right away can cancel it
+            setTimeout(() => URL.revokeObjectURL(url), 1000);
+        } catch (error) {
+            window.alert('Could not download this resume.');
+        }
+    };
+
     // Ensure history is an array
     const resumesList = Array.isArray(history) ? history : [];
 
@@ -137,13 +161,22 @@ const History = () => {
                                     </div>
                                     <h1 className="text-4xl font-semibold text-gray-900 tracking-tight">{currentResume.file_name}</h1>
                                 </div>
-                                <button
-                                    onClick={(e) => handleDelete(currentResume.id, e)}
-                                    className="flex items-center gap-2 px-4 py-2 text-red-500 hover:bg-red-50 rounded-xl text-sm font-bold transition-all"
-                                >
-                                    <Trash2 className="h-4 w-4" />
-                                    Delete Record
-                                </button>
+                                <div className="flex items-center gap-2">
+                                    <button
+                                        onClick={() => handleDownload(currentResume)}
+                                        className="flex items-center gap-2 px-4 py-2 text-gray-700 hover:bg-gray-100 rounded-xl text-sm font-bold transition-all"
+                                    >
+                                        <Download className="h-4 w-4" />
+                                        Download PDF
+                                    </button>
+                                    <button
+                                        onClick={(e) => handleDelete(currentResume.id, e)}
+                                        className="flex items-center gap-2 px-4 py-2 text-red-500 hover:bg-red-50 rounded-xl text-sm font-bold transition-all"
+                                    >
+                                        <Trash2 className="h-4 w-4" />
+                                        Delete Record
+                                    </button>
+                                </div>
                             </div>
 
                             {/* Metrics Grid */}
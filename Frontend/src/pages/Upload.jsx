@@ -1,7 +1,8 @@
 import React, { useRef, useState, useEffect } from 'react'
 import { useAppDispatch, useCurrentUpload, useUploadLoading, useCurrentResume } from '../store/hooks'
 import { useNavigate } from 'react-router-dom';
-import { uploadResume, clearCurrentUpload, fetchResumeDetail } from '../store/slices/resumeSlice';
+import { uploadResume, clearCurrentUpload, fetchResumeDetail, resumeStatusReceived } from '../store/slices/resumeSlice';
+import { subscribeResumeStatus } from '../services/api';
 import { 
     FileText, 
     Upload as UploadIcon, 
@@ -17,12 +18,14 @@ import {
     ArrowRight
 } from 'lucide-react';
 
+// Fallback poll while an analysis is pending/processing
+const STATUS_POLL_INTERVAL_MS = 10000;
+
 const Upload = () => {
     const [selectedFiles, setSelectedFiles] = useState(null);
     const [fileError, setFileError] = useState('');
     const [resumeId, setResumeId] = useState(null);
     const [analysisComplete, setAnalysisComplete] = useState(false);
-    const [pollCount, setPollCount] = useState(0);
     const [analysisProgress, setAnalysisProgress] = useState(0);
 
     const dispatch = useAppDispatch();
@@ -33,28 +36,42 @@ const Upload = () => {
     
     const isThrottled = useRef(false);
 
-    // Poll for analysis completion
+    // Wait for analysis completion: the backend pushes status changes over
+    // a WebSocket. A slow poll covers the times it can't: while the socket
+    // is reconnecting, or when no ASGI server is running at all.
     useEffect(() => {
-        if (resumeId && !analysisComplete && pollCount < 30) {
-            const timer = setTimeout(() => {
-                dispatch(fetchResumeDetail(resumeId)).then((result) => {
-                    const payload = result.payload;
-                    if (payload) {
-                        // Treat both completed and failed analyses as "done"
-                        if (payload.analyzed_at || payload.status === 'failed') {
-                            setAnalysisComplete(true);
-                            setAnalysisProgress(100);
-                        } else {
-                            setPollCount(prev => prev + 1);
-                            setAnalysisProgress(Math.min((pollCount / 30) * 100, 95));
-                        }
-                    }
-                });
-            }, 1000);
-
-            return () => clearTimeout(timer);
-        }
-    }, [resumeId, analysisComplete, pollCount, dispatch]);
+        if (!resumeId || analysisComplete) return;
+
+        const handleResume = (payload) => {
+            if (!payload || payload.id !== resumeId) return;
+            dispatch(resumeStatusReceived(payload));
+            // Treat both completed and failed analyses as "done"
+            if (payload.status === 'completed' || payload.status === 'failed') {
+                setAnalysisComplete(true);
+                setAnalysisProgress(100);
+            }
+        };
+
+        const fetchOnce = () => {
+            dispatch(fetchResumeDetail(resumeId)).then((result) => handleResume(result.payload));
+        };
+
+        // Catch up on anything that changed before each (re)connect
+        const subscription = subscribeResumeStatus(handleResume, { onOpen: fetchOnce });
+        fetchOnce();
+        const poll = setInterval(fetchOnce, STATUS_POLL_INTERVAL_MS);
+
+        // Purely cosmetic progress while we wait
+        const timer = setInterval(() => {
+            setAnalysisProgress(prev => Math.min(prev + 100 / 30, 95));
+        }, 1000);
+
+        return () => {
+            clearInterval(timer);
+            clearInterval(poll);
+            subscription.close();
+        };
+    }, [resumeId, analysisComplete, dispatch]);
 
     const handleFileSelect = (e) => {
         const file = e.target.files?.[0];
@@ -88,7 +105,6 @@ const Upload = () => {
             // Reset state
             setResumeId(null);
             setAnalysisComplete(false);
-            setPollCount(0);
             setAnalysisProgress(0);
 
             // Use unwrap() for proper error handling
@@ -98,7 +114,6 @@ const Upload = () => {
             setResumeId(id);
             setSelectedFiles(null);
             setFileError('');
-            setPollCount(0);
 
         } catch (error) {
             console.error('Upload failed:', error);
@@ -113,7 +128,6 @@ const Upload = () => {
         setSelectedFiles(null);
         setResumeId(null);
         setAnalysisComplete(false);
-        setPollCount(0);
         setAnalysisProgress(0);
     }
 
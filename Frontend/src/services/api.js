@@ -140,4 +140,70 @@ export const deleteResume = (resumeId) => {
     return api.delete(`/resumes/${resumeId}/`);
 };
 
+// Download the original PDF (authorised by Django, served by nginx)
+export const downloadResume = (resumeId) => {
+    return api.get(`/resumes/${resumeId}/download/`, { responseType: 'blob' });
+};
+
+// Resume status notifications (WebSocket)
+// Instead of polling /resumes/{id}/, the backend pushes the full resume
+// payload every time its status changes.
+const getWsBaseUrl = () => {
+    const explicit = import.meta.env.VITE_WS_URL;
+    if (explicit) return explicit;
+    if (API_URL && /^https?:/.test(API_URL)) {
+        return API_URL.replace(/^http/, 'ws').replace(/\/api\/?$/, '');
+    }
+    const protocol = window.location.protocol === 'https:' ? 'wss' : 'ws';
+    return `${protocol}://${window.location.host}`;
+};
+
+// Reconnects with backoff (1s doubling up to 30s) until close() is called;
+// onOpen runs after every (re)connect so callers can catch up on changes
+// they missed while disconnected.
+export const subscribeResumeStatus = (onUpdate, { onOpen } = {}) => {
+    let socket = null;
+    let retryTimer = null;
+    let attempts = 0;
+    let closed = false;
+
+    const connect = () => {
+        const token = localStorage.getItem('access_token');
+        if (closed || !token) return;
+
+        // The token is offered as a subprotocol instead of the query
+        // string, so it never shows up in access logs
+        socket = new WebSocket(`${getWsBaseUrl()}/ws/resumes/status/`, [
+            'resume-status',
+            `access_token.${token}`,
+        ]);
+        socket.onopen = () => {
+            attempts = 0;
+            if (onOpen) onOpen();
+        };
+        socket.onmessage = (event) => {
+            try {
+                onUpdate(JSON.parse(event.data));
+            } catch (err) {
+                console.error('Bad status message:', err);
+            }
+        };
+        socket.onclose = () => {
+            if (closed) return;
+            const delay = Math.min(1000 * 2 ** attempts, 30000);
+            attempts += 1;
+            retryTimer = setTimeout(connect, delay);
+        };
+    };
+
+    connect();
+    return {
+        close: () => {
+            closed = true;
+            clearTimeout(retryTimer);
+            if (socket) socket.close();
+        },
+    };
+};
+
 export default api;
\ No newline at end of file
@@ -51,6 +51,19 @@ const resumeSlice = createSlice({
         state.currentUpload.progress = action.payload;
       }
     },
+    // Pushed over the status WebSocket: same shape as the detail endpoint
+    resumeStatusReceived: (state, action) => {
+      const resume = action.payload;
+      if (!resume?.id) return;
+      if (Array.isArray(state.history)) {
+        state.history = state.history.map(r => (r.id === resume.id ? { ...r, ...resume } : r));
+      }
+      if (state.currentResume?.id === resume.id) {
+        state.currentResume = { ...state.currentResume, ...resume };
+      } else if (state.currentUpload?.data?.id === resume.id) {
+        state.currentResume = resume;
+      }
+    },
   },
   extraReducers: (builder) => {
     // Upload Resume
@@ -147,6 +160,7 @@ export const {
   clearCurrentUpload,
   clearCurrentResume,
   setUploadProgress,
+  resumeStatusReceived,
 } = resumeSlice.actions;
 
 // Move thunks below to avoid TEMPORAL DEAD ZONE with actions
@@ -164,11 +178,14 @@ export const uploadResume = createAsyncThunk(
       });
 
       // Just return the created resume record.
-      // The UI (Upload page) already has its own polling logic that
-      // checks the resume status and shows progress / results.
+      // The UI (Upload page) subscribes to status notifications and
+      // shows progress / results when the analysis finishes.
       return response.data;
     } catch (error) {
-      return rejectWithValue(error.response?.data?.error ?? error.message ?? "Upload failed");
+      // 429 (upload budget used up) carries DRF's "detail" with the wait time
+      return rejectWithValue(
+        error.response?.data?.error ?? error.response?.data?.detail ?? error.message ?? "Upload failed"
+      );
     }
   }
 );